@@ -0,0 +1,3 @@
+"""
+Benchmarks for Data Visualization Agent
+"""
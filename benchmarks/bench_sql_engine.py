@@ -0,0 +1,92 @@
+"""
+Benchmark: pandas REPL execution vs DuckDB SQL push-down
+Runs equivalent aggregations through the agent's two execution tools on the
+student dataset scaled up (1000x by default)
+
+Usage:
+    python -m benchmarks.bench_sql_engine --scale 1000 --repeat 3
+"""
+import argparse
+import json
+import time
+from typing import Callable, Dict, List
+
+import pandas as pd
+from langchain_experimental.tools import PythonAstREPLTool
+
+from src.config import SAMPLE_DATA_URL
+from src.data_loader import load_dataset
+from src.sql_engine import SQLEngine, make_sql_tools
+
+# (name, pandas code as the REPL tool would run it, equivalent DuckDB SQL)
+QUERIES = [
+    (
+        "mean G3 by sex",
+        "df.groupby('sex', observed=True)['G3'].mean()",
+        "SELECT sex, AVG(G3) FROM df GROUP BY sex",
+    ),
+    (
+        "mean G3 by Dalc and Walc",
+        "df.groupby(['Dalc', 'Walc'])['G3'].mean()",
+        "SELECT Dalc, Walc, AVG(G3) FROM df GROUP BY Dalc, Walc ORDER BY Dalc, Walc",
+    ),
+    (
+        "students by school and address",
+        "df.groupby(['school', 'address'], observed=True).size()",
+        "SELECT school, address, COUNT(*) FROM df GROUP BY school, address",
+    ),
+    (
+        "filtered mean",
+        "df[df['studytime'] >= 3]['G3'].mean()",
+        "SELECT AVG(G3) FROM df WHERE studytime >= 3",
+    ),
+    (
+        "p90 absences by sex",
+        "df.groupby('sex', observed=True)['absences'].quantile(0.9)",
+        "SELECT sex, quantile_cont(absences, 0.9) FROM df GROUP BY sex",
+    ),
+]
+
+
+def best_of(fn: Callable[[], object], repeat: int) -> float:
+    """Best wall-clock time in seconds over several runs"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(df: pd.DataFrame, repeat: int) -> List[Dict[str, object]]:
+    """Time every query through both execution tools"""
+    repl = PythonAstREPLTool(locals={"df": df})
+    sql_tool = make_sql_tools(SQLEngine(df))[0]
+    results = []
+    for name, code, sql in QUERIES:
+        python_s = best_of(lambda: repl.run(code), repeat)
+        sql_s = best_of(lambda: sql_tool.run(sql), repeat)
+        results.append({
+            "query": name,
+            "python_s": round(python_s, 6),
+            "sql_s": round(sql_s, 6),
+            "speedup": round(python_s / sql_s, 2) if sql_s else None,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--source", default=SAMPLE_DATA_URL, help="CSV/Parquet/Feather source")
+    parser.add_argument("--scale", type=int, default=1000, help="Times to replicate the rows")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per query (best is kept)")
+    args = parser.parse_args()
+
+    base = load_dataset(args.source)
+    df = pd.concat([base] * args.scale, ignore_index=True)
+    report = {"rows": len(df), "scale": args.scale, "results": run(df, args.repeat)}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
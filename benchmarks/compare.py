@@ -0,0 +1,54 @@
+"""
+Compare two benchmark result files and flag regressions
+
+Usage:
+    python -m benchmarks.compare baseline.json candidate.json --threshold 1.2
+"""
+import argparse
+import json
+import sys
+from typing import Dict, List, Tuple
+
+
+def load(path: str) -> Dict[Tuple[str, int], float]:
+    """Map (benchmark, rows) to the best timing in a results file"""
+    with open(path) as f:
+        report = json.load(f)
+    return {(r["benchmark"], r["rows"]): r["min_s"] for r in report["results"]}
+
+
+def compare(baseline: Dict, candidate: Dict, threshold: float) -> List[Dict]:
+    """Ratios candidate/baseline for benchmarks present in both files"""
+    rows = []
+    for key in sorted(set(baseline) & set(candidate), key=lambda k: (k[1], k[0])):
+        ratio = candidate[key] / baseline[key] if baseline[key] else float("inf")
+        rows.append({
+            "benchmark": key[0],
+            "rows": key[1],
+            "baseline_s": baseline[key],
+            "candidate_s": candidate[key],
+            "ratio": ratio,
+            "regression": ratio > threshold,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare benchmark results")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="Slowdown ratio counted as a regression")
+    args = parser.parse_args()
+
+    rows = compare(load(args.baseline), load(args.candidate), args.threshold)
+    print(f"{'benchmark':<22}{'rows':>10}{'baseline':>12}{'candidate':>12}{'ratio':>8}")
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(f"{row['benchmark']:<22}{row['rows']:>10}{row['baseline_s']:>12.4f}"
+              f"{row['candidate_s']:>12.4f}{row['ratio']:>8.2f}{flag}")
+    sys.exit(1 if any(row["regression"] for row in rows) else 0)
+
+
+if __name__ == "__main__":
+    main()
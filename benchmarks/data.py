@@ -0,0 +1,38 @@
+"""
+Synthetic benchmark data
+Generates frames shaped like the student performance dataset at any size
+"""
+import numpy as np
+import pandas as pd
+
+
+def make_student_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Build a student-performance-like dataframe
+
+    Args:
+        rows: Number of rows
+        seed: Random seed, so runs are comparable across commits
+
+    Returns:
+        DataFrame with the main columns of student-mat.csv
+    """
+    rng = np.random.default_rng(seed)
+    g1 = rng.integers(0, 21, size=rows)
+    return pd.DataFrame({
+        "school": rng.choice(["GP", "MS"], size=rows),
+        "sex": rng.choice(["F", "M"], size=rows),
+        "age": rng.integers(15, 23, size=rows),
+        "address": rng.choice(["U", "R"], size=rows),
+        "Medu": rng.integers(0, 5, size=rows),
+        "Fedu": rng.integers(0, 5, size=rows),
+        "studytime": rng.integers(1, 5, size=rows),
+        "failures": rng.integers(0, 4, size=rows),
+        "Dalc": rng.integers(1, 6, size=rows),
+        "Walc": rng.integers(1, 6, size=rows),
+        "health": rng.integers(1, 6, size=rows),
+        "absences": rng.poisson(5, size=rows),
+        "G1": g1,
+        "G2": np.clip(g1 + rng.integers(-2, 3, size=rows), 0, 20),
+        "G3": np.clip(g1 + rng.integers(-3, 4, size=rows), 0, 20),
+    })
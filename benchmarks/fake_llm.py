@@ -0,0 +1,94 @@
+"""
+Deterministic scripted chat model for offline benchmarks
+Replays recorded function calls and final answers with configurable
+artificial latency, so agent overhead can be timed without a network
+"""
+import asyncio
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+from langchain.chat_models.base import BaseChatModel
+from langchain.schema import AIMessage, ChatGeneration, ChatResult, FunctionMessage, HumanMessage
+from langchain.schema.messages import BaseMessage
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    Chat model that replays a fixed script of agent steps
+
+    Each script step is either {"tool": name, "tool_input": {...}} for a function
+    call or {"output": text} for a final answer. The step is chosen from the
+    number of function results since the last human message, so concurrent
+    queries each replay the script from the start.
+    """
+
+    script: List[Dict[str, Any]]
+    latency: float = 0.0
+    calls: int = 0
+
+    @classmethod
+    def from_file(cls, path: str, latency: float = 0.0) -> "ScriptedChatModel":
+        """Load a recorded script from a JSON file"""
+        with open(path) as f:
+            return cls(script=json.load(f), latency=latency)
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-fake"
+
+    def _step(self, messages: List[BaseMessage]) -> Dict[str, Any]:
+        completed = 0
+        for message in reversed(messages):
+            if isinstance(message, HumanMessage):
+                break
+            if isinstance(message, FunctionMessage):
+                completed += 1
+        return self.script[min(completed, len(self.script) - 1)]
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[Any] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return self._respond(messages, run_manager)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[Any] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        result = self._respond(messages, None)
+        if run_manager is not None and not result.generations[0].message.additional_kwargs:
+            for token in result.generations[0].message.content.split(" "):
+                await run_manager.on_llm_new_token(token + " ")
+        return result
+
+    def _respond(self, messages: List[BaseMessage], run_manager: Optional[Any]) -> ChatResult:
+        step = self._step(messages)
+        if "tool" in step:
+            message = AIMessage(
+                content="",
+                additional_kwargs={
+                    "function_call": {
+                        "name": step["tool"],
+                        "arguments": json.dumps(step.get("tool_input", {})),
+                    }
+                },
+            )
+        else:
+            message = AIMessage(content=step["output"])
+            if run_manager is not None:
+                for token in step["output"].split(" "):
+                    run_manager.on_llm_new_token(token + " ")
+        return ChatResult(generations=[ChatGeneration(message=message)])
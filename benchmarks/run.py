@@ -0,0 +1,130 @@
+"""
+Offline benchmark suite for Data Visualization Agent
+Times agent construction, query, get_data_summary and each chart tool across
+dataframe sizes, using a scripted fake LLM instead of OpenRouter
+
+Usage:
+    python -m benchmarks.run --sizes 1000 100000 --output results.json
+    python -m benchmarks.compare baseline.json results.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+import uuid
+from typing import Any, Callable, Dict, List
+
+import pandas as pd
+
+from benchmarks.data import make_student_frame
+from benchmarks.fake_llm import ScriptedChatModel
+from src.agent import create_agent
+from src.config import CHART_CACHE
+from src.tools import create_bar_chart, create_line_chart, create_scatter_plot
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+DEFAULT_SCRIPT = os.path.join(os.path.dirname(__file__), "scripts", "average_grade.json")
+QUESTION = "What is the average final grade (G3), overall and by sex?"
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Run fn several times and return min/median wall-clock seconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return {"min_s": min(timings), "median_s": statistics.median(timings)}
+
+
+def bench_size(df: pd.DataFrame, llm: ScriptedChatModel, repeat: int) -> Dict[str, Dict[str, float]]:
+    """Run every benchmark against one dataframe"""
+    results = {}
+
+    def construct():
+        return create_agent(df, llm=llm, cache=None, plan_cache=None)
+
+    results["construct"] = measure(construct, repeat)
+    agent = construct()
+    agent.agent.verbose = False
+
+    results["query"] = measure(lambda: agent.query(QUESTION), repeat)
+    results["get_data_summary"] = measure(agent.get_data_summary, repeat)
+
+    bar_data = df["sex"].value_counts().to_dict()
+    line_data = {"G3": df["G3"].tolist()}
+    x_data, y_data = df["G1"].tolist(), df["G3"].tolist()
+    def labels(fresh: bool = True) -> Dict[str, str]:
+        # A never-seen title keeps the chart store from answering, so renders are timed
+        title = f"benchmark {uuid.uuid4().hex[:8]}" if fresh else "benchmark"
+        return {"title": title, "xlabel": "x", "ylabel": "y"}
+
+    charts = {
+        "create_bar_chart": lambda fresh: create_bar_chart.invoke({"data": bar_data, **labels(fresh)}),
+        "create_line_chart": lambda fresh: create_line_chart.invoke({"data": line_data, **labels(fresh)}),
+        "create_scatter_plot": lambda fresh: create_scatter_plot.invoke(
+            {"x_data": x_data, "y_data": y_data, **labels(fresh)}
+        ),
+    }
+    for name, render in charts.items():
+        results[name] = measure(lambda: render(True), repeat)
+        if CHART_CACHE:
+            # Identical charts after the first are chart store hits; reported on their own
+            render(False)
+            results[f"{name}_cached"] = measure(lambda: render(False), repeat)
+    return results
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(sizes: List[int], repeat: int, latency: float, script: str) -> Dict[str, Any]:
+    """Run the suite and return a JSON-serializable report"""
+    llm = ScriptedChatModel.from_file(script, latency=latency)
+    results = []
+    for size in sizes:
+        df = make_student_frame(size)
+        for name, timing in bench_size(df, llm, repeat).items():
+            results.append({"benchmark": name, "rows": size, **timing})
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "llm_latency_s": latency,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline Data Visualization Agent benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Row counts")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark")
+    parser.add_argument("--latency", type=float, default=0.0, help="Fake LLM seconds per call")
+    parser.add_argument("--script", default=DEFAULT_SCRIPT, help="Recorded agent steps (JSON)")
+    parser.add_argument("--output", help="Write results to this JSON file instead of stdout")
+    args = parser.parse_args()
+
+    report = run(args.sizes, args.repeat, args.latency, args.script)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,17 @@ Demonstrates real-world usage patterns
 """
 import pandas as pd
 from src.agent import create_agent
+from src.config import SAMPLE_DATA_URL, configure_logging
+from src.data_loader import load_dataset
+from src.pool import AgentPool
+
+# Examples on the sample dataset share one agent instead of rebuilding it each time
+agent_pool = AgentPool()
+
+
+def sample_agent():
+    """Get the pooled agent for the sample student dataset"""
+    return agent_pool.get("student-mat", lambda: load_dataset(SAMPLE_DATA_URL))
 
 
 def example_1_basic_query():
@@ -12,13 +23,8 @@ def example_1_basic_query():
     print("Example 1: Basic Data Query")
     print("="*60)
     
-    # Load sample data
-    df = pd.read_csv(
-        "https://cf-courses-data.s3.us.cloud-object-storage.appdomain.cloud/"
-        "ZNoKMJ9rssJn-QbJ49kOzA/student-mat.csv"
-    )
-    
-    agent = create_agent(df)
+    # Load sample data (once, on first use)
+    agent = sample_agent()
     
     # Simple query
     response = agent.query("How many students are in the dataset?")
@@ -52,12 +58,7 @@ def example_3_visualization_query():
     print("Example 3: Visualization Query")
     print("="*60)
     
-    df = pd.read_csv(
-        "https://cf-courses-data.s3.us.cloud-object-storage.appdomain.cloud/"
-        "ZNoKMJ9rssJn-QbJ49kOzA/student-mat.csv"
-    )
-    
-    agent = create_agent(df)
+    agent = sample_agent()
     
     # Visualization query
     response = agent.query(
@@ -77,12 +78,7 @@ def example_4_statistical_analysis():
     print("Example 4: Statistical Analysis")
     print("="*60)
     
-    df = pd.read_csv(
-        "https://cf-courses-data.s3.us.cloud-object-storage.appdomain.cloud/"
-        "ZNoKMJ9rssJn-QbJ49kOzA/student-mat.csv"
-    )
-    
-    agent = create_agent(df)
+    agent = sample_agent()
     
     # Statistical query
     response = agent.query(
@@ -97,12 +93,7 @@ def example_5_complex_analysis():
     print("Example 5: Complex Data Analysis")
     print("="*60)
     
-    df = pd.read_csv(
-        "https://cf-courses-data.s3.us.cloud-object-storage.appdomain.cloud/"
-        "ZNoKMJ9rssJn-QbJ49kOzA/student-mat.csv"
-    )
-    
-    agent = create_agent(df)
+    agent = sample_agent()
     
     # Complex query
     response = agent.query(
@@ -141,6 +132,7 @@ def example_6_intermediate_steps():
 
 
 if __name__ == "__main__":
+    configure_logging()
     print("Data Visualization Agent Examples")
     print("Demonstrating real-world usage patterns")
     
@@ -2,25 +2,25 @@
 Main entry point for Data Visualization Agent
 Example usage demonstrating LangChain LCEL capabilities
 """
-import pandas as pd
-from src.agent import create_agent
+from src.config import SAMPLE_DATA_URL, configure_logging
+from src.data_loader import load_dataset
 
 
 def main():
     """Main function demonstrating the Data Visualization Agent"""
-    
+    configure_logging()
+
     # Load sample data
     print("Loading sample data...")
-    df = pd.read_csv(
-        "https://cf-courses-data.s3.us.cloud-object-storage.appdomain.cloud/"
-        "ZNoKMJ9rssJn-QbJ49kOzA/student-mat.csv"
-    )
+    df = load_dataset(SAMPLE_DATA_URL)
     
     print(f"Data shape: {df.shape}")
     print(f"Columns: {list(df.columns)}\n")
     
     # Create agent
     print("Initializing Data Visualization Agent...")
+    from src.agent import create_agent
+
     agent = create_agent(df)
     
     # Example queries
@@ -30,12 +30,13 @@ def main():
         "Generate a bar chart showing gender distribution.",
     ]
     
-    for query in queries:
+    responses = agent.query_many(queries)
+    
+    for query, response in zip(queries, responses):
         print(f"\n{'='*60}")
         print(f"Query: {query}")
         print('='*60)
         
-        response = agent.query(query)
         print(f"\nResponse: {response['output']}")
         
         # Show generated code if available
@@ -1,15 +1,35 @@
 """
 Data Visualization Agent Package
+Heavy entry points are resolved on first attribute access, so importing the
+package (or its config) does not load langchain agents or matplotlib
 """
+import importlib
+from typing import Any
+
 from src.config import (
     OPENROUTER_API_KEY,
     MODEL_NAME,
     AGENT_VERBOSE,
+    configure_logging,
 )
 
+_LAZY_ATTRS = {
+    "create_agent": "src.agent",
+    "DataVisualizationAgent": "src.agent",
+    "AgentPool": "src.pool",
+    "DataCatalog": "src.catalog",
+    "load_dataset": "src.data_loader",
+}
+
 __all__ = [
     "OPENROUTER_API_KEY",
     "MODEL_NAME",
     "AGENT_VERBOSE",
-]
+    "configure_logging",
+] + list(_LAZY_ATTRS)
+
 
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_ATTRS:
+        return getattr(importlib.import_module(_LAZY_ATTRS[name]), name)
+    raise AttributeError(f"module 'src' has no attribute {name!r}")
@@ -3,28 +3,137 @@ Data Visualization Agent using LangChain LCEL
 Demonstrates advanced LangChain features: LCEL chains, pipes, runnables, and tools
 Enhanced with improved error handling and logging
 """
+import asyncio
 import pandas as pd
-import logging
-from typing import Any, Dict, List, Optional
-from langchain.chat_models import ChatOpenAI
-from langchain.agents import AgentType
-from langchain_experimental.agents.agent_toolkits import create_pandas_dataframe_agent
-from langchain.tools import tool
-from langchain.prompts import PromptTemplate
-from langchain.schema import HumanMessage, AIMessage
+import re
+import threading
+import time
+import uuid
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, List, Optional, Union
+from langchain.schema import AgentAction, SystemMessage
 from langchain.callbacks import StreamingStdOutCallbackHandler
+from langchain.callbacks.base import BaseCallbackHandler
+from langchain.schema.language_model import BaseLanguageModel
 from src.config import (
     OPENROUTER_API_KEY,
-    OPENROUTER_BASE_URL,
     MODEL_NAME,
     MODEL_TEMPERATURE,
-    MODEL_MAX_TOKENS,
     AGENT_VERBOSE,
     AGENT_RETURN_INTERMEDIATE_STEPS,
     AGENT_HANDLE_PARSING_ERRORS,
+    AGENT_MAX_CONCURRENCY,
+    AGENT_QUERY_TIMEOUT,
+    AGENT_EXECUTION_MODE,
+    AGENT_STREAM_STDOUT,
+    REPL_BACKEND,
+    ROLLUP_MODE,
+    CHART_CACHE,
+    APPROX_MODE,
+    MEMORY_OPTIMIZE,
+    PROMPT_CONTEXT_MODE,
+    PROMPT_TOKEN_BUDGET,
+    PROMPT_HEAD_ROWS,
+    METRICS_FILE,
+    TOOL_OUTPUT_MAX_ROWS,
     logger,
 )
 from src.tools import get_tools
+from src.batch_charts import make_chart_batch_tools
+from src.chart_store import get_chart_store
+from src.correlation import CorrelationCache, make_correlation_tools
+from src.rollup import RollupCube, create_rollup, make_rollup_tools
+from src.sampling import StratifiedSample, make_sampling_tools
+from src.llm import get_llm
+from src.cache import (
+    ResponseCache,
+    column_dependencies,
+    column_fingerprints,
+    combine_fingerprints,
+    create_cache,
+    make_cache_key,
+    mutates_frame,
+)
+from src.data_loader import load_dataset, optimize_memory
+from src.profiling import DataFrameProfile
+from src.context import build_schema_context, estimate_tokens, head_prompt_tokens
+from src.datasets import ChunkedDataset, make_dataset_tools
+from src.sql_engine import SQL_AGENT_PREFIX, SQLEngine, make_sql_tools
+from src.instrumentation import InstrumentationCallback, MetricsRegistry, get_metrics_registry
+from src.streaming import StreamEventCallback
+from src.plan_cache import (
+    PYTHON_TOOL,
+    PlanCache,
+    create_plan_cache,
+    execute_code,
+    plan_snippets,
+    is_tool_error,
+    schema_fingerprint,
+)
+
+if TYPE_CHECKING:
+    from langchain.agents import AgentExecutor
+    from src.catalog import DataCatalog
+    from src.sandbox import SandboxExecutor
+
+# Tools whose output depends only on their arguments, never on the agent's frame
+_DATA_FREE_TOOLS = {tool.name for tool in get_tools()}
+
+DATASET_AGENT_PREFIX = (
+    "You are working with a large dataset that is not loaded into memory. "
+    "Use the dataset_* tools to inspect and aggregate it; each aggregation is "
+    "computed in one streaming pass over the files, so ask for everything you "
+    "need in as few calls as possible."
+)
+
+
+def create_tool_agent(llm: Any, tools: List, system_prompt: str) -> "AgentExecutor":
+    """
+    Build a function-calling agent over an explicit tool list
+
+    Args:
+        llm: Chat model that supports function calling
+        tools: Tools the agent may call
+        system_prompt: System message describing the data and tools
+
+    Returns:
+        AgentExecutor configured like the pandas dataframe agent
+    """
+    # langchain.agents takes seconds to import; load it only when an agent is built
+    from langchain.agents import AgentExecutor, OpenAIFunctionsAgent
+
+    agent = OpenAIFunctionsAgent.from_llm_and_tools(
+        llm, tools, system_message=SystemMessage(content=system_prompt)
+    )
+    return AgentExecutor(
+        agent=agent,
+        tools=tools,
+        verbose=AGENT_VERBOSE,
+        return_intermediate_steps=AGENT_RETURN_INTERMEDIATE_STEPS,
+        handle_parsing_errors=AGENT_HANDLE_PARSING_ERRORS,
+    )
+
+
+def replace_tool(executor: "AgentExecutor", tool: Any) -> None:
+    """Swap the executor's tool of the same name (e.g. python_repl_ast) for another implementation"""
+    for owner in (executor, executor.agent):
+        owner.tools = [tool if existing.name == tool.name else existing for existing in owner.tools]
+
+
+class FrameWatchCallback(BaseCallbackHandler):
+    """Calls on_change when a python_repl_ast step is about to modify `df` in place"""
+
+    def __init__(self, on_change: Callable[[], None]):
+        self.on_change = on_change
+
+    def on_agent_action(self, action: Any, **kwargs: Any) -> None:
+        if getattr(action, "tool", None) != PYTHON_TOOL:
+            return
+        from langchain_experimental.tools.python.tool import sanitize_input
+
+        tool_input = action.tool_input
+        code = tool_input.get("query", "") if isinstance(tool_input, dict) else str(tool_input)
+        if mutates_frame(sanitize_input(code), "df"):
+            self.on_change()
 
 
 class DataVisualizationAgent:
@@ -39,40 +148,199 @@ class DataVisualizationAgent:
     - Pandas DataFrame agent
     """
 
-    def __init__(self, dataframe: pd.DataFrame, api_key: Optional[str] = None):
+    _NO_CACHE = object()
+
+    def __init__(
+        self,
+        dataframe: Union[pd.DataFrame, ChunkedDataset, "DataCatalog", Dict[str, Any]],
+        api_key: Optional[str] = None,
+        cache: Optional[ResponseCache] = _NO_CACHE,
+        execution_mode: str = AGENT_EXECUTION_MODE,
+        llm: Optional[BaseLanguageModel] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        plan_cache: Optional[PlanCache] = _NO_CACHE,
+        repl_backend: str = REPL_BACKEND,
+        approximate: bool = APPROX_MODE,
+        optimize: bool = MEMORY_OPTIMIZE,
+    ):
         """
         Initialize the Data Visualization Agent
 
         Args:
-            dataframe: Pandas DataFrame to analyze
+            dataframe: Pandas DataFrame, a ChunkedDataset for data larger than memory, or a
+                DataCatalog (or dict of table name to path/DataFrame) for several tables
             api_key: OpenRouter API key (uses env var if not provided)
+            cache: Response cache (defaults to CACHE_BACKEND, None disables caching)
+            execution_mode: 'python' to run generated pandas code, 'sql' to query DuckDB
+            llm: Chat model to use instead of the OpenRouter client (e.g. a local fake)
+            metrics: Registry that aggregates per-query metrics (defaults to the process-wide one)
+            plan_cache: Generated-code cache (defaults to PLAN_CACHE_BACKEND, None disables it)
+            repl_backend: 'inprocess' runs generated code in this process, 'subprocess' in a
+                resource-limited sandbox worker (python execution mode only)
+            approximate: Answer from a stratified sample with confidence intervals
+                (in-memory DataFrames only; see set_approximate)
+            optimize: Store the in-memory DataFrame's string columns as Arrow strings, or as
+                categoricals with MEMORY_CATEGORICALS (see data_loader.optimize_memory); the
+                per-column savings are in memory_report
         """
-        self.df = dataframe
+        if execution_mode not in ("python", "sql"):
+            raise ValueError(f"Unknown execution mode: {execution_mode}")
+        if repl_backend not in ("inprocess", "subprocess"):
+            raise ValueError(f"Unknown REPL backend: {repl_backend}")
+        self.catalog = None
+        if not isinstance(dataframe, (pd.DataFrame, ChunkedDataset)):
+            # The catalog and its REPL tool load only for multi-table agents
+            from src.catalog import DataCatalog
+
+            if isinstance(dataframe, dict):
+                dataframe = DataCatalog(dataframe)
+            if isinstance(dataframe, DataCatalog):
+                self.catalog = dataframe
+        self.dataset = dataframe if isinstance(dataframe, ChunkedDataset) else None
+        self.df = dataframe if isinstance(dataframe, pd.DataFrame) else None
+        self.optimize = optimize
+        self.memory_report: List[Dict[str, Any]] = []
+        if self.df is not None and optimize:
+            self.df, self.memory_report = optimize_memory(self.df)
+        self.execution_mode = execution_mode
+        self.repl_backend = repl_backend
+        self.sql_engine: Optional[SQLEngine] = None
+        self.sandbox: Optional["SandboxExecutor"] = None
         self.api_key = api_key or OPENROUTER_API_KEY
 
-        if not self.api_key:
+        if llm is None and not self.api_key:
             raise ValueError("OPENROUTER_API_KEY not found in environment variables")
 
-        # Initialize LLM with OpenRouter
-        self.llm = ChatOpenAI(
-            model_name=MODEL_NAME,
-            temperature=MODEL_TEMPERATURE,
-            max_tokens=MODEL_MAX_TOKENS,
-            openai_api_key=self.api_key,
-            openai_api_base=OPENROUTER_BASE_URL,
-            streaming=True,
-            callbacks=[StreamingStdOutCallbackHandler()],
-        )
+        self.cache = create_cache() if cache is self._NO_CACHE else cache
+        self.plan_cache = create_plan_cache() if plan_cache is self._NO_CACHE else plan_cache
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_saved_seconds = 0.0
+        self._df_fingerprint: Optional[str] = None
+        self._column_fps: Optional[Dict[Any, str]] = None
+        self._pending: List[pd.DataFrame] = []
+        self._data_lock = threading.Lock()
+        # Bumped whenever append/refresh change the data; derived caches key on it
+        self.data_version = 0
+        self.correlations = CorrelationCache()
+        self.metrics = metrics or get_metrics_registry()
+        if self.catalog is not None:
+            # Profiling would load every table; the catalog summarizes file schemas instead
+            self.profile = None
+            self.context_mode = "schema"
+            self.head_tokens = 0
+        elif self.dataset is not None:
+            self.profile = self.dataset.profile()
+            self.context_mode = "schema"
+            self.head_tokens = head_prompt_tokens(self.dataset.head(PROMPT_HEAD_ROWS))
+        else:
+            self.profile = DataFrameProfile.from_dataframe(self.df)
+            self.context_mode = PROMPT_CONTEXT_MODE
+            self.head_tokens = head_prompt_tokens(self.df, PROMPT_HEAD_ROWS)
+        self.token_budget = PROMPT_TOKEN_BUDGET
+        self.rollup: Optional[RollupCube] = None
+        if self.df is not None:
+            self.rollup = create_rollup(self.profile, ROLLUP_MODE)
+            if self.rollup is not None and ROLLUP_MODE == "eager":
+                self.rollup.build(self.df, self.data_version)
+        self.sample: Optional[StratifiedSample] = None
+        self.approximate = False
+        if approximate:
+            if self.df is None:
+                raise ValueError("Approximate mode requires an in-memory DataFrame")
+            self.sample = StratifiedSample.from_profile(self.df, self.profile)
+            self.approximate = True
+
+        # Shared OpenRouter client, reused across agents with the same model settings
+        self.llm = llm or get_llm(self.api_key)
+
+        self._build_agent()
 
-        # Create pandas dataframe agent
-        self.agent = create_pandas_dataframe_agent(
-            self.llm,
-            self.df,
-            verbose=AGENT_VERBOSE,
-            return_intermediate_steps=AGENT_RETURN_INTERMEDIATE_STEPS,
-            handle_parsing_errors=AGENT_HANDLE_PARSING_ERRORS,
-            agent_type=AgentType.OPENAI_FUNCTIONS,
+    def _build_agent(self) -> None:
+        """Create the agent executor and tools for the current data"""
+        if self.catalog is not None:
+            from src.catalog import CATALOG_AGENT_PREFIX, CatalogREPLTool
+
+            self.agent = create_tool_agent(
+                self.llm, [CatalogREPLTool(catalog=self.catalog)] + get_tools(), CATALOG_AGENT_PREFIX
+            )
+        elif self.dataset is not None:
+            # Out-of-core datasets get streaming tools instead of a Python REPL
+            self.agent = create_tool_agent(
+                self.llm, make_dataset_tools(self.dataset) + get_tools(), DATASET_AGENT_PREFIX
+            )
+        elif self.execution_mode == "sql":
+            self.sql_engine = SQLEngine(self._working_df())
+            self.agent = create_tool_agent(
+                self.llm,
+                make_sql_tools(self.sql_engine) + get_tools() + self._frame_tools(),
+                SQL_AGENT_PREFIX,
+            )
+        else:
+            from langchain.agents import AgentType
+            from langchain_experimental.agents.agent_toolkits import create_pandas_dataframe_agent
+
+            # Create pandas dataframe agent
+            self.agent = create_pandas_dataframe_agent(
+                self.llm,
+                self._working_df(),
+                verbose=AGENT_VERBOSE,
+                return_intermediate_steps=AGENT_RETURN_INTERMEDIATE_STEPS,
+                handle_parsing_errors=AGENT_HANDLE_PARSING_ERRORS,
+                agent_type=AgentType.OPENAI_FUNCTIONS,
+                include_df_in_prompt=self.context_mode == "head",
+                number_of_head_rows=PROMPT_HEAD_ROWS,
+                extra_tools=self._frame_tools(),
+            )
+            if self.repl_backend == "subprocess":
+                from src.sandbox import SandboxExecutor, SandboxREPLTool
+
+                if self.sandbox is None:
+                    self.sandbox = SandboxExecutor(self._working_df())
+                else:
+                    self.sandbox.update(self._working_df())
+                replace_tool(self.agent, SandboxREPLTool(executor=self.sandbox))
+
+    def _frame_tools(self) -> List:
+        """Tools that read the agent's in-memory dataframe directly"""
+        tools = make_chart_batch_tools(lambda: self.df) + make_correlation_tools(
+            lambda: self.df, self.correlations, lambda: self.data_version
         )
+        if self.rollup is not None:
+            tools += make_rollup_tools(lambda: self.df, self.rollup, lambda: self.data_version)
+        if self.approximate:
+            tools += make_sampling_tools(lambda: self.sample)
+        return tools
+
+    def _working_df(self) -> pd.DataFrame:
+        """Frame generated code runs on: the stratified sample in approximate mode"""
+        return self.sample.frame if self.approximate else self.df
+
+    def set_approximate(self, enabled: bool) -> None:
+        """
+        Switch approximate mode on, or off to escalate to the full frame
+
+        In approximate mode generated code and SQL see a stratified sample of
+        at most APPROX_SAMPLE_ROWS rows, so latency no longer grows with the
+        data, and an estimate_aggregate tool reports counts, sums and means of
+        the full frame with confidence intervals. Cached answers are kept
+        apart for the two modes.
+
+        Args:
+            enabled: True for sampled answers, False for exact ones
+        """
+        if self.df is None:
+            raise ValueError("Approximate mode requires an in-memory DataFrame")
+        self._sync_data()
+        with self._data_lock:
+            if enabled == self.approximate:
+                return
+            if enabled and self.sample is None:
+                self.sample = StratifiedSample.from_profile(self.df, self.profile)
+            self.approximate = enabled
+            self._column_fps = None
+            # The estimate tool is only offered in approximate mode
+            self._build_agent()
 
     def query(self, question: str) -> Dict[str, Any]:
         """
@@ -84,14 +352,531 @@ class DataVisualizationAgent:
         Returns:
             Dictionary containing the response and intermediate steps
         """
+        self._sync_data()
+        key = self._cache_key(question)
+        cached = self._cache_lookup(key)
+        if cached is not None:
+            return cached
+        planned = self._plan_lookup(question)
+        if planned is not None:
+            return planned
+
+        callback = self._instrumentation()
+        try:
+            start = time.perf_counter()
+            response = self.agent.invoke(
+                self._build_input(question), config={"callbacks": self._callbacks(callback)}
+            )
+            response = self._finalize_response(question, response)
+            response["metrics"] = self._record_metrics(callback, "ok")
+            self._plan_store(question, response)
+            self._cache_store(question, key, response, time.perf_counter() - start)
+            return response
+        except Exception as e:
+            return {
+                "output": f"Error processing query: {str(e)}",
+                "error": str(e),
+                "metrics": self._record_metrics(callback, "error"),
+            }
+
+    async def aquery(self, question: str, timeout: Optional[float] = AGENT_QUERY_TIMEOUT) -> Dict[str, Any]:
+        """
+        Query the agent asynchronously
+
+        Args:
+            question: Natural language question about the data
+            timeout: Seconds to wait for the agent before giving up (None waits forever)
+
+        Returns:
+            Dictionary containing the response and intermediate steps
+        """
+        self._sync_data()
+        key = self._cache_key(question)
+        cached = self._cache_lookup(key)
+        if cached is not None:
+            return cached
+        planned = self._plan_lookup(question)
+        if planned is not None:
+            return planned
+
+        callback = self._instrumentation()
         try:
-            response = self.agent.invoke({"input": question})
+            start = time.perf_counter()
+            response = await asyncio.wait_for(
+                self.agent.ainvoke(
+                    self._build_input(question), config={"callbacks": self._callbacks(callback)}
+                ),
+                timeout,
+            )
+            response = self._finalize_response(question, response)
+            response["metrics"] = self._record_metrics(callback, "ok")
+            self._plan_store(question, response)
+            self._cache_store(question, key, response, time.perf_counter() - start)
             return response
+        except asyncio.TimeoutError:
+            return {
+                "output": f"Error processing query: timed out after {timeout} seconds",
+                "error": "timeout",
+                "metrics": self._record_metrics(callback, "timeout"),
+            }
         except Exception as e:
             return {
                 "output": f"Error processing query: {str(e)}",
-                "error": str(e)
+                "error": str(e),
+                "metrics": self._record_metrics(callback, "error"),
+            }
+
+    async def astream_query(
+        self, question: str, timeout: Optional[float] = AGENT_QUERY_TIMEOUT
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Query the agent, yielding progress events as they happen
+
+        Events are dicts with a "type" of 'token' (text chunk), 'tool_start'
+        (tool name and the code or SQL it runs), 'tool_end' (tool output),
+        'chart' (path of a rendered chart), 'error', and finally 'final' with
+        the same response dict aquery returns. Tokens are not echoed to stdout.
+
+        Args:
+            question: Natural language question about the data
+            timeout: Seconds to wait for the agent before giving up (None waits forever)
+
+        Yields:
+            Event dictionaries, ending with the 'final' event
+        """
+        self._sync_data()
+        key = self._cache_key(question)
+        cached = self._cache_lookup(key)
+        cached = cached if cached is not None else self._plan_lookup(question)
+        if cached is not None:
+            yield {"type": "final", "response": cached}
+            return
+
+        queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+        callback = self._instrumentation()
+        start = time.perf_counter()
+        task = asyncio.ensure_future(self.agent.ainvoke(
+            self._build_input(question),
+            config={"callbacks": [StreamEventCallback(queue), callback, FrameWatchCallback(self._frame_modified)]},
+        ))
+        done = object()
+        task.add_done_callback(lambda _: queue.put_nowait(done))
+        deadline = None if timeout is None else start + timeout
+
+        try:
+            while True:
+                remaining = None if deadline is None else deadline - time.perf_counter()
+                event = await asyncio.wait_for(queue.get(), remaining)
+                if event is done:
+                    break
+                yield event
+            response = self._finalize_response(question, task.result())
+            response["metrics"] = self._record_metrics(callback, "ok")
+            self._plan_store(question, response)
+            self._cache_store(question, key, response, time.perf_counter() - start)
+        except asyncio.TimeoutError:
+            response = {
+                "output": f"Error processing query: timed out after {timeout} seconds",
+                "error": "timeout",
+                "metrics": self._record_metrics(callback, "timeout"),
+            }
+        except Exception as e:
+            response = {
+                "output": f"Error processing query: {str(e)}",
+                "error": str(e),
+                "metrics": self._record_metrics(callback, "error"),
             }
+        finally:
+            # Also runs when the consumer stops iterating early
+            if not task.done():
+                task.cancel()
+        yield {"type": "final", "response": response}
+
+    async def aquery_many(
+        self,
+        questions: List[str],
+        max_concurrency: int = AGENT_MAX_CONCURRENCY,
+        timeout: Optional[float] = AGENT_QUERY_TIMEOUT,
+    ) -> List[Dict[str, Any]]:
+        """
+        Run several questions concurrently
+
+        Args:
+            questions: Natural language questions about the data
+            max_concurrency: Maximum number of queries in flight at once
+            timeout: Per-query timeout in seconds
+
+        Returns:
+            Responses in the same order as the questions
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(question: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.aquery(question, timeout=timeout)
+
+        return await asyncio.gather(*(run(question) for question in questions))
+
+    def query_many(
+        self,
+        questions: List[str],
+        max_concurrency: int = AGENT_MAX_CONCURRENCY,
+        timeout: Optional[float] = AGENT_QUERY_TIMEOUT,
+    ) -> List[Dict[str, Any]]:
+        """
+        Run several questions concurrently from synchronous code
+
+        Must not be called from inside a running event loop; use aquery_many there.
+
+        Args:
+            questions: Natural language questions about the data
+            max_concurrency: Maximum number of queries in flight at once
+            timeout: Per-query timeout in seconds
+
+        Returns:
+            Responses in the same order as the questions
+        """
+        return asyncio.run(self.aquery_many(questions, max_concurrency, timeout))
+
+    def _build_input(self, question: str) -> Dict[str, str]:
+        """Build agent input, prepending the compact schema context in schema mode"""
+        notice = ""
+        if self.approximate:
+            notice = (
+                f"Note: df is a stratified sample of {len(self.sample)} of {self.sample.total_rows} rows. "
+                "Report counts, sums and means from estimate_aggregate, with their confidence intervals.\n\n"
+            )
+        if self.context_mode != "schema":
+            return {"input": f"{notice}{question}" if notice else question}
+        if self.catalog is not None:
+            context = self.catalog.schema_context(question, self.token_budget)
+        else:
+            context = build_schema_context(self.profile, question, self.token_budget)
+        return {"input": f"{notice}{context}\n\nQuestion: {question}"}
+
+    def _finalize_response(self, question: str, response: Dict[str, Any]) -> Dict[str, Any]:
+        """Restore the original question and report prompt context size"""
+        agent_input = response.get("input", question)
+        response["input"] = question
+        response["context_tokens"] = {
+            "mode": self.context_mode,
+            "head": self.head_tokens,
+            "schema": estimate_tokens(agent_input) - estimate_tokens(question)
+            if self.context_mode == "schema" else 0,
+        }
+        if self.approximate:
+            response["approximate"] = self.sample.describe()
+        return response
+
+    def _instrumentation(self) -> InstrumentationCallback:
+        """Per-query instrumentation, with sandbox exec time and peak RSS on REPL spans"""
+        return InstrumentationCallback(self.sandbox.pop_stats if self.sandbox is not None else None)
+
+    def _callbacks(self, callback: InstrumentationCallback) -> List[Any]:
+        """Per-call callbacks for blocking queries; tokens echo to stdout only here"""
+        if AGENT_STREAM_STDOUT:
+            return [callback, FrameWatchCallback(self._frame_modified), StreamingStdOutCallbackHandler()]
+        return [callback, FrameWatchCallback(self._frame_modified)]
+
+    def _frame_modified(self) -> None:
+        """
+        Generated code edited the frame in place: invalidate state derived from it
+
+        Bumping the data version makes the rollup cube rebuild on its next lookup
+        instead of every lookup rescanning the rows to detect edits.
+        """
+        with self._data_lock:
+            self.data_version += 1
+            self._column_fps = None
+
+    def _record_metrics(self, callback: InstrumentationCallback, outcome: str) -> Dict[str, Any]:
+        """Close a query's spans, aggregate them and export if METRICS_FILE is set"""
+        metrics = callback.finish()
+        self.metrics.record_query(metrics, outcome)
+        if METRICS_FILE:
+            try:
+                self.metrics.write_prometheus(METRICS_FILE)
+            except OSError as e:
+                logger.warning("Could not write metrics to %s: %s", METRICS_FILE, e)
+        return metrics
+
+    def _plans_enabled(self) -> bool:
+        return self.plan_cache is not None and self.df is not None and self.execution_mode == "python"
+
+    def _plan_lookup(self, question: str) -> Optional[Dict[str, Any]]:
+        """Answer by replaying cached generated code, or None to fall back to the agent"""
+        if not self._plans_enabled():
+            return None
+        df = self._working_df()
+        snippets = self.plan_cache.lookup(question, df)
+        if snippets is None:
+            return None
+        callback = self._instrumentation()
+        namespace: Dict[str, Any] = {}
+        steps, outputs = [], []
+        try:
+            for code in snippets:
+                # Each snippet is a tool span, as when the agent ran it
+                run_id = uuid.uuid4()
+                callback.on_tool_start({"name": PYTHON_TOOL}, code, run_id=run_id)
+                if self.sandbox is not None:
+                    result = self.sandbox.run(code, key=run_id)
+                    if is_tool_error(result):
+                        raise RuntimeError(result)
+                else:
+                    result = execute_code(code, df, namespace)
+                if isinstance(result, (pd.DataFrame, pd.Series)):
+                    output = result.to_string(max_rows=TOOL_OUTPUT_MAX_ROWS)
+                else:
+                    output = "" if result is None else str(result)
+                callback.on_tool_end(output, run_id=run_id)
+                action = AgentAction(tool=PYTHON_TOOL, tool_input={"query": code}, log="Reused cached plan\n")
+                steps.append((action, result))
+                if output:
+                    outputs.append(output)
+                if mutates_frame(code, "df"):
+                    self._frame_modified()
+        except Exception as e:
+            self.plan_cache.failures += 1
+            logger.info("Cached plan failed (%s: %s); falling back to the agent", type(e).__name__, e)
+            return None
+        self.plan_cache.hits += 1
+        metrics = self._record_metrics(callback, "plan")
+        return {
+            "input": question,
+            "output": "\n".join(outputs),
+            "intermediate_steps": steps,
+            "plan_cached": True,
+            "elapsed_s": metrics["total_s"],
+            "metrics": metrics,
+        }
+
+    def _plan_store(self, question: str, response: Dict[str, Any]) -> None:
+        """Remember every successful snippet of an agent run"""
+        if not self._plans_enabled():
+            return
+        snippets = plan_snippets(response.get("intermediate_steps", []))
+        if snippets:
+            self.plan_cache.store(question, self._working_df(), snippets)
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get response, plan, correlation and chart cache hit/miss counters and latency saved by hits"""
+        plans = self.plan_cache
+        charts = get_chart_store() if CHART_CACHE else None
+        return {
+            "enabled": self.cache is not None,
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "saved_seconds": self.cache_saved_seconds,
+            "entries": len(self.cache) if self.cache is not None else 0,
+            "plans": {
+                "enabled": plans is not None,
+                "hits": plans.hits if plans is not None else 0,
+                "misses": plans.misses if plans is not None else 0,
+                "failures": plans.failures if plans is not None else 0,
+                "entries": len(plans) if plans is not None else 0,
+            },
+            "correlations": {"hits": self.correlations.hits, "misses": self.correlations.misses},
+            "charts": {
+                "enabled": charts is not None,
+                "hits": charts.hits if charts is not None else 0,
+                "misses": charts.misses if charts is not None else 0,
+            },
+        }
+
+    def _cache_key(self, question: str) -> Optional[str]:
+        """
+        Build the cache key for a question against the current data
+
+        For in-memory dataframes the key covers only the columns the question's
+        last answer depended on, so appending or refreshing unrelated columns
+        keeps its entry valid.
+        """
+        if self.cache is None:
+            return None
+        if self.df is not None:
+            if self._column_fps is None:
+                self._column_fps = column_fingerprints(self.df)
+            columns = self.cache.get_dependencies(self._deps_key(question)) or list(self.df.columns)
+            return make_cache_key(question, MODEL_NAME, MODEL_TEMPERATURE, self._columns_fingerprint(columns))
+        if self._df_fingerprint is None:
+            if self.catalog is not None:
+                self._df_fingerprint = self.catalog.fingerprint()
+            else:
+                self._df_fingerprint = self.dataset.fingerprint()
+        return make_cache_key(question, MODEL_NAME, MODEL_TEMPERATURE, self._df_fingerprint)
+
+    def _columns_fingerprint(self, columns: List[Any]) -> str:
+        """Fingerprint of the given columns, distinct for sampled answers"""
+        fingerprint = combine_fingerprints(self._column_fps, columns)
+        return f"{fingerprint}:sample{self.sample.size}" if self.approximate else fingerprint
+
+    def _deps_key(self, question: str) -> str:
+        """Cache key of the columns a question's cached response depends on"""
+        return make_cache_key(question, MODEL_NAME, MODEL_TEMPERATURE, schema_fingerprint(self.df))
+
+    def _response_columns(self, response: Dict[str, Any]) -> List[Any]:
+        """
+        Columns the code or SQL behind a response referenced
+
+        Falls back to every column whenever the analysis is uncertain: a step
+        uses the frame other than through explicit column selections (see
+        column_dependencies), does not parse, runs a tool that reads the frame
+        itself (create_charts, correlations, rollups, estimates), or no step
+        names a column at all.
+        """
+        from langchain_experimental.tools.python.tool import sanitize_input
+
+        columns = list(self.df.columns)
+        used = set()
+        for action, _ in response.get("intermediate_steps", []):
+            tool_input = getattr(action, "tool_input", "")
+            code = tool_input.get("query", "") if isinstance(tool_input, dict) else str(tool_input)
+            if action.tool == PYTHON_TOOL:
+                try:
+                    found = column_dependencies(sanitize_input(code), "df", columns)
+                except SyntaxError:
+                    return columns
+            elif action.tool == "run_sql":
+                if "*" in code:
+                    return columns
+                found = {c for c in columns if re.search(rf"\b{re.escape(str(c))}\b", code, re.IGNORECASE)}
+            elif action.tool in _DATA_FREE_TOOLS:
+                continue  # Chart tools draw the literal data they are given
+            else:
+                return columns
+            if found is None:
+                return columns
+            used |= found
+        return [c for c in columns if c in used] if used else columns
+
+    def _cache_lookup(self, key: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Return a cached response and update counters"""
+        if key is None:
+            return None
+        entry = self.cache.get(key)
+        if entry is None:
+            self.cache_misses += 1
+            return None
+        self.cache_hits += 1
+        self.metrics.inc("agent_queries_total", outcome="cached")
+        self.cache_saved_seconds += entry["elapsed"]
+        logger.debug("Cache hit for key %s", key)
+        return dict(entry["response"], cached=True)
+
+    def _cache_store(self, question: str, key: Optional[str], response: Dict[str, Any], elapsed: float) -> None:
+        """Store a successful response; generated code may have mutated the dataframe"""
+        if key is None:
+            return
+        if self.df is not None and self._column_fps is not None:
+            # Re-key on the columns this answer actually used, hashed as they were before the run
+            columns = self._response_columns(response)
+            self.cache.set_dependencies(self._deps_key(question), columns)
+            key = make_cache_key(question, MODEL_NAME, MODEL_TEMPERATURE, self._columns_fingerprint(columns))
+        self.cache.set(key, {"response": response, "elapsed": elapsed})
+        self._df_fingerprint = None
+        self._column_fps = None
+
+    def append(self, rows: Union[pd.DataFrame, Dict[str, Any], List[Dict[str, Any]]]) -> None:
+        """
+        Add rows to the agent's dataframe without rebuilding the agent
+
+        Rows are buffered and folded into the frame with a single concat before
+        the next query, so frequent small appends do not each copy the frame.
+        The flush itself still copies the whole frame (and, when enabled,
+        re-optimizes it and rewrites the sandbox's shared copy), so the cost is
+        amortized over the appends between two queries, not over every row
+        ever appended.
+        Summary statistics are updated from the new rows alone, and cached
+        responses stay valid unless they depend on a column the rows change.
+
+        Args:
+            rows: DataFrame, dict of columns or list of records with the same columns as the data
+        """
+        if self.df is None:
+            raise ValueError("append requires an agent over an in-memory DataFrame")
+        if not isinstance(rows, pd.DataFrame):
+            rows = pd.DataFrame(rows)
+        if set(rows.columns) != set(self.df.columns):
+            raise ValueError("Appended rows must have the same columns as the dataframe")
+        if rows.empty:
+            return
+        rows = rows[list(self.df.columns)]
+        with self._data_lock:
+            self.profile.update(rows)
+            self._pending.append(rows)
+            self._column_fps = None
+
+    def refresh(self, source: Union[str, pd.DataFrame]) -> None:
+        """
+        Replace the agent's data, keeping the LLM client, caches and settings
+
+        Args:
+            source: New DataFrame, or a path/URL understood by load_dataset
+        """
+        if self.df is None:
+            raise ValueError("refresh requires an agent over an in-memory DataFrame")
+        df = source if isinstance(source, pd.DataFrame) else load_dataset(source)
+        if self.optimize:
+            df, self.memory_report = optimize_memory(df)
+        with self._data_lock:
+            self._pending = []
+            self.df = df
+            self.data_version += 1
+            self.profile = DataFrameProfile.from_dataframe(df)
+            self.head_tokens = head_prompt_tokens(df, PROMPT_HEAD_ROWS)
+            self._column_fps = None
+            dimensions = None
+            if self.rollup is not None:
+                dimensions = self.rollup.dimensions
+                self.rollup.reset(self.profile)
+                if ROLLUP_MODE == "eager":
+                    self.rollup.build(df, self.data_version)
+            self.sample = StratifiedSample.from_profile(df, self.profile) if self.approximate else None
+            if self.context_mode == "head" or (dimensions is not None and dimensions != self.rollup.dimensions):
+                # The prompt embeds the head of the frame, or tool descriptions list its columns
+                self._build_agent()
+            else:
+                self._bind_data()
+
+    def _sync_data(self) -> None:
+        """Fold buffered appends into the dataframe and rebind it in the tools"""
+        if not self._pending:
+            return
+        with self._data_lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, []
+            start = len(self.df)
+            rollup_current = self.rollup is not None and self.rollup.is_current(self.df, self.data_version)
+            self.df = pd.concat(
+                [self.df] + pending, ignore_index=isinstance(self.df.index, pd.RangeIndex)
+            )
+            if self.optimize:
+                # Appended rows widen converted columns back to object; shrink again
+                self.df, _ = optimize_memory(self.df)
+            self.data_version += 1
+            # The profile was updated from the rows alone; record what it now describes
+            self._column_fps = self.profile.fingerprints = column_fingerprints(self.df)
+            if rollup_current:
+                # Partials are additive: fold in just the new rows instead of rebuilding
+                self.rollup.extend(pd.concat(pending), self.df, self.data_version)
+            if self.sample is not None:
+                self.sample.extend(self.df, start)
+            self._bind_data()
+
+    def _bind_data(self) -> None:
+        """Point the REPL, SQL engine or sandbox at the current dataframe (or its sample)"""
+        from langchain_experimental.tools.python.tool import PythonAstREPLTool
+
+        df = self._working_df()
+        for tool in self.agent.tools:
+            if isinstance(tool, PythonAstREPLTool):
+                tool.locals["df"] = df
+        if self.sql_engine is not None:
+            self.sql_engine.register(df)
+        if self.sandbox is not None:
+            self.sandbox.update(df)
 
     def analyze_data(self, question: str) -> str:
         """
@@ -107,14 +892,17 @@ class DataVisualizationAgent:
         return response.get("output", "No output generated")
 
     def get_data_summary(self) -> Dict[str, Any]:
-        """Get summary statistics of the dataframe"""
-        return {
-            "shape": self.df.shape,
-            "columns": list(self.df.columns),
-            "dtypes": self.df.dtypes.to_dict(),
-            "missing_values": self.df.isnull().sum().to_dict(),
-            "describe": self.df.describe().to_dict(),
-        }
+        """Get summary statistics of the dataframe from the cached profile"""
+        if self.catalog is not None:
+            return self.catalog.summary()
+        if self.dataset is not None:
+            return self.profile.summary()
+        self._sync_data()
+        if not self.profile.matches(self.df):
+            # Generated code edited the frame; rebuild rather than serve stale stats
+            self._frame_modified()
+            self.profile = DataFrameProfile.from_dataframe(self.df)
+        return self.profile.summary()
 
     def get_intermediate_steps(self, response: Dict) -> List:
         """Extract intermediate steps from agent response"""
@@ -130,16 +918,21 @@ class DataVisualizationAgent:
         return None
 
 
-def create_agent(dataframe: pd.DataFrame, api_key: Optional[str] = None) -> DataVisualizationAgent:
+def create_agent(
+    dataframe: Union[pd.DataFrame, ChunkedDataset, "DataCatalog", Dict[str, Any]],
+    api_key: Optional[str] = None,
+    **kwargs: Any,
+) -> DataVisualizationAgent:
     """
     Factory function to create a Data Visualization Agent
 
     Args:
-        dataframe: Pandas DataFrame to analyze
+        dataframe: Pandas DataFrame, ChunkedDataset, or DataCatalog / dict of named tables
         api_key: OpenRouter API key
+        **kwargs: Extra options forwarded to DataVisualizationAgent (e.g. cache, execution_mode)
 
     Returns:
         Initialized DataVisualizationAgent instance
     """
-    return DataVisualizationAgent(dataframe, api_key)
+    return DataVisualizationAgent(dataframe, api_key, **kwargs)
 
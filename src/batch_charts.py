@@ -0,0 +1,262 @@
+"""
+Batch chart tool for Data Visualization Agent
+Renders several charts in one tool call straight from the agent's dataframe:
+specs that share grouping columns are aggregated together in a single
+groupby, and the figures are rendered in parallel, so a dashboard question
+costs one agent turn instead of one per chart
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+from langchain.tools import StructuredTool
+
+from src.chart_store import get_chart_store
+from src.config import (
+    CHART_BATCH_MAX_CHARTS,
+    CHART_BATCH_THREADS,
+    CHART_CACHE,
+    RENDER_BACKEND,
+    RENDER_TIMEOUT,
+)
+
+CHART_KINDS = ("bar", "line", "scatter", "heatmap")
+BATCH_AGGREGATIONS = ("count", "sum", "mean", "min", "max")
+
+
+def normalize_spec(spec: Dict[str, Any], columns: List[Any]) -> Dict[str, Any]:
+    """
+    Validate a chart spec against the dataframe and fill in defaults
+
+    Args:
+        spec: Dict with kind, x, and optionally y, group_by, agg, title, xlabel, ylabel
+        columns: Columns of the dataframe the chart is drawn from
+
+    Returns:
+        Complete spec
+    """
+    kind = spec.get("kind")
+    if kind not in CHART_KINDS:
+        raise ValueError(f"Unknown chart kind: {kind} (expected one of {', '.join(CHART_KINDS)})")
+    x, y, group_by = spec.get("x"), spec.get("y"), spec.get("group_by")
+    agg = spec.get("agg") or ("mean" if y is not None else "count")
+    for name in (x, y, group_by):
+        if name is not None and name not in columns:
+            raise ValueError(f"Unknown column: {name}")
+    if x is None:
+        raise ValueError(f"A {kind} chart needs an x column")
+    if agg not in BATCH_AGGREGATIONS:
+        raise ValueError(f"Unknown aggregation: {agg} (expected one of {', '.join(BATCH_AGGREGATIONS)})")
+    if agg != "count" and y is None:
+        raise ValueError(f"Aggregation {agg} needs a y column")
+    if kind == "scatter" and y is None:
+        raise ValueError("A scatter plot needs a y column")
+    if kind == "heatmap" and group_by is None:
+        raise ValueError("A heatmap needs a group_by column for its second axis")
+
+    value = "count" if y is None else f"{agg} of {y}"
+    return {
+        "kind": kind,
+        "x": x,
+        "y": y,
+        "group_by": group_by,
+        "agg": agg,
+        "title": spec.get("title") or (f"{y} vs {x}" if kind == "scatter" else f"{value} by {x}"),
+        "xlabel": spec.get("xlabel") or str(x),
+        "ylabel": spec.get("ylabel") or (str(group_by) if kind == "heatmap" else str(y or value)),
+    }
+
+
+def _grouping(spec: Dict[str, Any]) -> Optional[Tuple[Any, ...]]:
+    """Columns a spec groups by, or None when it plots raw rows"""
+    if spec["kind"] == "scatter":
+        return None
+    if spec["group_by"] is not None:
+        return (spec["x"], spec["group_by"])
+    return (spec["x"],)
+
+
+def _measure(spec: Dict[str, Any]) -> str:
+    return "__rows__" if spec["y"] is None else f"{spec['y']}__{spec['agg']}"
+
+
+def compute_aggregates(df: pd.DataFrame, specs: List[Dict[str, Any]]) -> Dict[Tuple[Any, ...], pd.DataFrame]:
+    """
+    Compute every aggregate the specs need, one groupby per distinct grouping
+
+    Args:
+        df: Source dataframe
+        specs: Normalized chart specs
+
+    Returns:
+        Grouping columns to a frame with one column per measure (see _measure)
+    """
+    needed: Dict[Tuple[Any, ...], Dict[str, pd.NamedAgg]] = {}
+    for spec in specs:
+        keys = _grouping(spec)
+        if keys is None:
+            continue
+        column = spec["y"] if spec["y"] is not None else keys[0]
+        aggfunc = "size" if spec["y"] is None else spec["agg"]
+        needed.setdefault(keys, {})[_measure(spec)] = pd.NamedAgg(column=column, aggfunc=aggfunc)
+
+    return {
+        keys: df.groupby(list(keys), observed=True, sort=True).agg(**measures)
+        for keys, measures in needed.items()
+    }
+
+
+def _render_spec(df: pd.DataFrame, spec: Dict[str, Any], aggregates: Dict) -> Tuple[str, Dict[str, Any]]:
+    """Turn a chart spec and its aggregates into a renderer kind and arguments"""
+    labels = {"title": spec["title"], "xlabel": spec["xlabel"], "ylabel": spec["ylabel"]}
+    if spec["kind"] == "scatter":
+        rows = df[[spec["x"], spec["y"]]].dropna()
+        return "scatter", dict(labels, x_data=rows[spec["x"]].tolist(), y_data=rows[spec["y"]].tolist())
+
+    series = aggregates[_grouping(spec)][_measure(spec)]
+    if spec["kind"] == "bar":
+        return "bar", dict(labels, data={str(k): float(v) for k, v in series.items()})
+    if spec["kind"] == "line":
+        if spec["group_by"] is None:
+            return "line", dict(labels, data={spec["ylabel"]: series.astype(float).tolist()})
+        # Every group shares the sorted union of x values; missing points stay NaN so that
+        # each value keeps its x position instead of shifting left (draw_line skips NaN)
+        table = series.unstack(spec["group_by"])
+        data = {str(name): table[name].astype(float).tolist() for name in table.columns}
+        return "line", dict(labels, data=data)
+    # Heatmap: rows are group_by values, columns are x values
+    table = series.unstack(spec["x"])
+    return "heatmap", dict(
+        labels,
+        matrix=table.astype(float).values.tolist(),
+        row_labels=[str(v) for v in table.index],
+        col_labels=[str(v) for v in table.columns],
+    )
+
+
+def render_batch(jobs: List[Tuple[str, Dict[str, Any]]]) -> List[Any]:
+    """
+    Render charts concurrently
+
+    Args:
+        jobs: (kind, renderer arguments) pairs
+
+    Returns:
+        ChartResult or the exception raised, per job, in order
+    """
+    store = get_chart_store() if CHART_CACHE else None
+    if RENDER_BACKEND == "process":
+        from src.render_service import get_render_service
+
+        service = get_render_service()
+        submitted = []
+        for kind, spec in jobs:
+            try:
+                cached = store.lookup(kind, spec) if store is not None else None
+                submitted.append(cached or service.submit(kind, spec, store.path_for(kind, spec) if store else None))
+            except Exception as e:
+                submitted.append(e)
+        results = []
+        for job in submitted:
+            try:
+                if hasattr(job, "future"):
+                    job = job.result(RENDER_TIMEOUT)
+                    if store is not None:
+                        store.record(job.path)
+                results.append(job)
+            except Exception as e:
+                results.append(e)
+        return results
+
+    from src.rendering import render_chart
+
+    def render(job: Tuple[str, Dict[str, Any]]) -> Any:
+        try:
+            return store.render(*job) if store is not None else render_chart(*job)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=max(1, min(CHART_BATCH_THREADS, len(jobs)))) as pool:
+        return list(pool.map(render, jobs))
+
+
+def create_charts_from_frame(df: pd.DataFrame, charts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Render a batch of chart specs against a dataframe
+
+    Args:
+        df: Source dataframe
+        charts: Chart specs (see normalize_spec)
+
+    Returns:
+        Manifest with one entry per chart: kind, title and path, plus note or error
+    """
+    if not charts:
+        raise ValueError("No charts requested")
+    if len(charts) > CHART_BATCH_MAX_CHARTS:
+        raise ValueError(f"At most {CHART_BATCH_MAX_CHARTS} charts per call")
+    columns = list(df.columns)
+    specs = [normalize_spec(chart, columns) for chart in charts]
+    aggregates = compute_aggregates(df, specs)
+    jobs = [_render_spec(df, spec, aggregates) for spec in specs]
+
+    manifest = []
+    for spec, result in zip(specs, render_batch(jobs)):
+        entry = {"kind": spec["kind"], "title": spec["title"]}
+        if isinstance(result, Exception):
+            entry["error"] = f"{type(result).__name__}: {result}"
+        else:
+            entry["path"] = result.path
+            if result.note:
+                entry["note"] = result.note
+        manifest.append(entry)
+    return manifest
+
+
+def format_manifest(manifest: List[Dict[str, Any]]) -> str:
+    """Describe rendered charts in the "saved as '<path>'" form other chart tools use"""
+    rendered = sum(1 for entry in manifest if "path" in entry)
+    lines = [f"Rendered {rendered} of {len(manifest)} charts:"]
+    for number, entry in enumerate(manifest, 1):
+        label = f"{number}. {entry['kind'].capitalize()} chart '{entry['title']}'"
+        if "error" in entry:
+            lines.append(f"{label} failed: {entry['error']}")
+        else:
+            line = f"{label} saved as '{entry['path']}'"
+            if "note" in entry:
+                line += f" (downsampled: {entry['note']})"
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def make_chart_batch_tools(get_df: Callable[[], pd.DataFrame]) -> List[StructuredTool]:
+    """
+    Build the batch chart tool for an agent's dataframe
+
+    Args:
+        get_df: Returns the dataframe to chart (called per invocation, so appends are seen)
+
+    Returns:
+        List of LangChain tools
+    """
+
+    def create_charts(charts: List[Dict[str, Any]]) -> str:
+        try:
+            return format_manifest(create_charts_from_frame(get_df(), charts))
+        except Exception as e:
+            return f"Error creating charts: {str(e)}"
+
+    return [
+        StructuredTool.from_function(
+            create_charts,
+            name="create_charts",
+            description=(
+                "Render several charts from the dataframe `df` in one call; prefer this over "
+                "computing data yourself whenever more than one chart is needed. charts is a list "
+                f"of specs with kind ({', '.join(CHART_KINDS)}), x (column), optional y (column), "
+                f"optional agg ({', '.join(BATCH_AGGREGATIONS)}; default mean, or count without y), "
+                "optional group_by (column; one line per group, or the heatmap's second axis), "
+                "and optional title, xlabel and ylabel. Scatter plots use raw x/y rows."
+            ),
+        ),
+    ]
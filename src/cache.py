@@ -0,0 +1,410 @@
+"""
+Response cache for Data Visualization Agent
+Caches agent responses keyed on normalized question text, model settings
+and a content hash of the dataframe, with in-memory and SQLite backends
+"""
+import ast
+import hashlib
+import json
+import pickle
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set
+
+import pandas as pd
+
+from src.config import (
+    CACHE_BACKEND,
+    CACHE_MAX_ENTRIES,
+    CACHE_TTL_SECONDS,
+    CACHE_SQLITE_PATH,
+)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCT_RE = re.compile(r"[\s?.!]+$")
+
+# Frame and Series methods that modify their object without inplace=True
+_MUTATING_METHODS = {"insert", "pop", "update", "__setitem__", "__delitem__"}
+
+
+def normalize_question(question: str) -> str:
+    """Normalize question text so trivially different phrasings share a key"""
+    text = _WHITESPACE_RE.sub(" ", question.strip().lower())
+    return _TRAILING_PUNCT_RE.sub("", text)
+
+
+def dataframe_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Compute a content hash of a dataframe
+
+    Args:
+        df: DataFrame to fingerprint
+
+    Returns:
+        Hex digest that changes whenever values, columns or dtypes change
+    """
+    digest = hashlib.sha256()
+    digest.update(repr(list(df.columns)).encode())
+    digest.update(repr([str(dtype) for dtype in df.dtypes]).encode())
+    try:
+        row_hashes = pd.util.hash_pandas_object(df, index=True).values
+        digest.update(row_hashes.tobytes())
+    except TypeError:
+        # Unhashable cell values (lists, dicts); fall back to a full pickle
+        digest.update(pickle.dumps(df))
+    return digest.hexdigest()
+
+
+def column_fingerprints(df: pd.DataFrame) -> Dict[Any, str]:
+    """
+    Content hash of each column, so cache entries can depend on a subset of columns
+
+    Args:
+        df: DataFrame to fingerprint
+
+    Returns:
+        Column name to hex digest of its name, dtype and values
+    """
+    fingerprints = {}
+    for name, column in df.items():
+        digest = hashlib.sha256(repr((str(name), str(column.dtype))).encode())
+        try:
+            digest.update(pd.util.hash_pandas_object(column, index=False).values.tobytes())
+        except TypeError:
+            digest.update(pickle.dumps(column))
+        fingerprints[name] = digest.hexdigest()
+    return fingerprints
+
+
+def combine_fingerprints(fingerprints: Dict[Any, str], columns: List[Any]) -> str:
+    """Single fingerprint for the columns a cached response depends on"""
+    payload = json.dumps([[str(name), fingerprints.get(name, "missing")] for name in columns])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _constant_columns(node: ast.AST) -> Optional[List[Any]]:
+    """Column labels of a literal selection ('a' or ['a', 'b']), or None"""
+    if isinstance(node, ast.Constant) and isinstance(node.value, (str, int)):
+        return [node.value]
+    if isinstance(node, (ast.List, ast.Tuple)) and node.elts:
+        values = [_constant_columns(element) for element in node.elts]
+        if all(value is not None and len(value) == 1 for value in values):
+            return [value[0] for value in values]
+    return None
+
+
+def column_dependencies(code: str, name: str, columns: List[Any]) -> Optional[Set[Any]]:
+    """
+    Columns of a frame a snippet's result can depend on, or None for all of them
+
+    Stricter than catalog.referenced_columns: every read of the frame must end in an
+    explicit column selection, optionally after row filters (df[mask],
+    df.loc[mask]) or a groupby on literal keys, e.g. df[df['a'] > 1]['b'].sum()
+    or df.groupby('a')['b'].mean(). Anything else, such as df.groupby('a').mean(),
+    len(df), passing df to a function or aliasing it, needs the whole frame.
+
+    Args:
+        code: Python source
+        name: Variable the frame is bound to
+        columns: Columns of the frame
+
+    Returns:
+        Set of columns, or None when the analysis cannot rule any column out
+    """
+    tree = ast.parse(code)
+    parents = {child: node for node in ast.walk(tree) for child in ast.iter_child_nodes(node)}
+    known = {str(c): c for c in columns}
+    used: Set[Any] = set()
+
+    def select(labels: Optional[List[Any]]) -> bool:
+        if labels is None:
+            return False
+        used.update(known[str(label)] for label in labels if str(label) in known)
+        return True
+
+    for node in ast.walk(tree):
+        if not (isinstance(node, ast.Name) and node.id == name and isinstance(node.ctx, ast.Load)):
+            continue
+        current, grouped = node, False
+        while True:
+            parent = parents.get(current)
+            if isinstance(parent, ast.Subscript) and parent.value is current:
+                if isinstance(parent.ctx, (ast.Store, ast.Del)):
+                    break  # df['new'] = ... writes; the right-hand side is analyzed on its own
+                if select(_constant_columns(parent.slice)):
+                    break
+                if grouped or isinstance(parent.slice, (ast.Slice, ast.Constant)):
+                    return None
+                current = parent  # boolean mask: rows are filtered, every column remains
+            elif isinstance(parent, ast.Attribute) and parent.value is current and not grouped:
+                if parent.attr in known:
+                    select([parent.attr])
+                    break
+                call = parents.get(parent)
+                if parent.attr == "loc" and isinstance(call, ast.Subscript) and call.value is parent:
+                    index = call.slice
+                    if isinstance(index, ast.Tuple) and len(index.elts) == 2:
+                        if not select(_constant_columns(index.elts[1])):
+                            return None
+                        break
+                    current = call
+                elif parent.attr == "groupby" and isinstance(call, ast.Call) and call.func is parent:
+                    keys = call.args[0] if call.args else next(
+                        (k.value for k in call.keywords if k.arg == "by"), None
+                    )
+                    if keys is None or not select(_constant_columns(keys)):
+                        return None
+                    current, grouped = call, True
+                else:
+                    return None
+            else:
+                return None
+    return used
+
+
+def mutates_frame(code: str, name: str) -> bool:
+    """
+    Whether a snippet may modify a frame in place
+
+    Counts assignments and deletions through the frame or anything selected
+    from it (df['a'] = ..., df.loc[m, 'a'] = ..., df['a'] += 1, del df['a']),
+    the mutating methods insert, pop and update, and inplace=True calls.
+    Rebinding the name (df = df.dropna()) leaves the frame itself unchanged.
+
+    Args:
+        code: Python source
+        name: Variable the frame is bound to
+
+    Returns:
+        True when the frame may have been modified
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return False
+
+    def rooted(node: ast.AST) -> bool:
+        while isinstance(node, (ast.Subscript, ast.Attribute, ast.Call)):
+            node = node.func if isinstance(node, ast.Call) else node.value
+        return isinstance(node, ast.Name) and node.id == name
+
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Subscript, ast.Attribute)) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            if rooted(node.value):
+                return True
+        elif isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and rooted(node.func.value):
+            if node.func.attr in _MUTATING_METHODS:
+                return True
+            for keyword in node.keywords:
+                if keyword.arg == "inplace" and not (
+                    isinstance(keyword.value, ast.Constant) and not keyword.value.value
+                ):
+                    return True
+    return False
+
+
+def make_cache_key(question: str, model_name: str, temperature: float, fingerprint: str) -> str:
+    """Build the cache key for a question against a given model and dataframe"""
+    payload = json.dumps(
+        [normalize_question(question), model_name, float(temperature), fingerprint]
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResponseCache:
+    """Base class for response cache backends"""
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry for key, or None on a miss"""
+        raise NotImplementedError
+
+    def set(self, key: str, entry: Dict[str, Any]) -> None:
+        """Store an entry under key"""
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        raise NotImplementedError
+
+    def get_dependencies(self, key: str) -> Optional[List[Any]]:
+        """Return the columns recorded for a question's responses, or None"""
+        raise NotImplementedError
+
+    def set_dependencies(self, key: str, columns: List[Any]) -> None:
+        """
+        Record the columns a question's responses depend on
+
+        Kept apart from the responses, so they neither count as entries nor
+        evict responses.
+        """
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class MemoryCache(ResponseCache):
+    """In-process LRU cache with per-entry TTL"""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl: float = CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._dependencies: "OrderedDict[str, List[Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            created, entry = item
+            if self.ttl and time.time() - created > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = (time.time(), entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._dependencies.clear()
+
+    def get_dependencies(self, key: str) -> Optional[List[Any]]:
+        with self._lock:
+            columns = self._dependencies.get(key)
+            if columns is not None:
+                self._dependencies.move_to_end(key)
+            return columns
+
+    def set_dependencies(self, key: str, columns: List[Any]) -> None:
+        with self._lock:
+            self._dependencies[key] = columns
+            self._dependencies.move_to_end(key)
+            while len(self._dependencies) > self.max_entries:
+                self._dependencies.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache(ResponseCache):
+    """On-disk cache backed by SQLite, shared across processes and restarts"""
+
+    def __init__(
+        self,
+        path: str = CACHE_SQLITE_PATH,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        ttl: float = CACHE_TTL_SECONDS,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS dependencies ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created = row
+            if self.ttl and now - created > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return pickle.loads(value)
+
+    def set(self, key: str, entry: Dict[str, Any]) -> None:
+        now = time.time()
+        value = pickle.dumps(entry)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created, accessed) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.execute("DELETE FROM dependencies")
+            self._conn.commit()
+
+    def get_dependencies(self, key: str) -> Optional[List[Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM dependencies WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE dependencies SET accessed = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return pickle.loads(row[0])
+
+    def set_dependencies(self, key: str, columns: List[Any]) -> None:
+        value = pickle.dumps(columns)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO dependencies (key, value, accessed) VALUES (?, ?, ?)",
+                (key, value, time.time()),
+            )
+            self._conn.execute(
+                "DELETE FROM dependencies WHERE key IN ("
+                "SELECT key FROM dependencies ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+def create_cache(backend: str = CACHE_BACKEND) -> Optional[ResponseCache]:
+    """
+    Factory function to create a response cache
+
+    Args:
+        backend: 'memory', 'sqlite' or 'none'
+
+    Returns:
+        Cache instance, or None when caching is disabled
+    """
+    backend = backend.lower()
+    if backend == "memory":
+        return MemoryCache()
+    if backend == "sqlite":
+        return SQLiteCache()
+    if backend in ("none", "off", ""):
+        return None
+    raise ValueError(f"Unknown cache backend: {backend}")
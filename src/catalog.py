@@ -0,0 +1,315 @@
+"""
+Multi-table catalog for Data Visualization Agent
+Holds named datasets (paths or frames) that are loaded lazily on first
+reference in generated code, materializing only the columns the code names,
+and summarizes every table's schema so the LLM can join on demand
+"""
+import ast
+import asyncio
+import hashlib
+import os
+import threading
+from typing import Any, Dict, List, Optional, Set, Type, Union
+
+import pandas as pd
+from langchain.callbacks.manager import AsyncCallbackManagerForToolRun, CallbackManagerForToolRun
+from langchain.pydantic_v1 import BaseModel
+from langchain.tools import BaseTool
+from langchain_experimental.tools.python.tool import PythonAstREPLTool, PythonInputs, sanitize_input
+
+from src.cache import dataframe_fingerprint
+from src.config import DATA_CACHE_DIR, PROMPT_TOKEN_BUDGET, logger
+from src.context import _words, estimate_tokens
+from src.data_loader import _is_url, csv_arrow_cache, detect_format, load_dataset, require_pyarrow
+
+CATALOG_AGENT_PREFIX = (
+    "You are working with several pandas dataframes, one per table in the catalog "
+    "below, each bound in python_repl_ast to a variable named after the table (pandas "
+    "is available as `pd`). Tables are loaded on first use and only the columns your "
+    "code names are materialized, so always refer to columns explicitly, e.g. "
+    "orders['amount'], and join tables with pd.merge when a question spans them."
+)
+
+# Attributes that need every column of a table, so referencing them loads it whole
+_WHOLE_TABLE_ATTRS = {
+    "columns", "dtypes", "shape", "info", "describe", "head", "tail", "sample",
+    "to_string", "to_markdown", "to_dict", "T", "values", "to_numpy", "items",
+    "iterrows", "itertuples", "memory_usage", "corr", "cov",
+}
+
+def referenced_columns(code: str, frames: Dict[str, List[Any]]) -> Dict[str, Optional[Set[Any]]]:
+    """
+    Dataframe variables a snippet references and the columns it names for each
+
+    Columns count as named when they appear as a string literal or attribute
+    anywhere in the code; whole-frame attributes such as describe or columns
+    mean every column is needed.
+
+    Args:
+        code: Python source
+        frames: Variable name to the columns of the frame bound to it
+
+    Returns:
+        Variable name to the set of named columns, or None when the whole frame is needed
+    """
+    tree = ast.parse(code)
+    names, strings, attributes, whole = set(), set(), set(), set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            names.add(node.id)
+        elif isinstance(node, ast.Constant) and isinstance(node.value, str):
+            strings.add(node.value)
+        elif isinstance(node, ast.Attribute):
+            attributes.add(node.attr)
+            if isinstance(node.value, ast.Name) and node.attr in _WHOLE_TABLE_ATTRS:
+                whole.add(node.value.id)
+
+    referenced = {}
+    for name in names & set(frames):
+        named = {c for c in frames[name] if str(c) in strings or str(c) in attributes}
+        referenced[name] = None if name in whole or not named else named
+    return referenced
+
+
+class CatalogTable:
+    """
+    One named dataset in a catalog, loaded column by column on demand
+
+    Args:
+        name: Table name, also its variable name in generated code
+        source: Path/URL of a CSV, Parquet or Feather file, or an in-memory DataFrame
+        cache_dir: Directory for converted CSV caches
+    """
+
+    def __init__(self, name: str, source: Union[str, pd.DataFrame], cache_dir: str = DATA_CACHE_DIR):
+        if not name.isidentifier():
+            raise ValueError(f"Table name must be a Python identifier: {name}")
+        self.name = name
+        self.source = source
+        self.cache_dir = cache_dir
+        self.frame: Optional[pd.DataFrame] = None
+        self._dtypes: Optional[pd.Series] = None
+        self._num_rows: Optional[int] = None
+
+    def _read_schema(self) -> None:
+        if isinstance(self.source, pd.DataFrame):
+            self._dtypes, self._num_rows = self.source.dtypes, len(self.source)
+            return
+        require_pyarrow()
+        fmt = detect_format(self.source)
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            parquet = pq.ParquetFile(self.source)
+            schema, self._num_rows = parquet.schema_arrow, parquet.metadata.num_rows
+        else:
+            import pyarrow.feather as feather
+
+            path = self.source if fmt == "feather" else csv_arrow_cache(self.source, self.cache_dir)
+            # Memory-mapped read: only the footer and schema are touched
+            table = feather.read_table(path, memory_map=True)
+            schema, self._num_rows = table.schema, table.num_rows
+        self._dtypes = schema.empty_table().to_pandas().dtypes
+
+    @property
+    def dtypes(self) -> pd.Series:
+        """Column dtypes, read from file metadata without loading rows"""
+        if self._dtypes is None:
+            self._read_schema()
+        return self._dtypes
+
+    @property
+    def columns(self) -> List[Any]:
+        return list(self.dtypes.index)
+
+    @property
+    def num_rows(self) -> int:
+        if self._num_rows is None:
+            self._read_schema()
+        return self._num_rows
+
+    @property
+    def loaded_columns(self) -> List[Any]:
+        return [] if self.frame is None else list(self.frame.columns)
+
+    def load(self, columns: Optional[List[Any]] = None) -> pd.DataFrame:
+        """
+        Materialize columns, keeping those already loaded
+
+        Args:
+            columns: Columns to make available (None loads every column)
+
+        Returns:
+            Frame with at least the requested columns, in table order
+        """
+        wanted = self.columns if columns is None else [c for c in self.columns if c in set(columns)]
+        missing = [c for c in wanted if c not in set(self.loaded_columns)]
+        if missing:
+            logger.info("Loading %d column(s) of table %s", len(missing), self.name)
+            if isinstance(self.source, pd.DataFrame):
+                new = self.source[missing]
+            else:
+                new = load_dataset(self.source, columns=missing, cache_dir=self.cache_dir)
+            frame = new if self.frame is None else pd.concat([self.frame, new], axis=1)
+            self.frame = frame[[c for c in self.columns if c in set(frame.columns)]]
+        return self.frame
+
+    def unload(self) -> None:
+        """Drop materialized columns"""
+        self.frame = None
+
+    def fingerprint(self) -> str:
+        """Content hash for frames; path, size and mtime for local files"""
+        if isinstance(self.source, pd.DataFrame):
+            return dataframe_fingerprint(self.source)
+        if _is_url(self.source):
+            return self.source
+        stat = os.stat(self.source)
+        return f"{os.path.abspath(self.source)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    def describe(self, max_columns: Optional[int] = None) -> str:
+        """One schema line per table: name, row count and typed columns"""
+        columns = [f"{name} ({dtype})" for name, dtype in self.dtypes.items()]
+        shown = columns if max_columns is None else columns[:max_columns]
+        line = f"- {self.name} ({self.num_rows} rows): {', '.join(shown)}"
+        if len(shown) < len(columns):
+            line += f" (+{len(columns) - len(shown)} more)"
+        return line
+
+
+class DataCatalog:
+    """
+    Named tables for a multi-table agent
+
+    Memory grows with the columns generated code actually touches, not with
+    the number or width of tables in the catalog.
+
+    Args:
+        sources: Mapping of table name to path/URL or DataFrame
+        cache_dir: Directory for converted CSV caches
+    """
+
+    def __init__(self, sources: Dict[str, Union[str, pd.DataFrame]], cache_dir: str = DATA_CACHE_DIR):
+        if not sources:
+            raise ValueError("A catalog needs at least one table")
+        self.tables = {name: CatalogTable(name, source, cache_dir) for name, source in sources.items()}
+        self._lock = threading.Lock()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.tables
+
+    def __getitem__(self, name: str) -> CatalogTable:
+        return self.tables[name]
+
+    def referenced_columns(self, code: str) -> Dict[str, Optional[Set[Any]]]:
+        """Tables a snippet references and the columns it names for each (see referenced_columns)"""
+        return referenced_columns(code, {name: table.columns for name, table in self.tables.items()})
+
+    def bind(self, code: str, namespace: Dict[str, Any]) -> None:
+        """Load what a snippet references and (re)bind those tables in a REPL namespace"""
+        referenced = self.referenced_columns(code)
+        with self._lock:
+            for name, columns in referenced.items():
+                table = self.tables[name]
+                before = table.loaded_columns
+                frame = table.load(None if columns is None else list(columns))
+                if name not in namespace or table.loaded_columns != before:
+                    namespace[name] = frame
+
+    def rank_tables(self, question: str) -> List[str]:
+        """Order tables by how much the question mentions them or their columns"""
+        words = _words(question.replace("_", " "))
+        lowered = question.lower()
+        scores = {}
+        for name, table in self.tables.items():
+            score = 10 if name.lower() in lowered else 0
+            score += sum(1 for c in table.columns if str(c).lower() in lowered or _words(str(c)) & words)
+            scores[name] = score
+        order = {name: i for i, name in enumerate(self.tables)}
+        return sorted(self.tables, key=lambda name: (-scores[name], order[name]))
+
+    def schema_context(self, question: str, token_budget: int = PROMPT_TOKEN_BUDGET) -> str:
+        """
+        Schema summary of every table for the prompt
+
+        Tables most relevant to the question get their full column list first;
+        once the budget runs low, later tables list fewer columns.
+
+        Args:
+            question: Question used to rank tables
+            token_budget: Approximate token limit for the summary
+
+        Returns:
+            Schema summary text
+        """
+        lines = [f"The catalog has {len(self.tables)} tables:"]
+        used = estimate_tokens(lines[0])
+        ranked = self.rank_tables(question)
+        for position, name in enumerate(ranked):
+            table = self.tables[name]
+            # Leave room for at least a short line per remaining table
+            reserve = 12 * (len(ranked) - position - 1)
+            line = table.describe()
+            max_columns = len(table.columns)
+            while max_columns > 0 and used + estimate_tokens(line) + reserve > token_budget:
+                max_columns //= 2
+                line = table.describe(max_columns)
+            lines.append(line)
+            used += estimate_tokens(line) + 1
+        return "\n".join(lines)
+
+    def fingerprint(self) -> str:
+        """Hash of every table's fingerprint, for response caching"""
+        digest = hashlib.sha256()
+        for name, table in self.tables.items():
+            digest.update(f"{name}={table.fingerprint()};".encode())
+        return digest.hexdigest()
+
+    def memory_bytes(self) -> int:
+        """Memory held by materialized columns"""
+        return int(sum(
+            t.frame.memory_usage(index=True, deep=True).sum() for t in self.tables.values() if t.frame is not None
+        ))
+
+    def summary(self) -> Dict[str, Any]:
+        """Per-table schema and which columns are currently loaded"""
+        return {
+            "tables": {
+                name: {
+                    "rows": table.num_rows,
+                    "columns": table.columns,
+                    "dtypes": table.dtypes.astype(str).to_dict(),
+                    "loaded_columns": table.loaded_columns,
+                }
+                for name, table in self.tables.items()
+            },
+            "memory_bytes": self.memory_bytes(),
+        }
+
+
+class CatalogREPLTool(BaseTool):
+    """python_repl_ast whose namespace binds catalog tables as code references them"""
+
+    name: str = PythonAstREPLTool.__fields__["name"].default
+    description: str = PythonAstREPLTool.__fields__["description"].default
+    args_schema: Type[BaseModel] = PythonInputs
+    catalog: Any
+    repl: Any = None
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        if self.repl is None:
+            self.repl = PythonAstREPLTool(locals={"pd": pd})
+
+    def _run(self, query: str, run_manager: Optional[CallbackManagerForToolRun] = None) -> Any:
+        try:
+            self.catalog.bind(sanitize_input(query), self.repl.locals)
+        except SyntaxError:
+            pass  # Let the REPL report it the usual way
+        except Exception as e:
+            return "{}: {}".format(type(e).__name__, str(e))
+        return self.repl._run(query)
+
+    async def _arun(self, query: str, run_manager: Optional[AsyncCallbackManagerForToolRun] = None) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._run, query)
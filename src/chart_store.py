@@ -0,0 +1,237 @@
+"""
+Content-addressed chart store for Data Visualization Agent
+Names every chart by a hash of its kind, arguments and the style and
+downsampling settings that affect its pixels, so an identical chart is rendered once and then
+served from disk (or from an in-memory PNG cache), with size- and age-based
+eviction of the stored files
+"""
+import hashlib
+import json
+import os
+import re
+import struct
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from src.charts import ChartResult
+from src.config import (
+    CHART_CACHE_MAX_AGE_SECONDS,
+    CHART_CACHE_MAX_MB,
+    CHART_CACHE_MEMORY_MB,
+    CHART_OUTPUT_DIR,
+    DPI,
+    FIGURE_SIZE,
+    LINE_MAX_POINTS,
+    PLOT_STYLE,
+    SCATTER_BINS,
+    SCATTER_DENSITY_MODE,
+    SCATTER_MAX_POINTS,
+)
+
+_STORED_NAME_RE = re.compile(r"^[a-z]+_[0-9a-f]{64}\.png$")
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Re-check ages at least this often even when little is written
+_EVICT_INTERVAL_SECONDS = 60.0
+
+
+def chart_key(kind: str, spec: Dict[str, Any]) -> str:
+    """Hash of a chart's kind, arguments and the style and downsampling settings it is rendered with"""
+    payload = json.dumps(
+        [
+            kind, spec, PLOT_STYLE, list(FIGURE_SIZE), DPI,
+            LINE_MAX_POINTS, SCATTER_MAX_POINTS, SCATTER_DENSITY_MODE, SCATTER_BINS,
+        ],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def read_png_text(path: str) -> Dict[str, str]:
+    """Text metadata (tEXt/iTXt chunks) stored ahead of a PNG's image data"""
+    text: Dict[str, str] = {}
+    with open(path, "rb") as f:
+        if f.read(8) != _PNG_SIGNATURE:
+            return text
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                break
+            length, chunk_type = struct.unpack(">I4s", header)
+            if chunk_type in (b"IDAT", b"IEND"):
+                break
+            body = f.read(length)
+            f.read(4)  # CRC
+            if chunk_type == b"tEXt":
+                key, _, value = body.partition(b"\0")
+                text[key.decode("latin-1")] = value.decode("latin-1")
+            elif chunk_type == b"iTXt":
+                key, _, rest = body.partition(b"\0")
+                if rest[:1] == b"\0":  # uncompressed
+                    _, _, rest = rest[2:].partition(b"\0")  # language tag
+                    _, _, value = rest.partition(b"\0")     # translated keyword
+                    text[key.decode("latin-1")] = value.decode("utf-8")
+    return text
+
+
+class ChartStore:
+    """
+    Rendered charts stored under the hash of what produced them
+
+    Args:
+        directory: Where chart files live
+        max_mb: Stored charts beyond this total size are evicted, least recently used first
+        max_age: Seconds since last use after which a stored chart is evicted (0 keeps them)
+        memory_mb: Size of the in-memory cache of PNG bytes for in_memory renders
+    """
+
+    def __init__(
+        self,
+        directory: str = CHART_OUTPUT_DIR,
+        max_mb: float = CHART_CACHE_MAX_MB,
+        max_age: float = CHART_CACHE_MAX_AGE_SECONDS,
+        memory_mb: float = CHART_CACHE_MEMORY_MB,
+    ):
+        self.directory = directory
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.max_age = max_age
+        self.memory_bytes = int(memory_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._memory_size = 0
+        self._written = 0
+        self._last_evict = 0.0
+        self._lock = threading.Lock()
+
+    def path_for(self, kind: str, spec: Dict[str, Any]) -> str:
+        """Stable output path of a chart"""
+        return os.path.join(self.directory, f"{kind}_{chart_key(kind, spec)}.png")
+
+    def lookup(self, kind: str, spec: Dict[str, Any]) -> Optional[ChartResult]:
+        """Stored ChartResult for a chart, or None if it has not been rendered"""
+        path = self.path_for(kind, spec)
+        try:
+            # Touch on use so eviction drops the least recently used charts first
+            os.utime(path)
+            note = read_png_text(path).get("Description", "")
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return ChartResult(kind, path=path, note=note)
+
+    def render(self, kind: str, spec: Dict[str, Any], in_memory: bool = False) -> ChartResult:
+        """
+        Return a stored chart, rendering and storing it on a miss
+
+        Args:
+            kind: Chart type
+            spec: Keyword arguments for the chart's draw function
+            in_memory: Return PNG bytes (cached in memory) instead of a file path
+
+        Returns:
+            ChartResult
+        """
+        from src.rendering import render_chart
+
+        if in_memory:
+            key = chart_key(kind, spec)
+            with self._lock:
+                cached = self._memory.get(key)
+                if cached is not None:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return cached
+                self.misses += 1
+            result = render_chart(kind, spec, in_memory=True)
+            self._remember(key, result)
+            return result
+
+        stored = self.lookup(kind, spec)
+        if stored is not None:
+            return stored
+        result = render_chart(kind, spec, self.path_for(kind, spec))
+        self.record(result.path)
+        return result
+
+    def _remember(self, key: str, result: Any) -> None:
+        size = len(result.data)
+        if size > self.memory_bytes:
+            return
+        with self._lock:
+            if key in self._memory:
+                return
+            self._memory[key] = result
+            self._memory_size += size
+            while self._memory_size > self.memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_size -= len(evicted.data)
+
+    def record(self, path: str) -> None:
+        """Account for a newly written chart and evict if the store has grown enough"""
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        with self._lock:
+            self._written += size
+            due = (self._written > self.max_bytes // 10
+                   or time.time() - self._last_evict > _EVICT_INTERVAL_SECONDS)
+        if due:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Delete stored charts past max_age, then the least recently used beyond max_mb
+
+        Returns:
+            Number of files removed
+        """
+        now = time.time()
+        with self._lock:
+            self._written = 0
+            self._last_evict = now
+        try:
+            entries = [e for e in os.scandir(self.directory) if _STORED_NAME_RE.match(e.name)]
+        except FileNotFoundError:
+            return 0
+        files = []
+        for entry in entries:
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+        files.sort()
+
+        removed = 0
+        total = sum(size for _, size, _ in files)
+        for mtime, size, path in files:
+            expired = self.max_age and now - mtime > self.max_age
+            if not expired and total <= self.max_bytes:
+                continue
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        return removed
+
+
+_store: Optional[ChartStore] = None
+_store_lock = threading.Lock()
+
+
+def get_chart_store() -> ChartStore:
+    """Return the shared chart store"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ChartStore()
+        return _store
@@ -0,0 +1,26 @@
+"""
+Chart results for Data Visualization Agent
+Result type and output paths shared by the renderer, the render service and
+the chart store, kept free of matplotlib so processes that only hand charts
+to a renderer never import it
+"""
+import os
+import uuid
+from dataclasses import dataclass
+from typing import Optional
+
+from src.config import CHART_OUTPUT_DIR
+
+
+@dataclass
+class ChartResult:
+    """Outcome of a render: a file path, PNG bytes, or both"""
+    kind: str
+    path: Optional[str] = None
+    data: Optional[bytes] = None
+    note: str = ""
+
+
+def new_chart_path(kind: str, output_dir: str = CHART_OUTPUT_DIR) -> str:
+    """Return a unique output path for a chart"""
+    return os.path.join(output_dir, f"{kind}_{uuid.uuid4().hex}.png")
@@ -21,6 +21,81 @@ MODEL_MAX_TOKENS = int(os.getenv("MODEL_MAX_TOKENS", "2048"))
 AGENT_VERBOSE = os.getenv("AGENT_VERBOSE", "True").lower() == "true"
 AGENT_RETURN_INTERMEDIATE_STEPS = os.getenv("AGENT_RETURN_INTERMEDIATE_STEPS", "True").lower() == "true"
 AGENT_HANDLE_PARSING_ERRORS = os.getenv("AGENT_HANDLE_PARSING_ERRORS", "True").lower() == "true"
+AGENT_MAX_CONCURRENCY = int(os.getenv("AGENT_MAX_CONCURRENCY", "4"))
+AGENT_QUERY_TIMEOUT = float(os.getenv("AGENT_QUERY_TIMEOUT", "120"))
+# Echo streamed tokens to stdout for query/aquery; astream_query never does
+AGENT_STREAM_STDOUT = os.getenv("AGENT_STREAM_STDOUT", "True").lower() == "true"
+# "python" runs generated pandas code in a REPL, "sql" queries a DuckDB view of the dataframe
+AGENT_EXECUTION_MODE = os.getenv("AGENT_EXECUTION_MODE", "python")
+SQL_THREADS = int(os.getenv("SQL_THREADS", "0")) or None
+# "inprocess" runs generated pandas code in the agent's process, "subprocess" in a sandboxed worker
+REPL_BACKEND = os.getenv("REPL_BACKEND", "inprocess")
+SANDBOX_MEMORY_MB = int(os.getenv("SANDBOX_MEMORY_MB", "2048"))
+SANDBOX_CPU_SECONDS = float(os.getenv("SANDBOX_CPU_SECONDS", "60"))
+SANDBOX_TIMEOUT = float(os.getenv("SANDBOX_TIMEOUT", "60"))
+SANDBOX_MAX_TASKS = int(os.getenv("SANDBOX_MAX_TASKS", "100"))
+
+# Agent Pool Configuration
+AGENT_POOL_MAX_AGENTS = int(os.getenv("AGENT_POOL_MAX_AGENTS", "16"))
+AGENT_POOL_MAX_MB = float(os.getenv("AGENT_POOL_MAX_MB", "2048"))
+# Shared keep-alive HTTP pool used by every agent's LLM client
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "10"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))
+LLM_REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "60"))
+
+# Data Loading Configuration
+SAMPLE_DATA_URL = os.getenv(
+    "SAMPLE_DATA_URL",
+    "https://cf-courses-data.s3.us.cloud-object-storage.appdomain.cloud/"
+    "ZNoKMJ9rssJn-QbJ49kOzA/student-mat.csv",
+)
+DATA_CACHE_DIR = os.getenv("DATA_CACHE_DIR", ".data_cache")
+CATEGORY_MAX_RATIO = float(os.getenv("CATEGORY_MAX_RATIO", "0.5"))
+# Opt-in: store an agent's string columns as Arrow strings (groupby and value_counts results
+# unchanged); categoricals are smaller still but change how generated pandas code behaves
+MEMORY_OPTIMIZE = os.getenv("MEMORY_OPTIMIZE", "False").lower() == "true"
+MEMORY_ARROW_STRINGS = os.getenv("MEMORY_ARROW_STRINGS", "True").lower() == "true"
+MEMORY_CATEGORICALS = os.getenv("MEMORY_CATEGORICALS", "False").lower() == "true"
+DATASET_CHUNK_ROWS = int(os.getenv("DATASET_CHUNK_ROWS", "1000000"))
+TOOL_OUTPUT_MAX_ROWS = int(os.getenv("TOOL_OUTPUT_MAX_ROWS", "50"))
+
+# Prompt Context Configuration
+# "schema" sends a compact profile-based summary, "head" sends df.head() like the stock agent
+PROMPT_CONTEXT_MODE = os.getenv("PROMPT_CONTEXT_MODE", "schema")
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "400"))
+PROMPT_HEAD_ROWS = int(os.getenv("PROMPT_HEAD_ROWS", "5"))
+
+# Cache Configuration
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "256"))
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "3600"))
+CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH", "agent_cache.sqlite")
+# Generated-code plans are keyed by question template and schema, and never expire
+PLAN_CACHE_BACKEND = os.getenv("PLAN_CACHE_BACKEND", "memory")
+PLAN_CACHE_MAX_ENTRIES = int(os.getenv("PLAN_CACHE_MAX_ENTRIES", "512"))
+PLAN_CACHE_SQLITE_PATH = os.getenv("PLAN_CACHE_SQLITE_PATH", "plan_cache.sqlite")
+
+# Rollup Configuration
+# "lazy" builds the group-by cube on first use, "eager" when the agent is built, "off" disables it
+ROLLUP_MODE = os.getenv("ROLLUP_MODE", "lazy")
+ROLLUP_MAX_CARDINALITY = int(os.getenv("ROLLUP_MAX_CARDINALITY", "50"))
+ROLLUP_MAX_DIMENSIONS = int(os.getenv("ROLLUP_MAX_DIMENSIONS", "16"))
+ROLLUP_MAX_GROUP_COLUMNS = int(os.getenv("ROLLUP_MAX_GROUP_COLUMNS", "2"))
+
+# Approximate Mode Configuration
+# Answer from a stratified sample with confidence intervals instead of scanning the full frame
+APPROX_MODE = os.getenv("APPROX_MODE", "False").lower() == "true"
+APPROX_SAMPLE_ROWS = int(os.getenv("APPROX_SAMPLE_ROWS", "100000"))
+APPROX_STRATA_COLUMNS = int(os.getenv("APPROX_STRATA_COLUMNS", "2"))
+APPROX_MAX_STRATA = int(os.getenv("APPROX_MAX_STRATA", "256"))
+APPROX_MIN_STRATUM_ROWS = int(os.getenv("APPROX_MIN_STRATUM_ROWS", "30"))
+APPROX_CONFIDENCE = float(os.getenv("APPROX_CONFIDENCE", "0.95"))
+
+# Profile Configuration
+PROFILE_CHUNK_ROWS = int(os.getenv("PROFILE_CHUNK_ROWS", "1000000"))
+PROFILE_SAMPLE_SIZE = int(os.getenv("PROFILE_SAMPLE_SIZE", "10000"))
+PROFILE_TOP_K = int(os.getenv("PROFILE_TOP_K", "5"))
 
 # Visualization Configuration
 PLOT_STYLE = os.getenv("PLOT_STYLE", "seaborn-v0_8-darkgrid")
@@ -28,20 +103,58 @@ FIGURE_SIZE_WIDTH = int(os.getenv("FIGURE_SIZE_WIDTH", "12"))
 FIGURE_SIZE_HEIGHT = int(os.getenv("FIGURE_SIZE_HEIGHT", "6"))
 FIGURE_SIZE = (FIGURE_SIZE_WIDTH, FIGURE_SIZE_HEIGHT)
 DPI = int(os.getenv("DPI", "100"))
+CHART_OUTPUT_DIR = os.getenv("CHART_OUTPUT_DIR", "charts")
+# Content-addressed chart store: identical charts are rendered once and share a path
+CHART_CACHE = os.getenv("CHART_CACHE", "True").lower() == "true"
+CHART_CACHE_MAX_MB = float(os.getenv("CHART_CACHE_MAX_MB", "256"))
+CHART_CACHE_MAX_AGE_SECONDS = float(os.getenv("CHART_CACHE_MAX_AGE_SECONDS", "604800"))
+CHART_CACHE_MEMORY_MB = float(os.getenv("CHART_CACHE_MEMORY_MB", "32"))
+LINE_MAX_POINTS = int(os.getenv("LINE_MAX_POINTS", "2000"))
+SCATTER_MAX_POINTS = int(os.getenv("SCATTER_MAX_POINTS", "20000"))
+SCATTER_DENSITY_MODE = os.getenv("SCATTER_DENSITY_MODE", "hexbin")
+SCATTER_BINS = int(os.getenv("SCATTER_BINS", "80"))
+# Batch chart tool: charts allowed per call and threads rendering them (inline backend)
+CHART_BATCH_MAX_CHARTS = int(os.getenv("CHART_BATCH_MAX_CHARTS", "12"))
+CHART_BATCH_THREADS = int(os.getenv("CHART_BATCH_THREADS", "4"))
+# Correlation tool: frames longer than this are correlated on a random sample (0 disables it)
+CORRELATION_SAMPLE_ROWS = int(os.getenv("CORRELATION_SAMPLE_ROWS", "1000000"))
+
+# Rendering Configuration
+# "inline" renders on the calling thread, "process" uses a pool of warm worker processes
+RENDER_BACKEND = os.getenv("RENDER_BACKEND", "inline")
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "2"))
+RENDER_MAX_QUEUE = int(os.getenv("RENDER_MAX_QUEUE", "32"))
+RENDER_TIMEOUT = float(os.getenv("RENDER_TIMEOUT", "30"))
+RENDER_WAIT = os.getenv("RENDER_WAIT", "True").lower() == "true"
+
+# Metrics Configuration
+# When set, Prometheus text metrics are rewritten to this file after every query
+METRICS_FILE = os.getenv("METRICS_FILE", "")
 
 # Logging Configuration
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 LOG_FILE = os.getenv("LOG_FILE", "agent.log")
 
-# Configure logging
-logging.basicConfig(
-    level=getattr(logging, LOG_LEVEL),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(LOG_FILE),
-        logging.StreamHandler()
-    ]
-)
-
 logger = logging.getLogger(__name__)
 
+
+def configure_logging(level: str = LOG_LEVEL, log_file: str = LOG_FILE) -> None:
+    """
+    Send package logs to stderr and, if log_file is set, to a file
+
+    Importing the package never touches logging configuration or creates the
+    log file; entry points (main.py, the examples) call this explicitly, and
+    applications embedding the agent can configure logging their own way.
+
+    Args:
+        level: Log level name, e.g. 'INFO'
+        log_file: Path of the log file ('' disables file logging)
+    """
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file))
+    logging.basicConfig(
+        level=getattr(logging, level),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=handlers,
+    )
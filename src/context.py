@@ -0,0 +1,123 @@
+"""
+Prompt context builder for Data Visualization Agent
+Turns the cached dataframe profile into a compact schema summary, ranked by
+relevance to the question and trimmed to a token budget
+"""
+import math
+import re
+from typing import Any, List
+
+import pandas as pd
+
+from src.config import PROMPT_HEAD_ROWS, PROMPT_TOKEN_BUDGET
+from src.profiling import ColumnProfile, DataFrameProfile
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_MAX_CATEGORIES = 6
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English/code)"""
+    return math.ceil(len(text) / 4)
+
+
+def head_prompt_tokens(df: pd.DataFrame, rows: int = PROMPT_HEAD_ROWS) -> int:
+    """Tokens the default pandas agent prompt spends on df.head()"""
+    return estimate_tokens(str(df.head(rows).to_markdown()))
+
+
+def _words(text: Any) -> set:
+    return set(_WORD_RE.findall(str(text).lower()))
+
+
+def rank_columns(profile: DataFrameProfile, question: str) -> List[Any]:
+    """
+    Order columns by relevance to a question
+
+    Columns named in the question come first, then columns sharing words with
+    it or whose frequent values it mentions; ties keep the frame's order.
+
+    Args:
+        profile: Cached dataframe profile
+        question: Natural language question
+
+    Returns:
+        Column names, most relevant first
+    """
+    lowered = question.lower()
+    question_words = _words(question)
+    scores = {}
+    for name, column in profile.columns.items():
+        score = 0.0
+        if re.search(rf"(?<![a-z0-9_]){re.escape(str(name).lower())}(?![a-z0-9_])", lowered):
+            score += 10
+        name_words = _words(str(name).replace("_", " "))
+        if name_words:
+            score += 3 * len(name_words & question_words) / len(name_words)
+        if column.tracks_values:
+            values = {str(value).lower() for value, _ in column.top_values()}
+            score += len(values & question_words)
+        scores[name] = score
+    order = {name: i for i, name in enumerate(profile.columns)}
+    return sorted(profile.columns, key=lambda name: (-scores[name], order[name]))
+
+
+def describe_column(column: ColumnProfile) -> str:
+    """One compact line describing a column's type and value domain"""
+    line = f"- {column.name} ({column.dtype})"
+    distinct = column.distinct.count()
+    if column.is_numeric and column.count:
+        line += f": {column.min:.4g} to {column.max:.4g}, mean {column.mean:.4g}"
+    if column.tracks_values and 0 < distinct <= _MAX_CATEGORIES:
+        values = ", ".join(str(value) for value, _ in column.top_values()[:_MAX_CATEGORIES])
+        line += f"{'; values' if column.is_numeric else ': values'} {values}"
+    elif not column.is_numeric:
+        line += f": ~{distinct} distinct"
+    if column.null_count:
+        line += f", {column.null_count} missing"
+    return line
+
+
+def build_schema_context(profile: DataFrameProfile, question: str,
+                         token_budget: int = PROMPT_TOKEN_BUDGET) -> str:
+    """
+    Build a compact schema summary for the prompt
+
+    Args:
+        profile: Cached dataframe profile
+        question: Question used to rank column relevance
+        token_budget: Approximate token limit for the summary
+
+    Returns:
+        Schema summary text
+    """
+    rows, cols = profile.shape
+    lines = [f"The dataframe `df` has {rows} rows and {cols} columns:"]
+    used = estimate_tokens(lines[0])
+    ranked = rank_columns(profile, question)
+    # Keep a slice of the budget so undescribed columns are at least named
+    detail_budget = token_budget - token_budget // 4
+    described = 0
+    for name in ranked:
+        line = describe_column(profile.columns[name])
+        cost = estimate_tokens(line) + 1
+        if used + cost > detail_budget:
+            break
+        lines.append(line)
+        used += cost
+        described += 1
+
+    remaining = [str(name) for name in ranked[described:]]
+    if remaining:
+        names = []
+        for name in remaining:
+            if used + estimate_tokens(name) + 2 > token_budget:
+                break
+            names.append(name)
+            used += estimate_tokens(name) + 1
+        omitted = len(remaining) - len(names)
+        tail = f"- other columns: {', '.join(names)}" if names else "- other columns omitted"
+        if names and omitted:
+            tail += f" (+{omitted} more)"
+        lines.append(tail)
+    return "\n".join(lines)
@@ -0,0 +1,193 @@
+"""
+Correlation matrix and heatmap tool for Data Visualization Agent
+Computes the numeric correlation matrix with vectorized NumPy (pairwise
+complete observations, Pearson or Spearman), caches it per dataframe version
+on the agent, and answers correlation questions and heatmaps from the cache
+"""
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from langchain.tools import StructuredTool
+
+from src.cache import column_fingerprints
+from src.config import CORRELATION_SAMPLE_ROWS, TOOL_OUTPUT_MAX_ROWS
+
+CORRELATION_METHODS = ("pearson", "spearman")
+
+
+def correlation_matrix(df: pd.DataFrame, method: str = "pearson") -> pd.DataFrame:
+    """
+    Correlation matrix of the numeric columns using pairwise-complete observations
+
+    Every pair uses the rows where both columns are present, like DataFrame.corr,
+    but all pairs come from a handful of matrix products instead of a Python
+    loop over pairs. Spearman correlates ranks computed over each column's
+    non-missing values.
+
+    Args:
+        df: Source dataframe; non-numeric columns are ignored
+        method: 'pearson' or 'spearman'
+
+    Returns:
+        Square DataFrame indexed by column name (NaN where a pair has fewer than two rows)
+    """
+    if method not in CORRELATION_METHODS:
+        raise ValueError(f"Unknown correlation method: {method}")
+    numeric = df.select_dtypes(include="number").select_dtypes(exclude="timedelta")
+    if method == "spearman":
+        numeric = numeric.rank(method="average")
+    values = numeric.to_numpy(dtype=np.float64, na_value=np.nan)
+    present = np.isfinite(values)
+    # Centering first keeps the sums of squares small, which avoids cancellation
+    means = np.where(present, values, 0.0).sum(axis=0) / np.maximum(present.sum(axis=0), 1)
+    x = np.where(present, values - means, 0.0)
+    mask = present.astype(np.float64)
+
+    counts = mask.T @ mask
+    sums = x.T @ mask              # sums[i, j]: sum of column i over rows where j is present
+    squares = (x * x).T @ mask
+    products = x.T @ x
+    with np.errstate(divide="ignore", invalid="ignore"):
+        covariance = products - sums * sums.T / counts
+        variance_i = squares - sums * sums / counts
+        corr = covariance / np.sqrt(variance_i * variance_i.T)
+    corr[counts < 2] = np.nan
+    corr = np.clip(corr, -1.0, 1.0)
+    # Constant columns stay NaN, as with DataFrame.corr
+    np.fill_diagonal(corr, np.where(np.isfinite(np.diag(corr)), 1.0, np.nan))
+    return pd.DataFrame(corr, index=numeric.columns, columns=numeric.columns)
+
+
+class CorrelationCache:
+    """
+    Correlation matrices per dataframe version and method
+
+    The matrix is computed once per version of the data (see
+    DataVisualizationAgent.data_version) and reused by every later question.
+    The numeric columns' content fingerprints are part of the key, so generated
+    code that edits the frame in place does not get stale correlations.
+
+    Args:
+        sample_rows: Frames longer than this are correlated on a random sample (0 disables it)
+    """
+
+    def __init__(self, sample_rows: int = CORRELATION_SAMPLE_ROWS):
+        self.sample_rows = sample_rows
+        self.hits = 0
+        self.misses = 0
+        self._matrices: Dict[str, Tuple[Any, pd.DataFrame, bool]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _token(df: pd.DataFrame, version: Any) -> Tuple:
+        # Shape and columns catch generated code that reshaped the frame in place, and
+        # the numeric columns' fingerprints catch in-place edits of their values
+        numeric = df.select_dtypes(include="number")
+        return (version, id(df), df.shape, tuple(df.columns), tuple(column_fingerprints(numeric).items()))
+
+    def get(self, df: pd.DataFrame, version: Any = None, method: str = "pearson") -> Tuple[pd.DataFrame, bool]:
+        """
+        Return the correlation matrix for a frame, computing it on a miss
+
+        Args:
+            df: Source dataframe
+            version: Data version; a different version invalidates the cached matrix
+            method: 'pearson' or 'spearman'
+
+        Returns:
+            (matrix, sampled) where sampled says whether a row sample was used
+        """
+        token = self._token(df, version)
+        with self._lock:
+            cached = self._matrices.get(method)
+            if cached is not None and cached[0] == token:
+                self.hits += 1
+                return cached[1], cached[2]
+            self.misses += 1
+            sampled = bool(self.sample_rows) and len(df) > self.sample_rows
+            source = df.sample(n=self.sample_rows, random_state=0) if sampled else df
+            matrix = correlation_matrix(source, method)
+            self._matrices[method] = (token, matrix, sampled)
+            return matrix, sampled
+
+    def clear(self) -> None:
+        """Forget every cached matrix"""
+        with self._lock:
+            self._matrices.clear()
+
+
+def make_correlation_tools(
+    get_df: Callable[[], pd.DataFrame],
+    cache: CorrelationCache,
+    get_version: Callable[[], Any] = lambda: None,
+) -> List[StructuredTool]:
+    """
+    Build the correlation tool for an agent's dataframe
+
+    Args:
+        get_df: Returns the dataframe to correlate
+        cache: Matrix cache shared across questions
+        get_version: Returns the current data version
+
+    Returns:
+        List of LangChain tools
+    """
+
+    def correlations(
+        columns: Optional[List[str]] = None,
+        method: str = "pearson",
+        target: Optional[str] = None,
+        heatmap: bool = False,
+        title: Optional[str] = None,
+    ) -> str:
+        try:
+            matrix, sampled = cache.get(get_df(), get_version(), method)
+            selected = list(matrix.columns) if not columns else list(columns)
+            missing = [c for c in selected + ([target] if target else []) if c not in matrix.columns]
+            if missing:
+                raise ValueError(f"Not numeric columns: {', '.join(map(str, missing))}")
+            note = f" (estimated from a {cache.sample_rows}-row sample)" if sampled else ""
+
+            if target:
+                ranked = matrix.loc[[c for c in selected if c != target], target]
+                ranked = ranked.reindex(ranked.abs().sort_values(ascending=False).index)
+                text = f"{method.capitalize()} correlation with {target}{note}:\n"
+                text += ranked.to_string(max_rows=TOOL_OUTPUT_MAX_ROWS)
+            else:
+                text = f"{method.capitalize()} correlation matrix{note}:\n"
+                text += matrix.loc[selected, selected].round(3).to_string(max_rows=TOOL_OUTPUT_MAX_ROWS)
+
+            if heatmap:
+                from src.tools import _render
+
+                shown = matrix.loc[selected, selected]
+                spec = {
+                    "matrix": shown.values.tolist(),
+                    "row_labels": [str(c) for c in shown.index],
+                    "col_labels": [str(c) for c in shown.columns],
+                    "title": title or f"{method.capitalize()} correlation",
+                    "xlabel": "",
+                    "ylabel": "",
+                    "vmin": -1.0,
+                    "vmax": 1.0,
+                    "cmap": "coolwarm",
+                }
+                text += "\n" + _render("heatmap", spec, "Correlation heatmap")
+            return text
+        except Exception as e:
+            return f"Error computing correlations: {str(e)}"
+
+    return [
+        StructuredTool.from_function(
+            correlations,
+            name="correlations",
+            description=(
+                "Correlations between numeric columns of the dataframe `df`, from a cached "
+                "matrix (use this instead of df.corr()). columns restricts the matrix; target "
+                "lists every column's correlation with one column, strongest first; method is "
+                "'pearson' or 'spearman'; heatmap=true also renders a correlation heatmap."
+            ),
+        ),
+    ]
@@ -0,0 +1,314 @@
+"""
+Data loading for Data Visualization Agent
+Loads CSV, Parquet and Feather sources with column projection. CSVs are
+parsed with pyarrow's multithreaded reader and converted once to an
+uncompressed Arrow file that later loads memory-map.
+"""
+import bz2
+import gzip
+import hashlib
+import io
+import os
+import zipfile
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from src.config import (
+    DATA_CACHE_DIR,
+    CATEGORY_MAX_RATIO,
+    MEMORY_ARROW_STRINGS,
+    MEMORY_CATEGORICALS,
+    MEMORY_OPTIMIZE,
+    logger,
+)
+
+CSV_EXTENSIONS = (".csv", ".csv.gz", ".csv.bz2", ".csv.zip", ".txt")
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+FEATHER_EXTENSIONS = (".feather", ".arrow", ".ipc")
+
+
+def require_pyarrow():
+    """Raise a helpful ImportError when pyarrow is not installed"""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise ImportError(
+            "pyarrow is required for Parquet/Arrow loading; install it with 'pip install pyarrow'"
+        ) from e
+
+
+def _is_url(source: str) -> bool:
+    return source.startswith(("http://", "https://", "s3://", "gs://"))
+
+
+def detect_format(source: str) -> str:
+    """Return 'csv', 'parquet' or 'feather' based on the file extension"""
+    name = source.lower().split("?")[0]
+    if name.endswith(PARQUET_EXTENSIONS):
+        return "parquet"
+    if name.endswith(FEATHER_EXTENSIONS):
+        return "feather"
+    if name.endswith(CSV_EXTENSIONS):
+        return "csv"
+    raise ValueError(f"Unsupported data format: {source}")
+
+
+def optimize_dtypes(df: pd.DataFrame, category_max_ratio: float = CATEGORY_MAX_RATIO) -> pd.DataFrame:
+    """
+    Shrink a freshly parsed frame without changing its values
+
+    Applies the same policy as optimize_memory, so a frame loaded with
+    optimize=True matches what the agent's optimizer would produce. Numeric
+    columns keep their parsed width: narrower integers wrap around in the
+    arithmetic of generated code (int8 age * 12 overflows) and float32 changes
+    the precision of sums and means.
+
+    Args:
+        df: DataFrame to shrink
+        category_max_ratio: Maximum distinct/rows ratio for a string column to become categorical
+
+    Returns:
+        DataFrame with compact dtypes
+    """
+    return optimize_memory(df, category_max_ratio)[0]
+
+
+def _low_cardinality(column: pd.Series, category_max_ratio: float) -> bool:
+    return len(column) > 0 and column.nunique(dropna=True) <= category_max_ratio * len(column)
+
+
+def _compact_column(
+    column: pd.Series, category_max_ratio: float, arrow_strings: bool, categoricals: bool
+) -> Optional[pd.Series]:
+    """Smaller representation of a string column holding the same values, or None"""
+    if not pd.api.types.is_object_dtype(column.dtype) or not len(column):
+        return None
+    if pd.api.types.infer_dtype(column, skipna=True) != "string":
+        return None
+    if categoricals and _low_cardinality(column, category_max_ratio):
+        return column.astype("category")
+    if arrow_strings and not column.isna().any():
+        # NaN and pd.NA compare differently, so only columns without missing values switch
+        try:
+            return column.astype("string[pyarrow]")
+        except ImportError:
+            return None
+    return None
+
+
+def _dtype_name(dtype: Any) -> str:
+    if isinstance(dtype, pd.StringDtype):
+        return f"string[{dtype.storage}]"
+    return str(dtype)
+
+
+def optimize_memory(
+    df: pd.DataFrame,
+    category_max_ratio: float = CATEGORY_MAX_RATIO,
+    arrow_strings: bool = MEMORY_ARROW_STRINGS,
+    categoricals: bool = MEMORY_CATEGORICALS,
+) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+    """
+    Shrink the string columns of an in-memory frame
+
+    String columns without missing values become Arrow-backed strings, which
+    keep the results of generated code: groupby, value_counts, filters,
+    sorting and concatenation give the same labels and values (nullable
+    result dtypes aside). Numeric columns are never narrowed: no integer
+    width is safe from overflow in arbitrary generated arithmetic
+    (x * 100000, cumprod), and float32 rounds differently. Each converted
+    column is checked to round-trip to its original values and left alone
+    if not.
+
+    With categoricals=True, low-cardinality strings become categoricals
+    instead. They are smaller, but generated code behaves differently on
+    them: grouping a filtered categorical without observed=True lists the
+    filtered-out values with zero counts, value_counts lists unused
+    categories, and string concatenation (col + '_x') raises. On either
+    dtype, select_dtypes('object') no longer returns converted columns.
+
+    Args:
+        df: DataFrame to shrink
+        category_max_ratio: Maximum distinct/rows ratio for a string column to become categorical
+        arrow_strings: Store strings in Arrow (requires pyarrow)
+        categoricals: Store low-cardinality strings as categoricals
+
+    Returns:
+        (frame, report) where report has one entry per converted column with its
+        dtypes and bytes before and after
+    """
+    converted, report = {}, []
+    for name, column in df.items():
+        compact = _compact_column(column, category_max_ratio, arrow_strings, categoricals)
+        if compact is None or not compact.astype(column.dtype).equals(column):
+            continue
+        before = int(column.memory_usage(index=False, deep=True))
+        after = int(compact.memory_usage(index=False, deep=True))
+        if after >= before:
+            continue
+        converted[name] = compact
+        report.append({
+            "column": name,
+            "from": str(column.dtype),
+            "to": _dtype_name(compact.dtype),
+            "bytes_before": before,
+            "bytes_after": after,
+            "bytes_saved": before - after,
+        })
+    if report:
+        saved = sum(entry["bytes_saved"] for entry in report)
+        logger.info("Memory optimizer converted %d columns, saving %.1f MB", len(report), saved / 1e6)
+    return (df.assign(**converted) if converted else df), report
+
+
+def _csv_cache_path(source: str, cache_dir: str, optimize: bool = True) -> str:
+    """
+    Cache file for a CSV, invalidated when a local file's size or mtime changes
+
+    URLs cannot be checked cheaply, so their cache is keyed on the URL alone
+    and kept until it is rebuilt with refresh=True (see csv_arrow_cache).
+    """
+    key = source
+    if not _is_url(source):
+        stat = os.stat(source)
+        key = f"{os.path.abspath(source)}:{stat.st_size}:{stat.st_mtime_ns}"
+    key += f":optimize={optimize}"
+    if optimize:
+        key += f":arrow_strings={MEMORY_ARROW_STRINGS}:categoricals={MEMORY_CATEGORICALS}"
+    digest = hashlib.sha256(key.encode()).hexdigest()[:16]
+    stem = os.path.basename(source.split("?")[0]).split(".")[0] or "data"
+    return os.path.join(cache_dir, f"{stem}-{digest}.arrow")
+
+
+@contextmanager
+def _csv_stream(source: str) -> Iterator[Any]:
+    """Binary stream of a local or remote CSV, decompressed by extension like pd.read_csv"""
+    if source.startswith(("http://", "https://")):
+        import urllib.request
+
+        raw = urllib.request.urlopen(source)
+    elif _is_url(source):
+        from pyarrow import fs
+
+        filesystem, path = fs.FileSystem.from_uri(source)
+        raw = filesystem.open_input_file(path)
+    else:
+        raw = open(source, "rb")
+    name = source.lower().split("?")[0]
+    with raw:
+        if name.endswith(".gz"):
+            stream = gzip.GzipFile(fileobj=raw)
+        elif name.endswith(".bz2"):
+            stream = bz2.BZ2File(raw)
+        elif name.endswith(".zip"):
+            archive = zipfile.ZipFile(raw if raw.seekable() else io.BytesIO(raw.read()))
+            stream = archive.open(archive.namelist()[0])
+        else:
+            stream = raw
+        with stream:
+            yield stream
+
+
+def _read_csv(source: str) -> "pyarrow.Table":
+    """
+    Parse a CSV with pyarrow, typed the way pd.read_csv would type it
+
+    pyarrow infers dates and timestamps, which pandas leaves as strings unless
+    asked to parse them, so such columns are read again as strings. Empty
+    fields are missing values, as in pandas.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+
+    def options(column_types: Dict[str, Any]) -> "pacsv.ConvertOptions":
+        return pacsv.ConvertOptions(strings_can_be_null=True, column_types=column_types)
+
+    with _csv_stream(source) as stream:
+        table = pacsv.read_csv(stream, convert_options=options({}))
+    temporal = {field.name: pa.string() for field in table.schema if pa.types.is_temporal(field.type)}
+    if temporal:
+        with _csv_stream(source) as stream:
+            table = pacsv.read_csv(stream, convert_options=options(temporal))
+    return table
+
+
+def _write_arrow(df: Any, path: str) -> None:
+    """Write a DataFrame or pyarrow Table as an uncompressed Arrow IPC file, atomically"""
+    import pyarrow.feather as feather
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    feather.write_feather(df, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, path)
+
+
+def _read_arrow(path: str, columns: Optional[List[str]], memory_map: bool) -> pd.DataFrame:
+    import pyarrow.feather as feather
+
+    table = feather.read_table(path, columns=columns, memory_map=memory_map)
+    # split_blocks avoids consolidating columns into new 2D blocks, so
+    # null-free numeric columns can stay views over the mapped file; columns
+    # saved as pandas strings come back Arrow-backed rather than as Python objects
+    with pd.option_context("mode.string_storage", "pyarrow"):
+        return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def load_dataset(
+    source: str,
+    columns: Optional[List[str]] = None,
+    cache_dir: str = DATA_CACHE_DIR,
+    optimize: bool = MEMORY_OPTIMIZE,
+    memory_map: bool = True,
+    refresh: bool = False,
+) -> pd.DataFrame:
+    """
+    Load a dataset for the agent
+
+    Args:
+        source: Path or URL to a CSV, Parquet or Feather/Arrow file
+        columns: Only load these columns
+        cache_dir: Directory for converted CSV caches
+        optimize: Shrink dtypes when converting a CSV (see optimize_dtypes); off unless MEMORY_OPTIMIZE
+        memory_map: Memory-map Arrow files instead of reading them into memory
+        refresh: Re-download and reconvert a CSV even if it is cached (URL caches never expire)
+
+    Returns:
+        Loaded DataFrame
+    """
+    fmt = detect_format(source)
+    if fmt == "parquet":
+        require_pyarrow()
+        return pd.read_parquet(source, columns=columns, memory_map=memory_map)
+    if fmt == "feather":
+        require_pyarrow()
+        return _read_arrow(source, columns, memory_map)
+
+    return _read_arrow(csv_arrow_cache(source, cache_dir, optimize, refresh), columns, memory_map)
+
+
+def csv_arrow_cache(
+    source: str, cache_dir: str = DATA_CACHE_DIR, optimize: bool = MEMORY_OPTIMIZE, refresh: bool = False
+) -> str:
+    """
+    Convert a CSV to its Arrow cache file once and return the cache path
+
+    Args:
+        source: Path or URL to a CSV file
+        cache_dir: Directory for converted CSV caches
+        optimize: Shrink dtypes when converting
+        refresh: Reconvert even if the cache file exists; a URL's cache is otherwise never
+            refetched, while local files are reconverted when their size or mtime changes
+
+    Returns:
+        Path of the uncompressed Arrow IPC file
+    """
+    require_pyarrow()
+    cache_path = _csv_cache_path(source, cache_dir, optimize)
+    if refresh or not os.path.exists(cache_path):
+        logger.info("Converting %s to Arrow cache %s", source, cache_path)
+        table = _read_csv(source)
+        # Without optimize the parsed table is written as is, never materialized in pandas
+        _write_arrow(optimize_dtypes(table.to_pandas()) if optimize else table, cache_path)
+    return cache_path
@@ -0,0 +1,264 @@
+"""
+Out-of-core datasets for Data Visualization Agent
+A lazy, chunked handle over Parquet, Arrow or CSV files that streams
+projected record batches and pushes aggregations down chunk by chunk
+"""
+import hashlib
+import os
+import re
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+from langchain.tools import StructuredTool
+
+from src.config import DATASET_CHUNK_ROWS, TOOL_OUTPUT_MAX_ROWS
+from src.data_loader import require_pyarrow, detect_format
+from src.profiling import DataFrameProfile
+
+AGGREGATIONS = ("count", "sum", "mean", "min", "max", "std")
+_MERGE = {"count": "sum", "sum": "sum", "min": "min", "max": "max"}
+_ARROW_FORMATS = {"parquet": "parquet", "feather": "ipc", "csv": "csv"}
+_IDENTIFIER_RE = re.compile(r"`([^`]+)`|([A-Za-z_][A-Za-z0-9_]*)")
+
+
+class ChunkedDataset:
+    """
+    Lazy dataset streamed in record batches instead of held in memory
+
+    Args:
+        path: Parquet/Arrow/CSV file or a directory of Parquet files
+        chunk_rows: Rows per streamed chunk
+    """
+
+    def __init__(self, path: str, chunk_rows: int = DATASET_CHUNK_ROWS):
+        require_pyarrow()
+        import pyarrow.dataset as ds
+
+        self.path = path
+        self.chunk_rows = chunk_rows
+        fmt = "parquet" if os.path.isdir(path) else detect_format(path)
+        self._dataset = ds.dataset(path, format=_ARROW_FORMATS[fmt])
+        self.columns: List[str] = list(self._dataset.schema.names)
+        self._num_rows: Optional[int] = None
+
+    @property
+    def num_rows(self) -> int:
+        """Row count, from file metadata where the format has it"""
+        if self._num_rows is None:
+            self._num_rows = self._dataset.count_rows()
+        return self._num_rows
+
+    @property
+    def shape(self):
+        return (self.num_rows, len(self.columns))
+
+    def fingerprint(self) -> str:
+        """Identity of the underlying files (path, size and modification time)"""
+        digest = hashlib.sha256()
+        for path in sorted(self._dataset.files):
+            stat = os.stat(path)
+            digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        return digest.hexdigest()
+
+    def iter_chunks(self, columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+        """
+        Stream the dataset as pandas chunks
+
+        Args:
+            columns: Only read these columns
+
+        Yields:
+            DataFrame chunks of at most chunk_rows rows
+        """
+        for batch in self._dataset.to_batches(columns=columns, batch_size=self.chunk_rows):
+            if batch.num_rows:
+                yield batch.to_pandas()
+
+    def head(self, n: int = 5) -> pd.DataFrame:
+        """First n rows"""
+        return self._dataset.head(n).to_pandas()
+
+    def profile(self) -> DataFrameProfile:
+        """Build the column profile in a single streaming pass"""
+        return DataFrameProfile.from_chunks(self.iter_chunks())
+
+    def _referenced_columns(self, expression: str) -> List[str]:
+        names = {a or b for a, b in _IDENTIFIER_RE.findall(expression)}
+        return [column for column in self.columns if column in names]
+
+    def aggregate(
+        self,
+        metrics: Dict[str, str],
+        group_by: Optional[List[str]] = None,
+        where: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """
+        Compute grouped aggregates in one streaming pass
+
+        Only the referenced columns are read. Each chunk is reduced to mergeable
+        partials (count, sum, sum of squared deviations, min, max) which are combined at the end.
+
+        Args:
+            metrics: Column -> aggregation ('count', 'sum', 'mean', 'min', 'max', 'std')
+            group_by: Columns to group by
+            where: Optional pandas query expression applied to each chunk
+
+        Returns:
+            DataFrame with one '<column>_<aggregation>' column per metric
+        """
+        group_by = list(group_by or [])
+        for column, func in metrics.items():
+            if func not in AGGREGATIONS:
+                raise ValueError(f"Unsupported aggregation '{func}', use one of {AGGREGATIONS}")
+        needed = list(dict.fromkeys(group_by + list(metrics) + self._referenced_columns(where or "")))
+        unknown = [column for column in needed if column not in self.columns]
+        if unknown:
+            raise ValueError(f"Unknown columns: {unknown}")
+
+        partials = []
+        for chunk in self.iter_chunks(columns=needed):
+            if where:
+                chunk = chunk.query(where)
+            partials.append(_partial_aggregates(chunk, metrics, group_by))
+            if len(partials) >= 16:
+                partials = [_merge_partials(partials)]
+        if not partials:
+            return pd.DataFrame(columns=[f"{c}_{f}" for c, f in metrics.items()])
+
+        return _finalize_aggregates(_merge_partials(partials), metrics, group_by)
+
+    def value_counts(self, column: str, top: int = 20) -> pd.Series:
+        """Most frequent values of a column, streamed"""
+        totals: Optional[pd.Series] = None
+        for chunk in self.iter_chunks(columns=[column]):
+            counts = chunk[column].value_counts()
+            totals = counts if totals is None else totals.add(counts, fill_value=0)
+        if totals is None:
+            return pd.Series(dtype=np.int64)
+        return totals.astype(np.int64).nlargest(top)
+
+
+def _partial_aggregates(chunk: pd.DataFrame, metrics: Dict[str, str], group_by: List[str]) -> pd.DataFrame:
+    """Reduce a chunk to mergeable per-group partials"""
+    keys = group_by or ["__all__"]
+    if not group_by:
+        chunk = chunk.assign(__all__=0)
+    grouped = chunk.groupby(keys, observed=True, dropna=False, sort=False)
+    pieces = {}
+    for column in dict.fromkeys(metrics):
+        values = grouped[column]
+        pieces[(column, "count")] = values.count()
+        if pd.api.types.is_numeric_dtype(chunk[column].dtype):
+            pieces[(column, "sum")] = values.sum()
+            pieces[(column, "min")] = values.min()
+            pieces[(column, "max")] = values.max()
+            # Squared deviations from the group mean, not raw squares, so std does not cancel
+            floats = chunk[column].astype(np.float64)
+            variance = floats.groupby([chunk[key] for key in keys],
+                                      observed=True, dropna=False, sort=False).var(ddof=0)
+            pieces[(column, "m2")] = (variance * pieces[(column, "count")]).fillna(0.0)
+    return pd.DataFrame(pieces)
+
+
+def _combine_partials(partials: pd.DataFrame, levels: List) -> pd.DataFrame:
+    """
+    Merge rows of partials that fall in the same group
+
+    Counts, sums and extrema merge directly; squared deviations are combined
+    with the pairwise update of Chan et al., generalized to any number of
+    partials: M2 = sum(M2_i) + sum(n_i * (mean_i - mean)^2).
+
+    Args:
+        partials: Partial aggregates, possibly several rows per group
+        levels: Index levels to group by; empty merges every row into one
+    """
+    spec = {column: _MERGE[column[1]] for column in partials.columns if column[1] != "m2"}
+    keys = {"level": levels} if levels else {"by": lambda _: 0}
+
+    def grouped(frame):
+        return frame.groupby(dropna=False, sort=True, **keys)
+
+    merged = grouped(partials).agg(spec)
+    for column in [column for column, part in partials.columns if part == "m2"]:
+        count, total = partials[(column, "count")], partials[(column, "sum")]
+        grand = grouped(total).transform("sum") / grouped(count).transform("sum")
+        spread = (count * (total / count - grand) ** 2).where(count > 0, 0.0)
+        merged[(column, "m2")] = grouped(partials[(column, "m2")] + spread).sum()
+    return merged
+
+
+def _merge_partials(partials: List[pd.DataFrame]) -> pd.DataFrame:
+    """Combine partial aggregates from several chunks"""
+    combined = pd.concat(partials)
+    return _combine_partials(combined, list(range(combined.index.nlevels)))
+
+
+def _finalize_aggregates(merged: pd.DataFrame, metrics: Dict[str, str], group_by: List[str]) -> pd.DataFrame:
+    """Turn merged partials into one '<column>_<aggregation>' column per metric"""
+    result = pd.DataFrame(index=merged.index)
+    for column, func in metrics.items():
+        count = merged[(column, "count")]
+        if func == "count":
+            result[f"{column}_count"] = count
+        elif func == "mean":
+            result[f"{column}_mean"] = merged[(column, "sum")] / count
+        elif func == "std":
+            result[f"{column}_std"] = np.sqrt(merged[(column, "m2")] / (count - 1))
+        else:
+            result[f"{column}_{func}"] = merged[(column, func)]
+    if not group_by:
+        result = result.reset_index(drop=True)
+    return result
+
+
+def _format_frame(df: pd.DataFrame) -> str:
+    return df.to_string(max_rows=TOOL_OUTPUT_MAX_ROWS)
+
+
+def make_dataset_tools(dataset: ChunkedDataset) -> List[StructuredTool]:
+    """
+    Build agent tools that run against a chunked dataset
+
+    Args:
+        dataset: Dataset the tools read from
+
+    Returns:
+        List of LangChain tools
+    """
+
+    def aggregate(metrics: Dict[str, str], group_by: Optional[List[str]] = None,
+                  where: Optional[str] = None) -> str:
+        try:
+            return _format_frame(dataset.aggregate(metrics, group_by, where))
+        except Exception as e:
+            return f"Error aggregating dataset: {str(e)}"
+
+    def head(n: int = 5) -> str:
+        return _format_frame(dataset.head(min(n, TOOL_OUTPUT_MAX_ROWS)))
+
+    def value_counts(column: str, top: int = 20) -> str:
+        try:
+            return dataset.value_counts(column, top).to_string()
+        except Exception as e:
+            return f"Error counting values: {str(e)}"
+
+    return [
+        StructuredTool.from_function(
+            aggregate,
+            name="dataset_aggregate",
+            description=(
+                "Aggregate the dataset without loading it into memory. metrics maps column "
+                f"names to one of {', '.join(AGGREGATIONS)}; group_by is an optional list of "
+                "columns; where is an optional pandas query expression, e.g. \"age > 17\"."
+            ),
+        ),
+        StructuredTool.from_function(
+            head, name="dataset_head", description="Show the first n rows of the dataset."
+        ),
+        StructuredTool.from_function(
+            value_counts,
+            name="dataset_value_counts",
+            description="Most frequent values of a column with their counts.",
+        ),
+    ]
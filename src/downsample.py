@@ -0,0 +1,82 @@
+"""
+Downsampling for large chart series
+Largest-triangle-three-buckets for line series and 2D binning for scatter
+plots, so render cost stays bounded regardless of input size
+"""
+from typing import Tuple
+
+import numpy as np
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Select points with the largest-triangle-three-buckets algorithm
+
+    Args:
+        x: Monotonic x coordinates
+        y: y coordinates
+        threshold: Number of points to keep (first and last are always kept)
+
+    Returns:
+        Sorted indices of the selected points
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # threshold - 2 buckets over the interior points [1, n - 1)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.intp)
+    selected = np.empty(threshold, dtype=np.intp)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start = edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        bucket_x, bucket_y = x[start:end], y[start:end]
+        area = np.abs((x[a] - avg_x) * (bucket_y - y[a]) - (x[a] - bucket_x) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample_series(values, max_points: int) -> Tuple[np.ndarray, np.ndarray, float]:
+    """
+    Downsample a line series indexed by position
+
+    Args:
+        values: Series values
+        max_points: Maximum number of points to keep
+
+    Returns:
+        Tuple of (x positions, y values, reduction ratio)
+    """
+    y = np.asarray(values, dtype=np.float64)
+    x = np.arange(len(y), dtype=np.float64)
+    finite = np.isfinite(y)
+    if not finite.all():
+        x, y = x[finite], y[finite]
+    if len(y) <= max_points:
+        return x, y, 1.0
+    keep = lttb_indices(x, y, max_points)
+    return x[keep], y[keep], len(y) / len(keep)
+
+
+def bin_points(x_data, y_data, bins: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Bin scatter points into a 2D histogram
+
+    Args:
+        x_data: x coordinates
+        y_data: y coordinates
+        bins: Number of bins along each axis
+
+    Returns:
+        Tuple of (counts, x edges, y edges) as from numpy.histogram2d
+    """
+    x = np.asarray(x_data, dtype=np.float64)
+    y = np.asarray(y_data, dtype=np.float64)
+    finite = np.isfinite(x) & np.isfinite(y)
+    return np.histogram2d(x[finite], y[finite], bins=bins)
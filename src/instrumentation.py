@@ -0,0 +1,298 @@
+"""
+Instrumentation for Data Visualization Agent
+Callback handler that records per-query spans for LLM calls and tool
+invocations, and a metrics registry that aggregates them across queries
+and exports Prometheus text format
+"""
+import bisect
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from langchain.callbacks.base import BaseCallbackHandler
+
+from src.context import estimate_tokens
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+ITERATION_BUCKETS = (1, 2, 3, 5, 8, 13, 21)
+
+
+def _message_text(message: Any) -> str:
+    """Text of a chat message including any function call arguments"""
+    text = str(getattr(message, "content", "") or "")
+    function_call = getattr(message, "additional_kwargs", {}).get("function_call")
+    if function_call:
+        text += function_call.get("name", "") + function_call.get("arguments", "")
+    return text
+
+
+class InstrumentationCallback(BaseCallbackHandler):
+    """
+    Callback handler that records spans for one agent query
+
+    Create one handler per query and pass it in the invoke config. LLM spans
+    record duration, time-to-first-token and token usage (estimated from the
+    text when the provider does not report usage, e.g. while streaming); tool
+    spans record duration and output size.
+
+    Args:
+        tool_stats: Called with a tool run id when the tool ends; its dict is merged
+            into the span (e.g. sandbox execution time and peak RSS)
+    """
+
+    def __init__(self, tool_stats: Optional[Callable[[UUID], Dict[str, Any]]] = None):
+        self.tool_stats = tool_stats
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.spans: List[Dict[str, Any]] = []
+        self.iterations = 0
+        self._open: Dict[UUID, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id: UUID, span: Dict[str, Any]) -> None:
+        span["start"] = time.perf_counter()
+        with self._lock:
+            self._open[run_id] = span
+
+    def _end(self, run_id: UUID, **fields: Any) -> Optional[Dict[str, Any]]:
+        now = time.perf_counter()
+        with self._lock:
+            span = self._open.pop(run_id, None)
+            if span is None:
+                return None
+            span.update(fields)
+            span["duration_s"] = now - span.pop("start")
+            span["offset_s"] = now - span["duration_s"] - self.started
+            span.pop("first_token", None)
+            self.spans.append(span)
+        return span
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id, {
+            "type": "llm",
+            "prompt_tokens": sum(estimate_tokens(p) for p in prompts),
+            "first_token": None,
+        })
+
+    def on_chat_model_start(
+        self, serialized: Dict[str, Any], messages: List[List[Any]], *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        text = "".join(_message_text(m) for batch in messages for m in batch)
+        self._start(run_id, {"type": "llm", "prompt_tokens": estimate_tokens(text), "first_token": None})
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        span = self._open.get(run_id)
+        if span is not None and span["first_token"] is None:
+            span["first_token"] = time.perf_counter()
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        span = self._open.get(run_id)
+        if span is None:
+            return
+        ttft = span["first_token"] - span["start"] if span["first_token"] is not None else None
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        if usage.get("completion_tokens") is not None:
+            prompt_tokens = usage.get("prompt_tokens", span["prompt_tokens"])
+            completion_tokens = usage["completion_tokens"]
+            estimated = False
+        else:
+            text = "".join(
+                _message_text(g.message) if hasattr(g, "message") else g.text
+                for batch in response.generations for g in batch
+            )
+            prompt_tokens = span["prompt_tokens"]
+            completion_tokens = estimate_tokens(text)
+            estimated = True
+        self._end(
+            run_id,
+            ttft_s=ttft,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            tokens_estimated=estimated,
+        )
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, error=str(error), ttft_s=None, completion_tokens=0, tokens_estimated=True)
+
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id, {"type": "tool", "name": serialized.get("name", "unknown")})
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        extra = self.tool_stats(run_id) if self.tool_stats else {}
+        self._end(run_id, output_chars=len(str(output)), **extra)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        extra = self.tool_stats(run_id) if self.tool_stats else {}
+        self._end(run_id, output_chars=0, error=str(error), **extra)
+
+    def on_agent_action(self, action: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            self.iterations += 1
+
+    def finish(self) -> Dict[str, Any]:
+        """Close the query and return its metrics"""
+        if self.finished is None:
+            self.finished = time.perf_counter()
+        return self.summary()
+
+    def summary(self) -> Dict[str, Any]:
+        """Aggregate the recorded spans into a JSON-serializable dict"""
+        end = self.finished if self.finished is not None else time.perf_counter()
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s["offset_s"])
+            iterations = self.iterations
+        llm = [s for s in spans if s["type"] == "llm"]
+        tools = [s for s in spans if s["type"] == "tool"]
+        ttfts = [s["ttft_s"] for s in llm if s.get("ttft_s") is not None]
+        return {
+            "total_s": end - self.started,
+            "iterations": iterations,
+            "llm_calls": len(llm),
+            "llm_s": sum(s["duration_s"] for s in llm),
+            "ttft_s": ttfts[0] if ttfts else None,
+            "prompt_tokens": sum(s.get("prompt_tokens", 0) for s in llm),
+            "completion_tokens": sum(s.get("completion_tokens", 0) for s in llm),
+            "tokens_estimated": any(s.get("tokens_estimated") for s in llm),
+            "tool_calls": len(tools),
+            "tool_s": sum(s["duration_s"] for s in tools),
+            "spans": spans,
+        }
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class MetricsRegistry:
+    """
+    Thread-safe counters and histograms aggregated across agent queries
+
+    Metrics are keyed by name and a sorted tuple of label pairs.
+    """
+
+    HELP = {
+        "agent_queries_total": "Agent queries by outcome",
+        "agent_query_seconds": "End-to-end agent query latency",
+        "agent_iterations": "Agent iterations (tool calls chosen) per query",
+        "agent_llm_calls_total": "LLM calls",
+        "agent_llm_seconds": "LLM call duration",
+        "agent_llm_ttft_seconds": "LLM time to first streamed token",
+        "agent_llm_tokens_total": "LLM tokens by kind (estimated when the provider does not report usage)",
+        "agent_tool_calls_total": "Tool invocations",
+        "agent_tool_seconds": "Tool invocation duration",
+        "agent_tool_output_chars_total": "Characters returned by tools",
+    }
+
+    def __init__(self):
+        self._counters: Dict[str, Dict[Tuple, float]] = {}
+        self._histograms: Dict[str, Dict[Tuple, Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        """Add to a counter"""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, **labels: str) -> None:
+        """Record a histogram observation"""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram(buckets)
+            series[key].observe(value)
+
+    def counter_value(self, name: str, **labels: str) -> float:
+        """Current value of a counter (0 if never incremented)"""
+        with self._lock:
+            return self._counters.get(name, {}).get(tuple(sorted(labels.items())), 0.0)
+
+    def record_query(self, metrics: Dict[str, Any], outcome: str = "ok") -> None:
+        """
+        Fold one query's metrics (from InstrumentationCallback.summary) into the registry
+
+        Args:
+            metrics: Per-query metrics dict
+            outcome: Label for the query counter, e.g. 'ok', 'error', 'timeout'
+        """
+        self.inc("agent_queries_total", outcome=outcome)
+        self.observe("agent_query_seconds", metrics["total_s"])
+        self.observe("agent_iterations", metrics["iterations"], buckets=ITERATION_BUCKETS)
+        for span in metrics["spans"]:
+            if span["type"] == "llm":
+                self.inc("agent_llm_calls_total")
+                self.observe("agent_llm_seconds", span["duration_s"])
+                if span.get("ttft_s") is not None:
+                    self.observe("agent_llm_ttft_seconds", span["ttft_s"])
+                self.inc("agent_llm_tokens_total", span.get("prompt_tokens", 0), kind="prompt")
+                self.inc("agent_llm_tokens_total", span.get("completion_tokens", 0), kind="completion")
+            else:
+                self.inc("agent_tool_calls_total", tool=span["name"])
+                self.observe("agent_tool_seconds", span["duration_s"], tool=span["name"])
+                self.inc("agent_tool_output_chars_total", span.get("output_chars", 0), tool=span["name"])
+
+    def to_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name in sorted(self._counters):
+                lines.append(f"# HELP {name} {self.HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in sorted(self._counters[name].items()):
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+            for name in sorted(self._histograms):
+                lines.append(f"# HELP {name} {self.HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, hist in sorted(self._histograms[name].items()):
+                    cumulative = 0
+                    for bound, count in zip(hist.buckets, hist.counts):
+                        cumulative += count
+                        le = ("le", _format_value(bound))
+                        lines.append(f"{name}_bucket{_format_labels(labels, le)} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(labels, ('le', '+Inf'))} {hist.count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(hist.sum)}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """Atomically write the metrics to a file (e.g. for node_exporter's textfile collector)"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Process-wide registry shared by all agents"""
+    return _registry
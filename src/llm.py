@@ -0,0 +1,143 @@
+"""
+Shared LLM clients for Data Visualization Agent
+Agents built for different dataframes reuse one ChatOpenAI instance per
+model configuration, backed by keep-alive HTTP connection pools, so new
+agents do not pay for a fresh client and TLS handshake
+"""
+import asyncio
+import threading
+import weakref
+from typing import TYPE_CHECKING, Any, Dict, Tuple
+
+from src.config import (
+    OPENROUTER_BASE_URL,
+    MODEL_NAME,
+    MODEL_TEMPERATURE,
+    MODEL_MAX_TOKENS,
+    LLM_MAX_CONNECTIONS,
+    LLM_MAX_KEEPALIVE,
+    LLM_KEEPALIVE_EXPIRY,
+    LLM_REQUEST_TIMEOUT,
+)
+
+if TYPE_CHECKING:
+    from langchain.chat_models import ChatOpenAI
+
+_lock = threading.Lock()
+_clients: Dict[Tuple[str, str], Tuple[Any, "_LoopCompletions"]] = {}
+_llms: Dict[Tuple, "ChatOpenAI"] = {}
+
+
+def _http_client(async_: bool = False) -> Any:
+    """httpx client with the configured keep-alive limits, or None without httpx"""
+    try:
+        import httpx
+    except ImportError:
+        # The SDK then builds its own client, which still pools keep-alive connections
+        return None
+    limits = httpx.Limits(
+        max_connections=LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_MAX_KEEPALIVE,
+        keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+    )
+    return httpx.AsyncClient(limits=limits) if async_ else httpx.Client(limits=limits)
+
+
+class _LoopCompletions:
+    """
+    Async chat.completions that uses one AsyncOpenAI client per event loop
+
+    An httpx.AsyncClient's connections belong to the loop that opened them,
+    and query_many runs each batch on a fresh loop (asyncio.run), so a
+    process-wide async client fails with "Event loop is closed" on the next
+    batch. Clients are dropped with their loop.
+    """
+
+    def __init__(self, api_key: str, base_url: str):
+        self.params = {"api_key": api_key, "base_url": base_url, "timeout": LLM_REQUEST_TIMEOUT}
+        self._lock = threading.Lock()
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+
+    def _completions(self) -> Any:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.get(loop)
+            if client is None:
+                import openai
+
+                client = openai.AsyncOpenAI(http_client=_http_client(async_=True), **self.params)
+                self._clients[loop] = client
+        return client.chat.completions
+
+    def create(self, *args: Any, **kwargs: Any) -> Any:
+        return self._completions().create(*args, **kwargs)
+
+
+def _openai_clients(api_key: str, base_url: str) -> Tuple[Any, _LoopCompletions]:
+    """Sync OpenAI client shared by every model on one endpoint, and its per-loop async counterpart"""
+    key = (api_key, base_url)
+    with _lock:
+        if key not in _clients:
+            import openai
+
+            _clients[key] = (
+                openai.OpenAI(
+                    http_client=_http_client(), api_key=api_key, base_url=base_url, timeout=LLM_REQUEST_TIMEOUT
+                ),
+                _LoopCompletions(api_key, base_url),
+            )
+        return _clients[key]
+
+
+def get_llm(
+    api_key: str,
+    model_name: str = MODEL_NAME,
+    temperature: float = MODEL_TEMPERATURE,
+    max_tokens: int = MODEL_MAX_TOKENS,
+    base_url: str = OPENROUTER_BASE_URL,
+) -> "ChatOpenAI":
+    """
+    Get the shared chat model for a configuration, creating it on first use
+
+    Args:
+        api_key: OpenRouter API key
+        model_name: Model identifier
+        temperature: Sampling temperature
+        max_tokens: Completion token limit
+        base_url: OpenAI-compatible API endpoint
+
+    Returns:
+        ChatOpenAI instance shared by every caller with the same arguments
+    """
+    key = (api_key, model_name, temperature, max_tokens, base_url)
+    with _lock:
+        llm = _llms.get(key)
+    if llm is not None:
+        return llm
+
+    # langchain's chat model registry is slow to import; pay for it with the first model
+    from langchain.chat_models import ChatOpenAI
+
+    client, async_client = _openai_clients(api_key, base_url)
+    llm = ChatOpenAI(
+        model_name=model_name,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        openai_api_key=api_key,
+        openai_api_base=base_url,
+        client=client.chat.completions,
+        async_client=async_client,
+        streaming=True,
+    )
+    with _lock:
+        return _llms.setdefault(key, llm)
+
+
+def close_llm_clients() -> None:
+    """Close pooled connections and forget shared models (e.g. at service shutdown)"""
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+        _llms.clear()
+    for client, _ in clients:
+        client.close()
@@ -0,0 +1,238 @@
+"""
+Plan cache for Data Visualization Agent
+Stores the successful pandas snippets the agent wrote for a question template
+and dataframe schema, so structurally identical questions replay the cached
+code directly instead of going through the LLM loop
+"""
+import ast
+import hashlib
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from src.cache import MemoryCache, ResponseCache, SQLiteCache, normalize_question
+from src.config import PLAN_CACHE_BACKEND, PLAN_CACHE_MAX_ENTRIES, PLAN_CACHE_SQLITE_PATH
+
+PYTHON_TOOL = "python_repl_ast"
+
+# Quoted strings and standalone numbers are the parameters of a question template
+_PARAM_RE = re.compile(r"'([^'\\]*)'|\"([^\"\\]*)\"|(?<![\w.])(\d+(?:\.\d+)?)(?![\w.])")
+_TOOL_ERROR_RE = re.compile(r"^[A-Za-z_]\w*(Error|Exception|Exit|Interrupt): ")
+_MARKER = "__plan_param_{}__"
+
+
+def question_template(question: str) -> Tuple[str, List[str]]:
+    """
+    Split a question into a normalized template and its literal parameters
+
+    Args:
+        question: Natural language question
+
+    Returns:
+        (template, params) where numbers and quoted strings are replaced by {}
+    """
+    params: List[str] = []
+
+    def collect(match: "re.Match") -> str:
+        params.append(next(group for group in match.groups() if group is not None))
+        return "{}"
+
+    return normalize_question(_PARAM_RE.sub(collect, question)), params
+
+
+def schema_fingerprint(df: pd.DataFrame) -> str:
+    """Hash of column names and dtypes; unlike the content fingerprint it survives data changes"""
+    payload = json.dumps([[str(name), str(dtype)] for name, dtype in df.dtypes.items()])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _is_number(value: str) -> bool:
+    return re.fullmatch(r"\d+(?:\.\d+)?", value) is not None
+
+
+def _literal_nodes(code: str, value: str) -> List[ast.Constant]:
+    """
+    Constants in a snippet that could be the question literal value
+
+    Numbers must be spelled as in the question; numbers passed as keyword
+    arguments (axis=1, ddof=0) are code constants, never question literals.
+    f-string parts are skipped because their positions are not reliable.
+    """
+    tree = ast.parse(code)
+    skip = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.keyword):
+            skip.add(id(node.value))
+        elif isinstance(node, ast.JoinedStr):
+            skip.update(id(part) for part in ast.walk(node))
+    nodes = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Constant) or id(node) in skip:
+            continue
+        if _is_number(value):
+            if type(node.value) in (int, float) and ast.get_source_segment(code, node) == value:
+                nodes.append(node)
+        elif isinstance(node.value, str) and node.value == value:
+            nodes.append(node)
+    return nodes
+
+
+def _replace_nodes(code: str, replacements: List[Tuple[ast.Constant, str]]) -> str:
+    """Replace the source of AST nodes; offsets are UTF-8 byte columns"""
+    raw = code.encode()
+    starts = [0]
+    for line in raw.splitlines(keepends=True):
+        starts.append(starts[-1] + len(line))
+    spans = [
+        (starts[node.lineno - 1] + node.col_offset, starts[node.end_lineno - 1] + node.end_col_offset, text)
+        for node, text in replacements
+    ]
+    for start, end, text in sorted(spans, reverse=True):
+        raw = raw[:start] + text.encode() + raw[end:]
+    return raw.decode()
+
+
+def parameterize_code(snippets: List[str], params: List[str]) -> List[str]:
+    """
+    Replace the question's literals in generated code with numbered markers
+
+    A parameter is only replaced when it is unambiguous: it occurs once in the
+    question and exactly one constant across the snippets matches it. Other
+    literals stay as written, so the plan only serves those exact values.
+    """
+    replacements: List[List[Tuple[ast.Constant, str]]] = [[] for _ in snippets]
+    for index, value in enumerate(params):
+        if params.count(value) != 1:
+            continue
+        found = [(position, node) for position, code in enumerate(snippets) for node in _literal_nodes(code, value)]
+        if len(found) != 1:
+            continue
+        position, node = found[0]
+        marker = _MARKER.format(index)
+        replacements[position].append((node, marker if _is_number(value) else f"'{marker}'"))
+    return [_replace_nodes(code, nodes) for code, nodes in zip(snippets, replacements)]
+
+
+def bind_code(templates: List[str], stored_params: List[str], params: List[str]) -> Optional[List[str]]:
+    """
+    Substitute new parameter values into parameterized snippets
+
+    Returns None when the plan cannot serve these parameters: a changed value
+    that the code does not reference, or one that is unsafe inside a literal.
+    """
+    snippets = list(templates)
+    for index, (old, new) in enumerate(zip(stored_params, params)):
+        marker = _MARKER.format(index)
+        if not any(marker in code for code in snippets):
+            if old != new:
+                return None
+            continue
+        if "'" in new or '"' in new or "\\" in new:
+            return None
+        snippets = [code.replace(marker, new) for code in snippets]
+    return snippets
+
+
+def is_tool_error(observation: Any) -> bool:
+    """Whether a python_repl_ast observation is an error message rather than a result"""
+    return isinstance(observation, str) and bool(_TOOL_ERROR_RE.match(observation))
+
+
+def plan_snippets(intermediate_steps: List) -> List[str]:
+    """python_repl_ast snippets that ran without an error, in order"""
+    from langchain_experimental.tools.python.tool import sanitize_input
+
+    snippets = []
+    for action, observation in intermediate_steps:
+        if getattr(action, "tool", None) != PYTHON_TOOL or is_tool_error(observation):
+            continue
+        tool_input = action.tool_input
+        code = tool_input.get("query") if isinstance(tool_input, dict) else str(tool_input)
+        snippets.append(sanitize_input(code))
+    return snippets
+
+
+def execute_code(code: str, df: pd.DataFrame, namespace: Optional[Dict[str, Any]] = None) -> Any:
+    """
+    Run a snippet the way python_repl_ast does, but raise instead of returning errors
+
+    Args:
+        code: Snippet whose last statement's value is the result
+        df: DataFrame bound to the name 'df'
+        namespace: Globals shared with earlier snippets of the same plan
+
+    Returns:
+        Value of the last expression, or None when it is a statement
+    """
+    from langchain_experimental.tools.python.tool import sanitize_input
+
+    tree = ast.parse(sanitize_input(code))
+    namespace = {} if namespace is None else namespace
+    namespace["df"] = df
+    exec(compile(ast.Module(tree.body[:-1], type_ignores=[]), "<plan>", "exec"), namespace)
+    last = tree.body[-1:]
+    if last and isinstance(last[0], ast.Expr):
+        return eval(compile(ast.Expression(last[0].value), "<plan>", "eval"), namespace)
+    exec(compile(ast.Module(last, type_ignores=[]), "<plan>", "exec"), namespace)
+    return None
+
+
+class PlanCache:
+    """
+    Generated-code cache keyed by question template and schema
+
+    Args:
+        backend: Storage for plans (any ResponseCache)
+    """
+
+    def __init__(self, backend: ResponseCache):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+
+    @staticmethod
+    def _key(template: str, schema: str) -> str:
+        return hashlib.sha256(json.dumps(["plans", template, schema]).encode()).hexdigest()
+
+    def lookup(self, question: str, df: pd.DataFrame) -> Optional[List[str]]:
+        """Return the plan's snippets bound to this question's parameters, or None"""
+        template, params = question_template(question)
+        entry = self.backend.get(self._key(template, schema_fingerprint(df)))
+        snippets = bind_code(entry["snippets"], entry["params"], params) if entry else None
+        if snippets is None:
+            self.misses += 1
+        return snippets
+
+    def store(self, question: str, df: pd.DataFrame, snippets: List[str]) -> None:
+        """Remember the snippets that answered a question"""
+        template, params = question_template(question)
+        self.backend.set(
+            self._key(template, schema_fingerprint(df)),
+            {"snippets": parameterize_code(snippets, params), "params": params},
+        )
+
+    def __len__(self) -> int:
+        return len(self.backend)
+
+
+def create_plan_cache(backend: str = PLAN_CACHE_BACKEND) -> Optional[PlanCache]:
+    """
+    Factory function to create a plan cache
+
+    Args:
+        backend: 'memory', 'sqlite' or 'none'
+
+    Returns:
+        PlanCache instance, or None when plan caching is disabled
+    """
+    backend = backend.lower()
+    if backend == "memory":
+        return PlanCache(MemoryCache(max_entries=PLAN_CACHE_MAX_ENTRIES, ttl=0))
+    if backend == "sqlite":
+        return PlanCache(SQLiteCache(PLAN_CACHE_SQLITE_PATH, max_entries=PLAN_CACHE_MAX_ENTRIES, ttl=0))
+    if backend in ("none", "off", ""):
+        return None
+    raise ValueError(f"Unknown plan cache backend: {backend}")
@@ -0,0 +1,147 @@
+"""
+Agent pool for Data Visualization Agent
+Caches constructed agents by dataset id so a multi-tenant service reuses a
+hot dataset's agent (profile, prompt and tools) across requests, evicting
+least recently used agents when count or memory limits are exceeded
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Union
+
+import pandas as pd
+
+from src.config import AGENT_POOL_MAX_AGENTS, AGENT_POOL_MAX_MB, logger
+from src.datasets import ChunkedDataset
+
+
+def agent_memory_bytes(agent: Any) -> int:
+    """Approximate memory held by an agent, dominated by its in-memory dataframe"""
+    df = getattr(agent, "df", None)
+    if isinstance(df, pd.DataFrame):
+        return int(df.memory_usage(index=True, deep=True).sum())
+    return 0
+
+
+class AgentPool:
+    """
+    LRU cache of agents keyed by dataset id
+
+    Each dataset id is built once, even when several requests for it arrive
+    concurrently; requests for other ids are not blocked while it builds.
+
+    Args:
+        max_agents: Maximum number of cached agents
+        max_mb: Maximum total dataframe memory of cached agents in MB (0 disables the limit)
+        factory: Callable building an agent from a dataframe and keyword options
+        **agent_kwargs: Options passed to the factory for every agent (e.g. llm, execution_mode)
+    """
+
+    def __init__(
+        self,
+        max_agents: int = AGENT_POOL_MAX_AGENTS,
+        max_mb: float = AGENT_POOL_MAX_MB,
+        factory: Optional[Callable[..., Any]] = None,
+        **agent_kwargs: Any,
+    ):
+        if factory is None:
+            from src.agent import create_agent as factory
+        self.max_agents = max_agents
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.factory = factory
+        self.agent_kwargs = agent_kwargs
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._agents: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._building: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        dataset_id: str,
+        loader: Callable[[], Union[pd.DataFrame, ChunkedDataset]],
+    ) -> Any:
+        """
+        Get the agent for a dataset, building it on a miss
+
+        Args:
+            dataset_id: Stable identifier of the dataset (e.g. tenant and file version)
+            loader: Called on a miss to load the dataframe or ChunkedDataset
+
+        Returns:
+            Cached or newly built agent
+        """
+        agent = self._lookup(dataset_id)
+        if agent is not None:
+            return agent
+
+        with self._lock:
+            build_lock = self._building.setdefault(dataset_id, threading.Lock())
+        with build_lock:
+            # Another request may have built it while we waited
+            agent = self._lookup(dataset_id, count_miss=True)
+            if agent is not None:
+                return agent
+            try:
+                agent = self.factory(loader(), **self.agent_kwargs)
+                self.put(dataset_id, agent)
+            finally:
+                with self._lock:
+                    self._building.pop(dataset_id, None)
+        return agent
+
+    def _lookup(self, dataset_id: str, count_miss: bool = False) -> Optional[Any]:
+        with self._lock:
+            entry = self._agents.get(dataset_id)
+            if entry is None:
+                if count_miss:
+                    self.misses += 1
+                return None
+            self._agents.move_to_end(dataset_id)
+            self.hits += 1
+            return entry["agent"]
+
+    def put(self, dataset_id: str, agent: Any) -> None:
+        """Add or replace an agent, evicting least recently used ones beyond the limits"""
+        size = agent_memory_bytes(agent)
+        with self._lock:
+            self._agents[dataset_id] = {"agent": agent, "bytes": size}
+            self._agents.move_to_end(dataset_id)
+            # The newest agent always stays, even if it alone exceeds the memory limit
+            while len(self._agents) > 1 and (
+                len(self._agents) > self.max_agents
+                or (self.max_bytes and self._memory_bytes() > self.max_bytes)
+            ):
+                evicted, _ = self._agents.popitem(last=False)
+                self.evictions += 1
+                logger.info("Evicted agent for dataset %s from pool", evicted)
+
+    def evict(self, dataset_id: str) -> bool:
+        """Drop a dataset's agent (e.g. after its data changed); returns whether it was cached"""
+        with self._lock:
+            return self._agents.pop(dataset_id, None) is not None
+
+    def clear(self) -> None:
+        """Drop every cached agent"""
+        with self._lock:
+            self._agents.clear()
+
+    def _memory_bytes(self) -> int:
+        return sum(entry["bytes"] for entry in self._agents.values())
+
+    def __len__(self) -> int:
+        return len(self._agents)
+
+    def __contains__(self, dataset_id: str) -> bool:
+        return dataset_id in self._agents
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool size, memory and hit/miss/eviction counters"""
+        with self._lock:
+            return {
+                "agents": len(self._agents),
+                "memory_bytes": self._memory_bytes(),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,257 @@
+"""
+Dataframe profiling for Data Visualization Agent
+Builds a cached, incrementally updatable profile of a dataframe one column
+and one chunk at a time, so summaries never rescan the full frame
+"""
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.cache import column_fingerprints
+from src.config import PROFILE_CHUNK_ROWS, PROFILE_SAMPLE_SIZE, PROFILE_TOP_K
+
+_QUANTILES = (0.25, 0.5, 0.75)
+
+
+class HyperLogLog:
+    """Approximate distinct counter over 64-bit hashes"""
+
+    def __init__(self, precision: int = 12):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        """Add an array of uint64 hashes"""
+        if len(hashes) == 0:
+            return
+        hashes = hashes.astype(np.uint64, copy=False)
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.intp)
+        rest = hashes << np.uint64(self.precision)
+        # Bit length via the float exponent; rest == 0 maps to the maximum rank
+        _, exponent = np.frexp(rest.astype(np.float64))
+        rank = np.where(rest == 0, 64 - self.precision + 1, 64 - exponent + 1)
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+    def merge(self, other: "HyperLogLog") -> None:
+        """Merge another counter with the same precision into this one"""
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self) -> int:
+        """Estimate the number of distinct hashes seen"""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+
+class ColumnProfile:
+    """Mergeable statistics for a single column"""
+
+    def __init__(self, name: Any, dtype: Any, sample_size: int = PROFILE_SAMPLE_SIZE,
+                 top_k: int = PROFILE_TOP_K):
+        self.name = name
+        self.dtype = dtype
+        self.sample_size = sample_size
+        self.top_k = top_k
+        self.count = 0
+        self.null_count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.distinct = HyperLogLog()
+        self._sample_keys = np.empty(0, dtype=np.float64)
+        self._sample_values = np.empty(0, dtype=np.float64)
+        self._value_counts = pd.Series(dtype=np.int64)
+
+    @property
+    def is_numeric(self) -> bool:
+        """Whether the column gets numeric statistics (matches DataFrame.describe)"""
+        return (pd.api.types.is_numeric_dtype(self.dtype)
+                and not pd.api.types.is_bool_dtype(self.dtype))
+
+    @property
+    def tracks_values(self) -> bool:
+        """Whether top values are tracked (everything except floats)"""
+        return not pd.api.types.is_float_dtype(self.dtype)
+
+    def update(self, values: pd.Series) -> None:
+        """Fold a chunk of column values into the profile"""
+        self.dtype = _common_dtype(self.dtype, values.dtype)
+        nulls = int(values.isna().sum())
+        self.null_count += nulls
+        present = values.dropna() if nulls else values
+        if len(present) == 0:
+            return
+
+        self.distinct.add_hashes(pd.util.hash_pandas_object(present, index=False).to_numpy())
+        if self.is_numeric:
+            self._update_numeric(present.to_numpy(dtype=np.float64))
+        else:
+            self.count += len(present)
+        if self.tracks_values:
+            self._update_value_counts(present.value_counts(sort=False))
+
+    def _update_numeric(self, data: np.ndarray) -> None:
+        """Merge chunk moments (Chan et al.), extrema and the bottom-k sample"""
+        n = len(data)
+        chunk_mean = float(data.mean())
+        chunk_m2 = float(((data - chunk_mean) ** 2).sum())
+        total = self.count + n
+        delta = chunk_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += chunk_m2 + delta * delta * self.count * n / total
+        self.count = total
+
+        chunk_min, chunk_max = float(data.min()), float(data.max())
+        self.min = chunk_min if self.min is None else min(self.min, chunk_min)
+        self.max = chunk_max if self.max is None else max(self.max, chunk_max)
+
+        # Bottom-k sampling on random keys is a mergeable uniform reservoir
+        keys = np.concatenate([self._sample_keys, np.random.random(n)])
+        values = np.concatenate([self._sample_values, data])
+        if len(keys) > self.sample_size:
+            keep = np.argpartition(keys, self.sample_size)[:self.sample_size]
+            keys, values = keys[keep], values[keep]
+        self._sample_keys, self._sample_values = keys, values
+
+    def _update_value_counts(self, counts: pd.Series) -> None:
+        """Merge value counts, keeping a bounded set of heavy hitters"""
+        if len(self._value_counts):
+            counts = pd.concat([self._value_counts, counts]).groupby(level=0, sort=False).sum()
+        capacity = self.top_k * 20
+        if len(counts) > capacity:
+            counts = counts.nlargest(capacity)
+        self._value_counts = counts
+
+    @property
+    def std(self) -> float:
+        """Sample standard deviation (ddof=1, as pandas)"""
+        return float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else float("nan")
+
+    def quantiles(self) -> Dict[str, float]:
+        """Quartiles, exact while the column fits in the sample"""
+        if len(self._sample_values) == 0:
+            return {f"{int(q * 100)}%": float("nan") for q in _QUANTILES}
+        values = np.quantile(self._sample_values, _QUANTILES)
+        return {f"{int(q * 100)}%": float(v) for q, v in zip(_QUANTILES, values)}
+
+    def top_values(self) -> List[Any]:
+        """Most frequent values with their (approximate) counts"""
+        top = self._value_counts.nlargest(self.top_k)
+        return [(value, int(count)) for value, count in top.items()]
+
+    def describe(self) -> Dict[str, float]:
+        """Numeric summary in the shape of DataFrame.describe()"""
+        stats = {"count": float(self.count), "mean": self.mean if self.count else float("nan"),
+                 "std": self.std, "min": self.min, "max": self.max}
+        stats.update(self.quantiles())
+        order = ("count", "mean", "std", "min", "25%", "50%", "75%", "max")
+        return {key: float("nan") if stats[key] is None else stats[key] for key in order}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Extended per-column profile"""
+        profile = {
+            "dtype": str(self.dtype),
+            "count": self.count,
+            "null_count": self.null_count,
+            "approx_distinct": self.distinct.count(),
+        }
+        if self.is_numeric:
+            profile.update(self.describe())
+        if self.tracks_values:
+            profile["top_values"] = self.top_values()
+        return profile
+
+
+class DataFrameProfile:
+    """Cached profile of a whole dataframe"""
+
+    def __init__(self, columns: Dict[Any, ColumnProfile], n_rows: int = 0):
+        self.columns = columns
+        self.n_rows = n_rows
+        # Content hashes of the profiled frame (see cache.column_fingerprints); None once
+        # rows are folded in until the owner records the combined frame's hashes
+        self.fingerprints: Optional[Dict[Any, str]] = None
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, chunk_rows: int = PROFILE_CHUNK_ROWS) -> "DataFrameProfile":
+        """
+        Profile a dataframe column-at-a-time in bounded chunks
+
+        Args:
+            df: DataFrame to profile
+            chunk_rows: Rows processed per step, bounding temporary memory
+
+        Returns:
+            DataFrameProfile for the frame
+        """
+        profile = cls({name: ColumnProfile(name, dtype) for name, dtype in df.dtypes.items()})
+        profile.update(df, chunk_rows=chunk_rows)
+        profile.fingerprints = column_fingerprints(df)
+        return profile
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[pd.DataFrame]) -> "DataFrameProfile":
+        """Profile a stream of dataframe chunks without materializing them together"""
+        profile: Optional[DataFrameProfile] = None
+        for chunk in chunks:
+            if profile is None:
+                profile = cls({name: ColumnProfile(name, dtype) for name, dtype in chunk.dtypes.items()})
+            profile.update(chunk)
+        return profile if profile is not None else cls({})
+
+    def update(self, rows: pd.DataFrame, chunk_rows: int = PROFILE_CHUNK_ROWS) -> None:
+        """
+        Incrementally fold appended rows into the profile
+
+        Args:
+            rows: New rows with the same columns as the profiled frame
+            chunk_rows: Rows processed per step
+        """
+        if list(rows.columns) != list(self.columns):
+            raise ValueError("Appended rows must have the same columns as the profiled dataframe")
+        for name in rows.columns:
+            column = rows[name]
+            for start in range(0, len(column), chunk_rows):
+                self.columns[name].update(column.iloc[start:start + chunk_rows])
+        self.n_rows += len(rows)
+        self.fingerprints = None
+
+    def matches(self, df: pd.DataFrame) -> bool:
+        """
+        Check that the profile still describes df's contents
+
+        Compares the per-column content hashes the response cache keys on, so
+        in-place edits that keep the shape (df.loc[...] = x) are caught too.
+        """
+        if df.shape != self.shape or list(df.columns) != list(self.columns) or self.fingerprints is None:
+            return False
+        return column_fingerprints(df) == self.fingerprints
+
+    @property
+    def shape(self):
+        return (self.n_rows, len(self.columns))
+
+    def summary(self) -> Dict[str, Any]:
+        """Summary in the format returned by DataVisualizationAgent.get_data_summary"""
+        return {
+            "shape": self.shape,
+            "columns": list(self.columns),
+            "dtypes": {name: column.dtype for name, column in self.columns.items()},
+            "missing_values": {name: column.null_count for name, column in self.columns.items()},
+            "describe": {name: column.describe() for name, column in self.columns.items()
+                         if column.is_numeric},
+            "profile": {name: column.to_dict() for name, column in self.columns.items()},
+        }
+
+
+def _common_dtype(current: Any, new: Any) -> Any:
+    """The dtype pandas would give a column after concatenating the two"""
+    if current == new:
+        return current
+    return pd.concat([pd.Series([], dtype=current), pd.Series([], dtype=new)]).dtype
@@ -0,0 +1,158 @@
+"""
+Process-pool chart rendering service for Data Visualization Agent
+Dispatches chart jobs to pre-warmed worker processes so matplotlib import,
+font loading and layout never run on the agent's thread
+"""
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, Optional
+
+from src.config import (
+    RENDER_WORKERS,
+    RENDER_MAX_QUEUE,
+    RENDER_TIMEOUT,
+    logger,
+)
+from src.charts import ChartResult, new_chart_path
+
+
+class RenderQueueFull(RuntimeError):
+    """Raised when the render queue is at capacity and the caller will not wait"""
+
+
+def _warm_worker() -> None:
+    """Worker initializer: load matplotlib, the style and the font cache up front"""
+    from src.rendering import render_chart
+
+    render_chart(
+        "bar",
+        {"data": {"warm": 1}, "title": "warm", "xlabel": "", "ylabel": ""},
+        in_memory=True,
+    )
+
+
+def _render_job(kind: str, spec: Dict[str, Any], path: str) -> ChartResult:
+    """Worker entry point; matplotlib is only imported in the worker processes"""
+    from src.rendering import render_chart
+
+    return render_chart(kind, spec, path)
+
+
+def _ping() -> bool:
+    return True
+
+
+class RenderJob:
+    """Handle to a submitted chart; the output path is known before rendering finishes"""
+
+    def __init__(self, kind: str, path: str, future: Future):
+        self.kind = kind
+        self.path = path
+        self.future = future
+
+    def done(self) -> bool:
+        """Whether the chart has finished rendering"""
+        return self.future.done()
+
+    def result(self, timeout: Optional[float] = RENDER_TIMEOUT) -> ChartResult:
+        """Wait for the chart and return its result"""
+        return self.future.result(timeout=timeout)
+
+
+class RenderService:
+    """
+    Pool of warm rendering processes with a bounded job queue
+
+    At most max_queue jobs may be pending or running; further submissions block
+    (back-pressure) or raise RenderQueueFull when block=False.
+    """
+
+    def __init__(
+        self,
+        workers: int = RENDER_WORKERS,
+        max_queue: int = RENDER_MAX_QUEUE,
+        timeout: float = RENDER_TIMEOUT,
+    ):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_queue)
+        self._lock = threading.Lock()
+        self._depth = 0
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_worker,
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of jobs pending or running"""
+        return self._depth
+
+    def warm(self) -> None:
+        """Start every worker now instead of on first use"""
+        futures = [self._executor.submit(_ping) for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+
+    def submit(
+        self,
+        kind: str,
+        spec: Dict[str, Any],
+        output_path: Optional[str] = None,
+        block: bool = True,
+    ) -> RenderJob:
+        """
+        Queue a chart for rendering
+
+        Args:
+            kind: Chart type
+            spec: Keyword arguments for the chart's draw function
+            output_path: Where to write the PNG (a unique path is generated if omitted)
+            block: Wait for a free queue slot instead of raising when full
+
+        Returns:
+            RenderJob whose path is valid once the job completes
+        """
+        if not self._slots.acquire(blocking=block, timeout=self.timeout if block else None):
+            raise RenderQueueFull(f"Render queue is full ({self.max_queue} jobs)")
+        with self._lock:
+            self._depth += 1
+
+        path = output_path or new_chart_path(kind)
+        try:
+            future = self._executor.submit(_render_job, kind, spec, path)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return RenderJob(kind, path, future)
+
+    def render(self, kind: str, spec: Dict[str, Any], output_path: Optional[str] = None) -> ChartResult:
+        """Render a chart in a worker and wait for it"""
+        return self.submit(kind, spec, output_path).result(self.timeout)
+
+    def _release(self) -> None:
+        with self._lock:
+            self._depth -= 1
+        self._slots.release()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker processes"""
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+
+_service: Optional[RenderService] = None
+_service_lock = threading.Lock()
+
+
+def get_render_service() -> RenderService:
+    """Return the shared rendering service, starting it on first use"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            logger.info("Starting render service with %d workers", RENDER_WORKERS)
+            _service = RenderService()
+        return _service
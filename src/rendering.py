@@ -0,0 +1,195 @@
+"""
+Chart rendering engine for Data Visualization Agent
+Draws on standalone Figure/Agg canvases instead of the pyplot state machine,
+so charts can be rendered concurrently from a thread pool
+"""
+import io
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import matplotlib
+import matplotlib.style
+import numpy as np
+from matplotlib.axes import Axes
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from src.charts import ChartResult, new_chart_path
+from src.config import (
+    PLOT_STYLE,
+    FIGURE_SIZE,
+    DPI,
+    LINE_MAX_POINTS,
+    SCATTER_MAX_POINTS,
+    SCATTER_DENSITY_MODE,
+    SCATTER_BINS,
+    logger,
+)
+from src.downsample import bin_points, downsample_series
+
+_style_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def _plot_style() -> Dict[str, Any]:
+    """rc parameters of PLOT_STYLE, or {} (matplotlib defaults) when it is unknown"""
+    style = matplotlib.style.library.get(PLOT_STYLE)
+    if style is None:
+        logger.warning("Unknown PLOT_STYLE %r, using matplotlib defaults", PLOT_STYLE)
+        return {}
+    return dict(style)
+
+
+@contextmanager
+def style_context() -> Iterator[None]:
+    """
+    Apply PLOT_STYLE while a figure is built, leaving the global rcParams as they were
+
+    rc_context swaps the process-wide rcParams for its duration, so building is
+    serialized with a lock. Artists capture their style when they are created,
+    so figures are saved outside the lock and renders still overlap there.
+    """
+    with _style_lock, matplotlib.rc_context(_plot_style()):
+        yield
+
+
+def _label(ax: Axes, title: str, xlabel: str, ylabel: str) -> None:
+    ax.set_title(title, fontsize=16, fontweight='bold')
+    ax.set_xlabel(xlabel, fontsize=12)
+    ax.set_ylabel(ylabel, fontsize=12)
+
+
+def draw_bar(ax: Axes, data: Dict[str, Any], title: str, xlabel: str, ylabel: str) -> str:
+    """Draw a bar chart of category -> value"""
+    x = [str(key) for key in data.keys()]
+    y = list(data.values())
+    ax.bar(x, y, color='steelblue', edgecolor='black', alpha=0.7)
+    _label(ax, title, xlabel, ylabel)
+    for tick in ax.get_xticklabels():
+        tick.set_rotation(45)
+        tick.set_horizontalalignment('right')
+    return ""
+
+
+def draw_line(ax: Axes, data: Dict[str, List], title: str, xlabel: str, ylabel: str) -> str:
+    """Draw one line per series, downsampling long numeric series with LTTB"""
+    notes = []
+    for label, values in data.items():
+        if len(values) > LINE_MAX_POINTS:
+            try:
+                x, y, ratio = downsample_series(values, LINE_MAX_POINTS)
+            except (TypeError, ValueError):
+                ratio = 1.0  # Dates or category labels: matplotlib plots them as given
+            if ratio > 1:
+                ax.plot(x, y, label=label, linewidth=1.5)
+                notes.append(f"'{label}' downsampled from {len(values)} to {len(y)} points "
+                             f"({ratio:.0f}:1, LTTB)")
+                continue
+        ax.plot(values, marker='o', label=label, linewidth=2)
+    _label(ax, title, xlabel, ylabel)
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    return "; ".join(notes)
+
+
+def draw_scatter(ax: Axes, x_data: List, y_data: List, title: str, xlabel: str, ylabel: str) -> str:
+    """Draw a scatter plot, switching to a density plot above SCATTER_MAX_POINTS"""
+    note = ""
+    if len(x_data) > SCATTER_MAX_POINTS:
+        if SCATTER_DENSITY_MODE == "hexbin":
+            x = np.asarray(x_data, dtype=np.float64)
+            y = np.asarray(y_data, dtype=np.float64)
+            finite = np.isfinite(x) & np.isfinite(y)
+            collection = ax.hexbin(x[finite], y[finite], gridsize=SCATTER_BINS, bins='log',
+                                   cmap='viridis', mincnt=1)
+            ax.figure.colorbar(collection, ax=ax, label='count')
+            cells = len(collection.get_array())
+        else:
+            counts, x_edges, y_edges = bin_points(x_data, y_data, SCATTER_BINS)
+            mesh = ax.pcolormesh(x_edges, y_edges, np.ma.masked_equal(counts.T, 0), cmap='viridis')
+            ax.figure.colorbar(mesh, ax=ax, label='count')
+            cells = int(np.count_nonzero(counts))
+        note = (f"{len(x_data)} points binned into {cells} {SCATTER_DENSITY_MODE} cells "
+                f"({len(x_data) / max(cells, 1):.0f}:1)")
+    else:
+        ax.scatter(x_data, y_data, alpha=0.6, s=100, color='steelblue', edgecolors='black')
+    _label(ax, title, xlabel, ylabel)
+    ax.grid(True, alpha=0.3)
+    return note
+
+
+def draw_heatmap(ax: Axes, matrix: List[List[float]], row_labels: List[str], col_labels: List[str],
+                 title: str, xlabel: str, ylabel: str, vmin: Optional[float] = None,
+                 vmax: Optional[float] = None, cmap: str = "viridis") -> str:
+    """Draw an annotated heatmap of a matrix (rows on the y axis)"""
+    import seaborn as sns
+
+    values = np.asarray(matrix, dtype=np.float64)
+    # Annotations are unreadable on large grids
+    annotate = values.size <= 400
+    sns.heatmap(values, ax=ax, annot=annotate, fmt=".2g", cmap=cmap, vmin=vmin, vmax=vmax,
+                xticklabels=col_labels, yticklabels=row_labels, linewidths=0.5)
+    _label(ax, title, xlabel, ylabel)
+    return ""
+
+
+RENDERERS: Dict[str, Callable[..., str]] = {
+    "bar": draw_bar,
+    "line": draw_line,
+    "scatter": draw_scatter,
+    "heatmap": draw_heatmap,
+}
+
+
+def render_chart(
+    kind: str,
+    spec: Dict[str, Any],
+    output_path: Optional[str] = None,
+    in_memory: bool = False,
+) -> ChartResult:
+    """
+    Render a chart on its own figure and canvas
+
+    Args:
+        kind: Chart type, a key of RENDERERS
+        spec: Keyword arguments for the chart's draw function
+        output_path: Where to write the PNG (a unique path is generated if omitted)
+        in_memory: Return PNG bytes instead of writing a file
+
+    Returns:
+        ChartResult with the output path or bytes
+    """
+    if kind not in RENDERERS:
+        raise ValueError(f"Unknown chart kind: {kind}")
+
+    with style_context():
+        figure = Figure(figsize=FIGURE_SIZE, dpi=DPI)
+        FigureCanvasAgg(figure)
+        ax = figure.add_subplot()
+        note = RENDERERS[kind](ax, **spec)
+        figure.tight_layout()
+
+    # The note travels inside the PNG so cached charts can report it without re-rendering
+    metadata = {"Description": note} if note else None
+    if in_memory:
+        buffer = io.BytesIO()
+        figure.savefig(buffer, format='png', dpi=DPI, bbox_inches='tight', metadata=metadata)
+        return ChartResult(kind, data=buffer.getvalue(), note=note)
+
+    path = output_path or new_chart_path(kind)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # Write beside the target and rename, so readers never see a partial file
+    temporary = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        figure.savefig(temporary, format='png', dpi=DPI, bbox_inches='tight', metadata=metadata)
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+    return ChartResult(kind, path=path, note=note)
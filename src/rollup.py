@@ -0,0 +1,239 @@
+"""
+Rollup cube for Data Visualization Agent
+Materializes mergeable group-by partials (count, sum, squared deviations, min,
+max) over the dataframe's low-cardinality columns so common
+group-by-and-aggregate questions are answered from the cube without
+scanning rows, and folds appended rows into it incrementally
+"""
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+from langchain.tools import StructuredTool
+
+from src.config import (
+    ROLLUP_MAX_CARDINALITY,
+    ROLLUP_MAX_DIMENSIONS,
+    ROLLUP_MAX_GROUP_COLUMNS,
+    TOOL_OUTPUT_MAX_ROWS,
+)
+from src.datasets import AGGREGATIONS, _combine_partials, _finalize_aggregates, _merge_partials, _partial_aggregates
+from src.profiling import DataFrameProfile
+
+ROWS = "*"
+
+
+def detect_dimensions(
+    profile: DataFrameProfile,
+    max_cardinality: int = ROLLUP_MAX_CARDINALITY,
+    max_dimensions: int = ROLLUP_MAX_DIMENSIONS,
+) -> List[Any]:
+    """
+    Columns worth grouping by: few distinct values, fewest first
+
+    Uses the profile's distinct-count sketches, so no rows are scanned.
+    """
+    candidates = [
+        (column.distinct.count(), position, name)
+        for position, (name, column) in enumerate(profile.columns.items())
+        if 0 < column.distinct.count() <= max_cardinality and not pd.api.types.is_float_dtype(column.dtype)
+    ]
+    return [name for _, _, name in sorted(candidates)[:max_dimensions]]
+
+
+def _cuboid_partials(df: pd.DataFrame, dimensions: Tuple[Any, ...], measures: List[Any]) -> pd.DataFrame:
+    """Partials of every measure, plus the row count, per combination of dimension values"""
+    keys = list(dimensions)
+    partials = _partial_aggregates(df, {measure: "sum" for measure in measures}, keys)
+    sizes = df.groupby(keys, observed=True, dropna=False, sort=False).size()
+    partials[(ROWS, "count")] = sizes
+    return partials
+
+
+class RollupCube:
+    """
+    Group-by partials over the low-cardinality columns of a dataframe
+
+    Every single dimension is materialized when the cube is built; pairs of
+    dimensions (up to max_group_columns) on first use. Partials are additive,
+    so appended rows are merged in without rescanning the frame.
+
+    Args:
+        profile: Profile of the dataframe, used to pick dimensions and measures
+        max_group_columns: Most dimensions one lookup may group or filter by
+    """
+
+    def __init__(self, profile: DataFrameProfile, max_group_columns: int = ROLLUP_MAX_GROUP_COLUMNS):
+        self.max_group_columns = max_group_columns
+        self.hits = 0
+        self.builds = 0
+        self._lock = threading.Lock()
+        self.reset(profile)
+
+    def reset(self, profile: DataFrameProfile) -> None:
+        """Re-detect dimensions and measures for new data and drop every cuboid"""
+        with self._lock:
+            self.dimensions = detect_dimensions(profile)
+            self.measures = [name for name, column in profile.columns.items() if column.is_numeric]
+            self._cuboids: Dict[Tuple[Any, ...], pd.DataFrame] = {}
+            self._token: Optional[Tuple] = None
+
+    @staticmethod
+    def _make_token(df: pd.DataFrame, version: Any) -> Tuple:
+        # Shape and columns catch generated code that reshaped the frame in place; in-place
+        # edits of values bump the version instead (see DataVisualizationAgent._frame_modified)
+        return (version, id(df), df.shape, tuple(df.columns))
+
+    def is_current(self, df: pd.DataFrame, version: Any) -> bool:
+        """Whether the cube reflects this frame"""
+        return self._token is not None and self._token == self._make_token(df, version)
+
+    def build(self, df: pd.DataFrame, version: Any = None) -> None:
+        """Materialize the single-dimension cuboids (one groupby each)"""
+        with self._lock:
+            self._cuboids = {(d,): _cuboid_partials(df, (d,), self.measures) for d in self.dimensions}
+            self._token = self._make_token(df, version)
+            self.builds += 1
+
+    def extend(self, rows: pd.DataFrame, df: pd.DataFrame, version: Any) -> None:
+        """
+        Merge appended rows into every materialized cuboid
+
+        Args:
+            rows: The new rows only
+            df: Frame after the append
+            version: Data version after the append
+        """
+        with self._lock:
+            for dimensions, partials in self._cuboids.items():
+                self._cuboids[dimensions] = _merge_partials(
+                    [partials, _cuboid_partials(rows, dimensions, self.measures)]
+                )
+            self._token = self._make_token(df, version)
+
+    def _ordered(self, columns: List[Any]) -> Tuple[Any, ...]:
+        return tuple(d for d in self.dimensions if d in set(columns))
+
+    def lookup(
+        self,
+        df: pd.DataFrame,
+        metrics: Dict[str, str],
+        group_by: Optional[List[Any]] = None,
+        filters: Optional[Dict[Any, Any]] = None,
+        version: Any = None,
+    ) -> pd.DataFrame:
+        """
+        Aggregate from the cube
+
+        Args:
+            df: Current frame, only read to (re)build the cube when it is stale
+            metrics: Column -> aggregation; '*' -> 'count' counts rows
+            group_by: Dimensions to group by
+            filters: Dimension -> value equality filters
+            version: Current data version
+
+        Returns:
+            DataFrame with one '<column>_<aggregation>' column per metric ('count' for rows)
+        """
+        group_by = list(group_by or [])
+        filters = dict(filters or {})
+        for column, func in metrics.items():
+            if column == ROWS:
+                if func != "count":
+                    raise ValueError("'*' only supports count")
+            elif column not in self.measures:
+                raise ValueError(f"{column} is not a numeric column of the rollup")
+            elif func not in AGGREGATIONS:
+                raise ValueError(f"Unsupported aggregation '{func}', use one of {AGGREGATIONS}")
+        used = list(dict.fromkeys(group_by + list(filters)))
+        unknown = [c for c in used if c not in self.dimensions]
+        if unknown:
+            raise ValueError(f"Not rollup dimensions: {unknown}")
+        if not used:
+            used = self.dimensions[:1]
+        if not used:
+            raise ValueError("The dataframe has no low-cardinality columns to roll up")
+        if len(used) > self.max_group_columns:
+            raise ValueError(f"At most {self.max_group_columns} columns can be grouped or filtered on")
+
+        if not self.is_current(df, version):
+            self.build(df, version)
+        key = self._ordered(used)
+        with self._lock:
+            partials = self._cuboids.get(key)
+            if partials is None:
+                partials = self._cuboids[key] = _cuboid_partials(df, key, self.measures)
+            else:
+                self.hits += 1
+
+        for column, value in filters.items():
+            level = partials.index.get_level_values(column)
+            partials = partials[level.astype(str) == str(value)]
+        merged = _combine_partials(partials, list(group_by))
+        result = _finalize_aggregates(merged, metrics, group_by)
+        return result.rename(columns={f"{ROWS}_count": "count"})
+
+
+def make_rollup_tools(
+    get_df: Callable[[], pd.DataFrame],
+    cube: RollupCube,
+    get_version: Callable[[], Any] = lambda: None,
+) -> List[StructuredTool]:
+    """
+    Build the rollup lookup tool for an agent's dataframe
+
+    Args:
+        get_df: Returns the dataframe the cube summarizes
+        cube: Cube shared across questions
+        get_version: Returns the current data version
+
+    Returns:
+        List of LangChain tools
+    """
+
+    def rollup_aggregate(
+        metrics: Dict[str, str],
+        group_by: Optional[List[str]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        try:
+            result = cube.lookup(get_df(), metrics, group_by, filters, get_version())
+            return result.to_string(max_rows=TOOL_OUTPUT_MAX_ROWS)
+        except Exception as e:
+            return f"Error aggregating rollup: {str(e)}"
+
+    dimensions = ", ".join(map(str, cube.dimensions))
+    return [
+        StructuredTool.from_function(
+            rollup_aggregate,
+            name="rollup_aggregate",
+            description=(
+                "Instant group-by aggregates of the dataframe `df` from a precomputed cube; prefer "
+                "it to pandas code whenever it can answer. metrics maps numeric columns to one of "
+                f"{', '.join(AGGREGATIONS)} ('*': 'count' counts rows); group_by and filters "
+                f"(column -> value) may use at most {cube.max_group_columns} of these columns "
+                f"together: {dimensions}."
+            ),
+        ),
+    ]
+
+
+def create_rollup(profile: DataFrameProfile, mode: str) -> Optional[RollupCube]:
+    """
+    Factory function for an agent's rollup cube
+
+    Args:
+        profile: Profile of the agent's dataframe
+        mode: 'eager', 'lazy' or 'off'
+
+    Returns:
+        RollupCube, or None when rollups are disabled or nothing can be grouped
+    """
+    mode = mode.lower()
+    if mode in ("off", "none", ""):
+        return None
+    if mode not in ("eager", "lazy"):
+        raise ValueError(f"Unknown rollup mode: {mode}")
+    cube = RollupCube(profile)
+    return cube if cube.dimensions else None
+
@@ -0,0 +1,307 @@
+"""
+Stratified sampling for Data Visualization Agent's approximate mode
+Keeps a reservoir sample of the dataframe per stratum of its low-cardinality
+columns, maintained incrementally as rows are appended, and estimates counts,
+sums and means from it with confidence intervals
+"""
+from statistics import NormalDist
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from langchain.tools import StructuredTool
+
+from src.config import (
+    APPROX_CONFIDENCE,
+    APPROX_MAX_STRATA,
+    APPROX_MIN_STRATUM_ROWS,
+    APPROX_SAMPLE_ROWS,
+    APPROX_STRATA_COLUMNS,
+    TOOL_OUTPUT_MAX_ROWS,
+)
+from src.profiling import DataFrameProfile
+from src.rollup import detect_dimensions
+
+ESTIMATES = ("count", "sum", "mean")
+
+
+def choose_strata(
+    profile: DataFrameProfile,
+    max_columns: int = APPROX_STRATA_COLUMNS,
+    max_strata: int = APPROX_MAX_STRATA,
+) -> List[Any]:
+    """
+    Categorical columns to stratify on, fewest distinct values first
+
+    Columns are added while the number of value combinations stays within max_strata.
+    """
+    columns, strata = [], 1
+    for name in detect_dimensions(profile):
+        distinct = profile.columns[name].distinct.count()
+        if len(columns) == max_columns:
+            break
+        if strata * distinct <= max_strata:
+            columns.append(name)
+            strata *= distinct
+    return columns
+
+
+def _stratum_key(key: Any) -> Tuple:
+    """Hashable stratum key with missing values normalized (NaN != NaN)"""
+    key = key if isinstance(key, tuple) else (key,)
+    return tuple(None if pd.isna(value) else value for value in key)
+
+
+class StratifiedSample:
+    """
+    Reservoir sample of a dataframe, one reservoir per stratum
+
+    Reservoir sizes are proportional to stratum size when the sample is built,
+    with at least min_rows per stratum, so small groups are still represented.
+    Appended rows go through reservoir sampling per stratum, so the sample
+    stays uniform within each stratum without rescanning the frame.
+
+    Args:
+        df: Source dataframe
+        strata: Columns to stratify on (empty for a simple random sample)
+        size: Target number of sampled rows
+        min_rows: Smallest reservoir per stratum
+        seed: Random seed
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        strata: List[Any],
+        size: int = APPROX_SAMPLE_ROWS,
+        min_rows: int = APPROX_MIN_STRATUM_ROWS,
+        seed: int = 0,
+    ):
+        self.strata = list(strata)
+        self.size = size
+        self.min_rows = min_rows
+        self._rng = np.random.default_rng(seed)
+        self._reservoirs: Dict[Tuple, np.ndarray] = {}
+        self._capacity: Dict[Tuple, int] = {}
+        self._seen: Dict[Tuple, int] = {}
+        self._frame: Optional[pd.DataFrame] = None
+        self._source: Optional[pd.DataFrame] = None
+        self.total_rows = 0
+        self._build(df)
+
+    @classmethod
+    def from_profile(cls, df: pd.DataFrame, profile: DataFrameProfile, **kwargs: Any) -> "StratifiedSample":
+        """Sample a frame stratified on the categorical columns its profile detects"""
+        return cls(df, choose_strata(profile), **kwargs)
+
+    def _groups(self, df: pd.DataFrame, offset: int = 0) -> Dict[Tuple, np.ndarray]:
+        """Row positions (shifted by offset) per stratum"""
+        if not self.strata:
+            return {(): np.arange(len(df)) + offset}
+        indices = df.groupby(self.strata, observed=True, dropna=False, sort=False).indices
+        return {_stratum_key(key): positions + offset for key, positions in indices.items()}
+
+    def _build(self, df: pd.DataFrame) -> None:
+        self.total_rows = len(df)
+        for key, positions in self._groups(df).items():
+            share = round(self.size * len(positions) / max(len(df), 1))
+            capacity = max(self.min_rows, share)
+            self._capacity[key] = capacity
+            self._seen[key] = len(positions)
+            if len(positions) > capacity:
+                positions = self._rng.choice(positions, capacity, replace=False)
+            self._reservoirs[key] = np.sort(positions)
+        self._source = df
+
+    def extend(self, df: pd.DataFrame, start: int) -> None:
+        """
+        Fold rows appended to the frame into the reservoirs
+
+        Args:
+            df: Frame after the append
+            start: Position of the first appended row
+        """
+        for key, positions in self._groups(df.iloc[start:], start).items():
+            capacity = self._capacity.setdefault(key, self.min_rows)
+            seen = self._seen.get(key, 0)
+            reservoir = self._reservoirs.get(key, np.empty(0, dtype=np.int64))
+            fill = min(max(capacity - len(reservoir), 0), len(positions))
+            reservoir = np.concatenate([reservoir, positions[:fill]])
+            rest = positions[fill:]
+            if len(rest):
+                # Algorithm R: the i-th row of the stratum replaces a random slot with probability capacity / i
+                counts = seen + fill + np.arange(1, len(rest) + 1)
+                slots = (self._rng.random(len(rest)) * counts).astype(np.int64)
+                keep = slots < capacity
+                # Fancy assignment keeps the last write per slot, as a sequential pass would
+                reservoir[slots[keep]] = rest[keep]
+            self._reservoirs[key] = reservoir
+            self._seen[key] = seen + len(positions)
+        self.total_rows = len(df)
+        self._source = df
+        self._frame = None
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """The sampled rows, in frame order"""
+        if self._frame is None:
+            positions = np.sort(np.concatenate(list(self._reservoirs.values())))
+            self._frame = self._source.iloc[positions]
+        return self._frame
+
+    def __len__(self) -> int:
+        return sum(len(reservoir) for reservoir in self._reservoirs.values())
+
+    def _design(self) -> Tuple[pd.DataFrame, np.ndarray, np.ndarray, np.ndarray]:
+        """Sampled rows with each row's stratum id, plus population and sample size per stratum"""
+        keys = list(self._reservoirs)
+        positions = np.concatenate([self._reservoirs[key] for key in keys])
+        stratum = np.repeat(np.arange(len(keys)), [len(self._reservoirs[key]) for key in keys])
+        population = np.array([self._seen[key] for key in keys], dtype=np.float64)
+        sampled = np.array([len(self._reservoirs[key]) for key in keys], dtype=np.float64)
+        return self._source.iloc[positions], stratum, population, sampled
+
+    def estimate(
+        self,
+        metrics: Dict[str, str],
+        group_by: Optional[List[Any]] = None,
+        filters: Optional[Dict[Any, Any]] = None,
+        confidence: float = APPROX_CONFIDENCE,
+    ) -> pd.DataFrame:
+        """
+        Estimate aggregates of the full frame from the sample
+
+        Totals use the stratified (Horvitz-Thompson) estimator and means the
+        ratio of two totals; intervals come from the normal approximation with
+        the finite population correction, so they shrink to zero once a
+        stratum is sampled in full.
+
+        Args:
+            metrics: Column -> 'count', 'sum' or 'mean'; '*' -> 'count' counts rows
+            group_by: Columns to estimate per value of
+            filters: Column -> value equality filters
+            confidence: Confidence level of the intervals
+
+        Returns:
+            DataFrame with '<column>_<estimate>' plus '_low' and '_high' columns per metric
+        """
+        for column, func in metrics.items():
+            if func not in ESTIMATES:
+                raise ValueError(f"Unsupported estimate '{func}', use one of {ESTIMATES}")
+            if column == "*" and func != "count":
+                raise ValueError("'*' only supports count")
+        rows, stratum, population, sampled = self._design()
+        unknown = [c for c in list(metrics) + list(group_by or []) + list(filters or {})
+                   if c != "*" and c not in rows.columns]
+        if unknown:
+            raise ValueError(f"Unknown columns: {unknown}")
+
+        domain = np.ones(len(rows), dtype=bool)
+        for column, value in (filters or {}).items():
+            domain &= (rows[column].astype(str) == str(value)).to_numpy()
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        weight = population / sampled
+        fpc = 1.0 - sampled / population
+
+        def total(values: np.ndarray) -> Tuple[float, float]:
+            """Estimated population total of per-row values and its variance"""
+            sums = np.bincount(stratum, values, len(population))
+            squares = np.bincount(stratum, values * values, len(population))
+            means = sums / sampled
+            with np.errstate(divide="ignore", invalid="ignore"):
+                variance = np.where(sampled > 1, (squares - sampled * means ** 2) / (sampled - 1), 0.0)
+            return float(weight @ sums), float(np.sum(population ** 2 * fpc * np.maximum(variance, 0) / sampled))
+
+        def estimate(mask: np.ndarray) -> Dict[str, float]:
+            out: Dict[str, float] = {}
+            for column, func in metrics.items():
+                if column == "*":
+                    values, present = np.ones(len(rows)), mask
+                else:
+                    values = pd.to_numeric(rows[column], errors="coerce").to_numpy(dtype=np.float64)
+                    present = mask & np.isfinite(values)
+                    values = np.where(present, values, 0.0)
+                if func == "count":
+                    value, variance = total(present.astype(np.float64))
+                elif func == "sum":
+                    value, variance = total(np.where(present, values, 0.0))
+                else:
+                    count, _ = total(present.astype(np.float64))
+                    if count:
+                        value = total(np.where(present, values, 0.0))[0] / count
+                        # Variance of a ratio of totals, by linearization
+                        _, variance = total(np.where(present, values - value, 0.0) / count)
+                    else:
+                        value, variance = np.nan, np.nan
+                name = "count" if column == "*" else f"{column}_{func}"
+                half = z * np.sqrt(variance)
+                out[name], out[f"{name}_low"], out[f"{name}_high"] = value, value - half, value + half
+            return out
+
+        if not group_by:
+            return pd.DataFrame([estimate(domain)])
+        keys = rows[list(group_by)].astype(str)
+        groups = keys.groupby(list(group_by), sort=True).indices
+        index, records = [], []
+        for key, positions in groups.items():
+            mask = np.zeros(len(rows), dtype=bool)
+            mask[positions] = True
+            mask &= domain
+            if mask.any():
+                index.append(key)
+                records.append(estimate(mask))
+        names = list(group_by)
+        index = pd.MultiIndex.from_tuples(index, names=names) if len(names) > 1 else pd.Index(index, name=names[0])
+        return pd.DataFrame(records, index=index)
+
+    def describe(self) -> Dict[str, Any]:
+        """Sample size, population size and strata, for annotating answers"""
+        return {
+            "sample_rows": len(self),
+            "total_rows": self.total_rows,
+            "strata_columns": self.strata,
+            "strata": len(self._reservoirs),
+        }
+
+
+def make_sampling_tools(
+    get_sample: Callable[[], StratifiedSample],
+    confidence: float = APPROX_CONFIDENCE,
+) -> List[StructuredTool]:
+    """
+    Build the estimate tool for an agent in approximate mode
+
+    Args:
+        get_sample: Returns the agent's current sample
+        confidence: Confidence level of the reported intervals
+
+    Returns:
+        List of LangChain tools
+    """
+
+    def estimate_aggregate(
+        metrics: Dict[str, str],
+        group_by: Optional[List[str]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        try:
+            sample = get_sample()
+            result = sample.estimate(metrics, group_by, filters, confidence)
+            header = (f"Estimated from a stratified sample of {len(sample)} of {sample.total_rows} rows "
+                      f"({confidence:.0%} confidence intervals in the _low/_high columns):\n")
+            return header + result.to_string(max_rows=TOOL_OUTPUT_MAX_ROWS)
+        except Exception as e:
+            return f"Error estimating aggregate: {str(e)}"
+
+    return [
+        StructuredTool.from_function(
+            estimate_aggregate,
+            name="estimate_aggregate",
+            description=(
+                "Estimate counts, sums and means of the FULL dataset from the sample in `df`, with "
+                "confidence intervals; use it for any count, total or average you report. metrics "
+                f"maps columns to one of {', '.join(ESTIMATES)} ('*': 'count' counts rows); group_by "
+                "lists columns to break the estimate down by; filters maps columns to values."
+            ),
+        ),
+    ]
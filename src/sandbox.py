@@ -0,0 +1,324 @@
+"""
+Sandboxed execution backend for Data Visualization Agent
+Runs the agent's generated pandas code in a persistent worker subprocess
+that memory-maps the dataframe from an Arrow IPC file in shared memory,
+under CPU-time and memory rlimits, a wall-clock timeout and periodic
+recycling, so runaway code cannot freeze or OOM the service
+"""
+import asyncio
+import multiprocessing
+import os
+import signal
+import tempfile
+import threading
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Type
+
+import numpy as np
+import pandas as pd
+from langchain.callbacks.manager import AsyncCallbackManagerForToolRun, CallbackManagerForToolRun
+from langchain.pydantic_v1 import BaseModel
+from langchain.tools import BaseTool
+from langchain_experimental.tools.python.tool import PythonAstREPLTool, PythonInputs
+
+from src.config import (
+    SANDBOX_MEMORY_MB,
+    SANDBOX_CPU_SECONDS,
+    SANDBOX_TIMEOUT,
+    SANDBOX_MAX_TASKS,
+    logger,
+)
+from src.data_loader import _read_arrow, _write_arrow, require_pyarrow
+
+_STATS_KEPT = 256
+# Spawning a worker and importing pandas takes seconds; not counted against SANDBOX_TIMEOUT
+_STARTUP_TIMEOUT = 120
+
+
+def _shared_memory_dir() -> str:
+    """Prefer a tmpfs so the Arrow file lives in RAM and is mapped, not copied, by the worker"""
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return "/dev/shm"
+    return tempfile.gettempdir()
+
+
+def _set_cpu_limit(seconds: float) -> None:
+    """Allow this process `seconds` more CPU time before SIGXCPU kills it"""
+    import resource
+
+    used = resource.getrusage(resource.RUSAGE_SELF)
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = int(used.ru_utime + used.ru_stime + seconds) + 1
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _reset_peak_rss() -> bool:
+    """
+    Reset this process's resident-memory high-water mark (Linux only)
+
+    ru_maxrss never goes down, so without a reset it is the worker's lifetime
+    peak rather than the peak of the current step.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Peak RSS since the last _reset_peak_rss, from VmHWM, or None where it is unavailable"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    # Reported in kilobytes
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _transportable(value: Any) -> Any:
+    """Make a REPL result safe and cheap to send back to the parent"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def _worker_main(conn: Any, data_path: str, memory_mb: int, cpu_seconds: float) -> None:
+    """Worker loop: load the mapped dataframe once, then run snippets until told to stop"""
+    import resource
+
+    if memory_mb:
+        # RLIMIT_DATA covers heap and anonymous mappings but not the file-backed
+        # mapping of the dataframe, so the limit applies to what the code allocates
+        limit = int(memory_mb) * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_DATA, (limit, limit))
+    df = _read_arrow(data_path, None, memory_map=True)
+    repl = PythonAstREPLTool(locals={"df": df})
+    conn.send({"ready": True})
+
+    while True:
+        try:
+            code = conn.recv()
+        except EOFError:
+            break
+        if code is None:
+            break
+        if cpu_seconds:
+            _set_cpu_limit(cpu_seconds)
+        measured = _reset_peak_rss()
+        start = time.perf_counter()
+        result = repl._run(code)
+        conn.send({
+            "result": _transportable(result),
+            "exec_s": time.perf_counter() - start,
+            "peak_rss_mb": _peak_rss_mb() if measured else None,
+        })
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class SandboxExecutor:
+    """
+    Persistent, resource-limited worker process that runs pandas snippets
+
+    The dataframe is written once as an uncompressed Arrow IPC file (in
+    /dev/shm when available) and memory-mapped by the worker, so it is never
+    pickled. Like python_repl_ast, variables persist between snippets until
+    the worker is recycled after max_tasks snippets, a timeout or a crash.
+
+    Args:
+        df: DataFrame bound to 'df' in the worker
+        memory_mb: Worker data segment limit in MB (0 disables it)
+        cpu_seconds: CPU seconds allowed per snippet (0 disables it)
+        timeout: Wall-clock seconds per snippet before the worker is killed
+        max_tasks: Snippets a worker runs before it is replaced
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        memory_mb: int = SANDBOX_MEMORY_MB,
+        cpu_seconds: float = SANDBOX_CPU_SECONDS,
+        timeout: float = SANDBOX_TIMEOUT,
+        max_tasks: int = SANDBOX_MAX_TASKS,
+    ):
+        require_pyarrow()
+        self.memory_mb = memory_mb
+        self.cpu_seconds = cpu_seconds
+        self.timeout = timeout
+        self.max_tasks = max_tasks
+        self.tasks = 0
+        self.restarts = 0
+        self.last_stats: Optional[Dict[str, Any]] = None
+        self._stats: "OrderedDict[Any, Dict[str, Any]]" = OrderedDict()
+        self._context = multiprocessing.get_context("spawn")
+        self._process = None
+        self._conn = None
+        self._ready = False
+        self._data_path: Optional[str] = None
+        self._finalizer = None
+        self._lock = threading.Lock()
+        self.update(df)
+
+    def update(self, df: pd.DataFrame) -> None:
+        """Publish a new dataframe and start warming a fresh worker for it"""
+        path = os.path.join(_shared_memory_dir(), f"sandbox-{uuid.uuid4().hex}.arrow")
+        _write_arrow(df, path)
+        with self._lock:
+            self._stop()
+            if self._finalizer is not None:
+                self._finalizer()
+            self._data_path = path
+            self._finalizer = weakref.finalize(self, _remove_file, path)
+            self._start()
+
+    def _start(self) -> None:
+        parent, child = self._context.Pipe()
+        self._process = self._context.Process(
+            target=_worker_main,
+            args=(child, self._data_path, self.memory_mb, self.cpu_seconds),
+            daemon=True,
+        )
+        self._process.start()
+        child.close()
+        self._conn = parent
+        self._ready = False
+        self.tasks = 0
+
+    def _wait_ready(self) -> Optional[str]:
+        """Wait for a new worker to load the dataframe; returns an error message on failure"""
+        if self._ready:
+            return None
+        try:
+            if self._conn.poll(_STARTUP_TIMEOUT) and self._conn.recv().get("ready"):
+                self._ready = True
+                return None
+        except EOFError:
+            pass
+        message = self._crash_message() if not self._process.is_alive() else "worker did not start"
+        self._stop(kill=True)
+        return f"RuntimeError: sandbox failed to start ({message})"
+
+    def _stop(self, kill: bool = False) -> None:
+        if self._process is None:
+            return
+        if kill:
+            self._process.kill()
+        else:
+            try:
+                self._conn.send(None)
+            except (OSError, ValueError):
+                pass
+        self._process.join(timeout=5)
+        if self._process.is_alive():
+            self._process.kill()
+            self._process.join()
+        self._conn.close()
+        self._process = None
+        self._conn = None
+
+    def _crash_message(self) -> str:
+        self._process.join(timeout=5)
+        code = self._process.exitcode
+        if code == -signal.SIGXCPU:
+            return f"TimeoutError: CPU time limit of {self.cpu_seconds} seconds exceeded"
+        if code == -signal.SIGKILL:
+            return "MemoryError: execution process was killed, likely for running out of memory"
+        return f"RuntimeError: execution process exited with code {code}"
+
+    def run(self, code: str, key: Any = None) -> Any:
+        """
+        Execute a snippet in the worker
+
+        Args:
+            code: Python code; the value of its last expression is returned
+            key: Identifier (e.g. the tool run id) under which to keep the step's stats
+
+        Returns:
+            The result, or an error string in python_repl_ast's "ErrorType: message" form
+        """
+        with self._lock:
+            if self._process is None or not self._process.is_alive():
+                self._start()
+            error = self._wait_ready()
+            if error is not None:
+                return error
+            start = time.perf_counter()
+            self._conn.send(code)
+            self.tasks += 1
+            reply = None
+            crashed = False
+            if self._conn.poll(self.timeout):
+                try:
+                    reply = self._conn.recv()
+                except EOFError:
+                    crashed = True
+            if reply is None:
+                if crashed:
+                    result = self._crash_message()
+                    self._stop()
+                else:
+                    result = f"TimeoutError: execution exceeded {self.timeout} seconds"
+                    self._stop(kill=True)
+                logger.warning("Sandbox worker restarted: %s", result)
+                reply = {"result": result, "exec_s": time.perf_counter() - start, "peak_rss_mb": None}
+            elif self.tasks >= self.max_tasks:
+                self._stop()
+            if self._process is None:
+                # Warm the replacement now so the next snippet does not pay for startup
+                self._start()
+                self.restarts += 1
+
+            stats = {"exec_s": reply["exec_s"], "peak_rss_mb": reply["peak_rss_mb"]}
+            self.last_stats = stats
+            if key is not None:
+                self._stats[key] = stats
+                while len(self._stats) > _STATS_KEPT:
+                    self._stats.popitem(last=False)
+            return reply["result"]
+
+    def pop_stats(self, key: Any) -> Dict[str, Any]:
+        """Execution time and the step's own peak RSS (None off Linux), or {} if unknown"""
+        with self._lock:
+            return self._stats.pop(key, {})
+
+    def close(self) -> None:
+        """Stop the worker and delete the shared dataframe file"""
+        with self._lock:
+            self._stop()
+            if self._finalizer is not None:
+                self._finalizer()
+
+
+class SandboxREPLTool(BaseTool):
+    """Drop-in replacement for python_repl_ast that runs code in a SandboxExecutor"""
+
+    name: str = PythonAstREPLTool.__fields__["name"].default
+    description: str = PythonAstREPLTool.__fields__["description"].default
+    args_schema: Type[BaseModel] = PythonInputs
+    executor: Any
+
+    def _run(self, query: str, run_manager: Optional[CallbackManagerForToolRun] = None) -> Any:
+        key = run_manager.run_id if run_manager is not None else None
+        return self.executor.run(query, key=key)
+
+    async def _arun(self, query: str, run_manager: Optional[AsyncCallbackManagerForToolRun] = None) -> Any:
+        key = run_manager.run_id if run_manager is not None else None
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.executor.run, query, key)
@@ -0,0 +1,118 @@
+"""
+SQL push-down engine for Data Visualization Agent
+Exposes the agent's dataframe as a DuckDB view so aggregations run in a
+vectorized, multi-threaded engine instead of the Python REPL
+"""
+import threading
+from typing import List, Optional
+
+import pandas as pd
+from langchain.tools import StructuredTool
+
+from src.config import SQL_THREADS, TOOL_OUTPUT_MAX_ROWS
+
+SQL_AGENT_PREFIX = (
+    "You are working with a table named `df` in DuckDB. Answer questions by calling "
+    "run_sql with a single read-only DuckDB SQL query; do the filtering, grouping and "
+    "aggregation in SQL rather than fetching raw rows. Quote column names that are "
+    "not lowercase identifiers with double quotes."
+)
+
+# Statement types that only read; DESCRIBE, SUMMARIZE and SHOW parse as SELECT
+_READ_ONLY_STATEMENTS = ("SELECT", "EXPLAIN")
+
+
+def require_duckdb():
+    """Raise a helpful ImportError when duckdb is not installed"""
+    try:
+        import duckdb  # noqa: F401
+    except ImportError as e:
+        raise ImportError(
+            "duckdb is required for SQL execution mode; install it with 'pip install duckdb'"
+        ) from e
+
+
+class SQLEngine:
+    """
+    Embedded DuckDB connection with the dataframe registered as a view
+
+    DuckDB scans the pandas column buffers in place, so registering the frame
+    does not copy it. The connection cannot touch the filesystem or network
+    (enable_external_access is off and the configuration locked), so generated
+    SQL can neither read host files nor write them with COPY.
+
+    Args:
+        df: DataFrame to expose
+        table_name: Name of the view in SQL
+        threads: DuckDB worker threads (None keeps DuckDB's default of all cores)
+    """
+
+    def __init__(self, df: pd.DataFrame, table_name: str = "df", threads: Optional[int] = SQL_THREADS):
+        require_duckdb()
+        import duckdb
+
+        self.table_name = table_name
+        self.conn = duckdb.connect()
+        self._lock = threading.Lock()
+        if threads:
+            self.conn.execute(f"SET threads TO {int(threads)}")
+        self.conn.execute("SET enable_external_access = false")
+        self.conn.execute("SET lock_configuration = true")
+        self.register(df)
+
+    def register(self, df: pd.DataFrame) -> None:
+        """Point the view at a (new) dataframe"""
+        with self._lock:
+            self.df = df
+            self.conn.register(self.table_name, df)
+
+    def execute(self, sql: str) -> pd.DataFrame:
+        """
+        Run a read-only query
+
+        Args:
+            sql: A single SELECT/WITH/DESCRIBE/SUMMARIZE/EXPLAIN statement
+
+        Returns:
+            Result as a DataFrame
+        """
+        import duckdb
+
+        statements = duckdb.extract_statements(sql)
+        if len(statements) != 1:
+            raise ValueError("Run exactly one SQL statement per call")
+        if statements[0].type.name not in _READ_ONLY_STATEMENTS:
+            raise ValueError("Only read-only queries (SELECT, WITH, DESCRIBE, SUMMARIZE) are allowed")
+        # Registered frames are connection-local, so queries share the connection;
+        # DuckDB still parallelizes each query across SQL_THREADS internally
+        with self._lock:
+            return self.conn.execute(sql).df()
+
+
+def make_sql_tools(engine: SQLEngine) -> List[StructuredTool]:
+    """
+    Build agent tools that query the DuckDB view
+
+    Args:
+        engine: Engine the tools run against
+
+    Returns:
+        List of LangChain tools
+    """
+
+    def run_sql(query: str) -> str:
+        try:
+            return engine.execute(query).to_string(max_rows=TOOL_OUTPUT_MAX_ROWS)
+        except Exception as e:
+            return f"Error running SQL: {str(e)}"
+
+    return [
+        StructuredTool.from_function(
+            run_sql,
+            name="run_sql",
+            description=(
+                f"Run a read-only DuckDB SQL query against the table `{engine.table_name}` "
+                "and return the result."
+            ),
+        ),
+    ]
@@ -0,0 +1,77 @@
+"""
+Streaming events for Data Visualization Agent
+Async callback handler that turns agent callbacks into structured events
+(token chunks, tool start/end with generated code, chart-ready notices) on
+an asyncio queue for astream_query consumers
+"""
+import asyncio
+import re
+from typing import Any, Dict, List
+from uuid import UUID
+
+from langchain.callbacks.base import AsyncCallbackHandler
+
+_CHART_PATH_RE = re.compile(r"saved as '([^']+)'")
+
+
+def chart_paths_from_output(output: str) -> List[str]:
+    """Every chart file path reported by a chart tool, e.g. the batch chart tool"""
+    return _CHART_PATH_RE.findall(output)
+
+
+def tool_code(input_str: str, inputs: Any) -> str:
+    """Code or SQL a tool was asked to run, falling back to its raw input"""
+    if isinstance(inputs, dict):
+        for key in ("query", "sql", "code"):
+            if isinstance(inputs.get(key), str):
+                return inputs[key]
+    return input_str
+
+
+class StreamEventCallback(AsyncCallbackHandler):
+    """
+    Callback handler that publishes agent progress as event dicts
+
+    Every event has a "type" of 'token', 'tool_start', 'tool_end', 'chart'
+    or 'error'; astream_query adds the closing 'final' event. Handlers run on
+    the event loop, so the queue needs no extra locking.
+
+    Args:
+        queue: Queue the events are put on
+    """
+
+    def __init__(self, queue: "asyncio.Queue[Dict[str, Any]]"):
+        self.queue = queue
+        self._tools: Dict[UUID, str] = {}
+
+    async def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        # Function-call chunks arrive as empty content tokens
+        if token:
+            self.queue.put_nowait({"type": "token", "text": token})
+
+    async def on_tool_start(
+        self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        name = serialized.get("name", "unknown")
+        self._tools[run_id] = name
+        self.queue.put_nowait({
+            "type": "tool_start",
+            "tool": name,
+            "code": tool_code(input_str, kwargs.get("inputs")),
+        })
+
+    async def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        name = self._tools.pop(run_id, "unknown")
+        output = str(output)
+        self.queue.put_nowait({"type": "tool_end", "tool": name, "output": output})
+        for path in chart_paths_from_output(output):
+            self.queue.put_nowait({
+                "type": "chart",
+                "tool": name,
+                "path": path,
+                "ready": "in the background" not in output,
+            })
+
+    async def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        name = self._tools.pop(run_id, "unknown")
+        self.queue.put_nowait({"type": "error", "tool": name, "error": str(error)})
@@ -1,34 +1,51 @@
 """
 Custom tools for Data Visualization Agent
 """
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 from typing import Any, Dict, List
 from langchain.tools import tool
-from src.config import PLOT_STYLE, FIGURE_SIZE, DPI
+from src.chart_store import get_chart_store
+from src.config import CHART_CACHE, RENDER_BACKEND, RENDER_TIMEOUT, RENDER_WAIT
+
+
+def _render(kind: str, spec: Dict[str, Any], label: str) -> str:
+    """Render a chart with the configured backend and describe the outcome"""
+    store = get_chart_store() if CHART_CACHE else None
+    if RENDER_BACKEND == "process":
+        result = store.lookup(kind, spec) if store is not None else None
+        if result is None:
+            from src.render_service import get_render_service
+
+            job = get_render_service().submit(kind, spec, store.path_for(kind, spec) if store else None)
+            if store is not None:
+                def record(future):
+                    # A failed or cancelled render wrote no chart to account for
+                    if not future.cancelled() and future.exception() is None:
+                        store.record(job.path)
+
+                job.future.add_done_callback(record)
+            if not RENDER_WAIT:
+                return f"{label} is being rendered in the background and will be saved as '{job.path}'"
+            result = job.result(RENDER_TIMEOUT)
+    elif store is not None:
+        result = store.render(kind, spec)
+    else:
+        # Matplotlib is imported on the first chart, not when the agent module loads
+        from src.rendering import render_chart
+
+        result = render_chart(kind, spec)
+    message = f"{label} created successfully and saved as '{result.path}'"
+    if result.note:
+        message += f" (downsampled: {result.note})"
+    return message
 
 
 @tool
-def create_bar_chart(data: Dict[str, List], title: str, xlabel: str, ylabel: str) -> str:
+def create_bar_chart(data: Dict[str, Any], title: str, xlabel: str, ylabel: str) -> str:
     """Create a bar chart from data"""
     try:
-        plt.figure(figsize=FIGURE_SIZE)
-        plt.style.use(PLOT_STYLE)
-
-        x = list(data.keys())
-        y = list(data.values())
-
-        plt.bar(x, y, color='steelblue', edgecolor='black', alpha=0.7)
-        plt.title(title, fontsize=16, fontweight='bold')
-        plt.xlabel(xlabel, fontsize=12)
-        plt.ylabel(ylabel, fontsize=12)
-        plt.xticks(rotation=45, ha='right')
-        plt.tight_layout()
-        plt.savefig('output_chart.png', dpi=DPI, bbox_inches='tight')
-        plt.close()
-
-        return "Bar chart created successfully and saved as 'output_chart.png'"
+        return _render(
+            "bar", {"data": data, "title": title, "xlabel": xlabel, "ylabel": ylabel}, "Bar chart"
+        )
     except Exception as e:
         return f"Error creating bar chart: {str(e)}"
 
@@ -37,22 +54,9 @@ def create_bar_chart(data: Dict[str, List], title: str, xlabel: str, ylabel: str
 def create_line_chart(data: Dict[str, List], title: str, xlabel: str, ylabel: str) -> str:
     """Create a line chart from data"""
     try:
-        plt.figure(figsize=FIGURE_SIZE)
-        plt.style.use(PLOT_STYLE)
-
-        for label, values in data.items():
-            plt.plot(values, marker='o', label=label, linewidth=2)
-
-        plt.title(title, fontsize=16, fontweight='bold')
-        plt.xlabel(xlabel, fontsize=12)
-        plt.ylabel(ylabel, fontsize=12)
-        plt.legend()
-        plt.grid(True, alpha=0.3)
-        plt.tight_layout()
-        plt.savefig('output_chart.png', dpi=DPI, bbox_inches='tight')
-        plt.close()
-
-        return "Line chart created successfully and saved as 'output_chart.png'"
+        return _render(
+            "line", {"data": data, "title": title, "xlabel": xlabel, "ylabel": ylabel}, "Line chart"
+        )
     except Exception as e:
         return f"Error creating line chart: {str(e)}"
 
@@ -61,19 +65,11 @@ def create_line_chart(data: Dict[str, List], title: str, xlabel: str, ylabel: st
 def create_scatter_plot(x_data: List, y_data: List, title: str, xlabel: str, ylabel: str) -> str:
     """Create a scatter plot from data"""
     try:
-        plt.figure(figsize=FIGURE_SIZE)
-        plt.style.use(PLOT_STYLE)
-
-        plt.scatter(x_data, y_data, alpha=0.6, s=100, color='steelblue', edgecolors='black')
-        plt.title(title, fontsize=16, fontweight='bold')
-        plt.xlabel(xlabel, fontsize=12)
-        plt.ylabel(ylabel, fontsize=12)
-        plt.grid(True, alpha=0.3)
-        plt.tight_layout()
-        plt.savefig('output_chart.png', dpi=DPI, bbox_inches='tight')
-        plt.close()
-
-        return "Scatter plot created successfully and saved as 'output_chart.png'"
+        return _render(
+            "scatter",
+            {"x_data": x_data, "y_data": y_data, "title": title, "xlabel": xlabel, "ylabel": ylabel},
+            "Scatter plot",
+        )
     except Exception as e:
         return f"Error creating scatter plot: {str(e)}"
 
@@ -81,4 +77,3 @@ def create_scatter_plot(x_data: List, y_data: List, title: str, xlabel: str, yla
 def get_tools() -> List:
     """Return list of available tools"""
     return [create_bar_chart, create_line_chart, create_scatter_plot]
-
@@ -1,6 +1,7 @@
 """
 Unit tests for Data Visualization Agent
 """
+import asyncio
 import unittest
 import pandas as pd
 from src.config import MODEL_NAME, OPENROUTER_API_KEY
@@ -61,6 +62,69 @@ class TestToolsImport(unittest.TestCase):
             self.fail("Could not import tools")
 
 
+class TestAsyncQuery(unittest.TestCase):
+    """Test async and batch query execution"""
+
+    def setUp(self):
+        """Set up an agent with a stubbed executor"""
+        from src.agent import DataVisualizationAgent
+
+        class StubExecutor:
+            in_flight = 0
+            peak = 0
+
+            async def ainvoke(self, inputs, config=None):
+                StubExecutor.in_flight += 1
+                StubExecutor.peak = max(StubExecutor.peak, StubExecutor.in_flight)
+                question = inputs['input'].split('Question: ')[-1]
+                delay = 1.0 if question == 'slow' else 0.01
+                try:
+                    await asyncio.sleep(delay)
+                finally:
+                    StubExecutor.in_flight -= 1
+                return {'input': inputs['input'], 'output': question.upper()}
+
+        self.executor_cls = StubExecutor
+        self.agent = DataVisualizationAgent(
+            pd.DataFrame({'x': [1, 2, 3]}), api_key='test-key', cache=None
+        )
+        self.agent.agent = StubExecutor()
+
+    def test_query_many_preserves_order(self):
+        """Test that results come back in input order"""
+        questions = [f'q{i}' for i in range(6)]
+        responses = self.agent.query_many(questions, max_concurrency=3)
+        self.assertEqual([r['output'] for r in responses], [q.upper() for q in questions])
+        self.assertLessEqual(self.executor_cls.peak, 3)
+
+    def test_per_query_timeout(self):
+        """Test that a slow query times out without failing the batch"""
+        responses = self.agent.query_many(['fast', 'slow'], timeout=0.2)
+        self.assertEqual(responses[0]['output'], 'FAST')
+        self.assertEqual(responses[1]['error'], 'timeout')
+
+
+class TestScriptedAgent(unittest.TestCase):
+    """Test the real agent loop offline with the scripted benchmark LLM"""
+
+    def test_query_runs_recorded_tool_calls(self):
+        """Test that recorded tool calls execute against the dataframe"""
+        from benchmarks.fake_llm import ScriptedChatModel
+        from src.agent import create_agent
+
+        llm = ScriptedChatModel(script=[
+            {'tool': 'python_repl_ast', 'tool_input': {'query': "df['salary'].mean()"}},
+            {'output': 'The average salary is 65000.'},
+        ])
+        df = pd.DataFrame({'salary': [50000, 60000, 70000, 80000]})
+        agent = create_agent(df, llm=llm, cache=None)
+        agent.agent.verbose = False
+        response = agent.query("What is the average salary?")
+        self.assertEqual(response['output'], 'The average salary is 65000.')
+        self.assertEqual(agent.get_intermediate_steps(response)[0][1], 65000.0)
+        self.assertEqual(llm.calls, 2)
+
+
 if __name__ == '__main__':
     unittest.main()
 
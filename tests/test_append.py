@@ -0,0 +1,127 @@
+"""
+Tests for appending to and refreshing a live agent's data
+"""
+import unittest
+
+import pandas as pd
+
+from benchmarks.fake_llm import ScriptedChatModel
+from src.agent import create_agent
+from src.cache import MemoryCache
+
+
+def make_agent(df, code="df['G3'].mean()", **kwargs):
+    llm = ScriptedChatModel(script=[
+        {'tool': 'python_repl_ast', 'tool_input': {'query': code}},
+        {'output': 'Done.'},
+    ])
+    agent = create_agent(df, llm=llm, cache=MemoryCache(ttl=0), plan_cache=None, **kwargs)
+    agent.agent.verbose = False
+    return agent, llm
+
+
+class TestAppend(unittest.TestCase):
+    """Test incremental appends"""
+
+    def setUp(self):
+        self.df = pd.DataFrame({'G3': [10, 12, 14], 'age': [15, 16, 17]})
+
+    def test_appended_rows_reach_the_repl(self):
+        """Test that buffered rows are folded in before the next query"""
+        agent, _ = make_agent(self.df)
+        agent.append([{'G3': 20, 'age': 18}])
+        agent.append(pd.DataFrame({'age': [19], 'G3': [4]}))
+        self.assertEqual(len(agent.df), 3)
+
+        response = agent.query('Average G3?')
+        self.assertEqual(len(agent.df), 5)
+        self.assertEqual(list(agent.df.index), [0, 1, 2, 3, 4])
+        self.assertEqual(response['intermediate_steps'][0][1], 12.0)
+
+    def test_summary_updates_incrementally(self):
+        """Test that the profile reflects appended rows without a rebuild"""
+        agent, _ = make_agent(self.df)
+        profile = agent.profile
+        agent.append({'G3': [20], 'age': [18]})
+        summary = agent.get_data_summary()
+        self.assertIs(agent.profile, profile)
+        self.assertEqual(summary['shape'], (4, 2))
+
+    def test_summary_sees_in_place_edits(self):
+        """Test that generated code editing values in place does not leave stale stats"""
+        agent, _ = make_agent(self.df, code="frame = df\nframe.loc[0, 'G3'] = 100")
+        agent.append({'G3': [20], 'age': [18]})
+        self.assertEqual(agent.get_data_summary()['describe']['G3']['max'], 20)
+        agent.query('Set the first grade to 100')
+        summary = agent.get_data_summary()
+        self.assertEqual(summary['shape'], (4, 2))
+        self.assertEqual(summary['describe']['G3']['max'], 100)
+
+    def test_only_affected_entries_are_invalidated(self):
+        """Test that changing a column the answer did not use keeps the cache entry"""
+        agent, llm = make_agent(self.df)
+        agent.query('Average G3?')
+        self.assertEqual(llm.calls, 2)
+
+        agent.refresh(self.df.assign(age=[20, 21, 22]))
+        self.assertTrue(agent.query('Average G3?').get('cached'))
+        self.assertEqual(llm.calls, 2)
+
+        agent.append({'G3': [20], 'age': [18]})
+        self.assertFalse(agent.query('Average G3?').get('cached', False))
+        self.assertEqual(llm.calls, 4)
+
+    def test_whole_frame_answers_depend_on_every_column(self):
+        """Test that an answer computed from the whole frame is invalidated by any change"""
+        agent, llm = make_agent(self.df.assign(sex=['F', 'M', 'F']), code="df.groupby('sex').mean()")
+        agent.query('Averages by sex?')
+        agent.refresh(self.df.assign(sex=['F', 'M', 'F'], G3=[1, 2, 3]))
+        self.assertFalse(agent.query('Averages by sex?').get('cached', False))
+        self.assertEqual(llm.calls, 4)
+
+    def test_frame_tools_depend_on_every_column(self):
+        """Test that tools reading the frame directly are not treated as column-free"""
+        llm = ScriptedChatModel(script=[
+            {'tool': 'python_repl_ast', 'tool_input': {'query': "df['G3'].std()"}},
+            {'tool': 'correlations', 'tool_input': {'target': 'G3'}},
+            {'output': 'Done.'},
+        ])
+        agent = create_agent(self.df, llm=llm, cache=MemoryCache(ttl=0), plan_cache=None)
+        agent.agent.verbose = False
+        agent.query('What correlates with G3?')
+        agent.refresh(self.df.assign(age=[17, 16, 15]))
+        self.assertFalse(agent.query('What correlates with G3?').get('cached', False))
+
+    def test_rejects_mismatched_columns(self):
+        """Test that rows with different columns are refused"""
+        agent, _ = make_agent(self.df)
+        with self.assertRaises(ValueError):
+            agent.append({'G3': [1]})
+
+    def test_optimized_frame_stays_compact(self):
+        """Test that appends to a memory-optimized frame keep its compact dtypes"""
+        df = self.df.assign(sex=['F', 'M', 'F'])
+        agent, _ = make_agent(pd.concat([df] * 10, ignore_index=True), optimize=True)
+        self.assertEqual([entry['column'] for entry in agent.memory_report], ['sex'])
+        agent.append({'G3': [20], 'age': [18], 'sex': ['X']})
+        response = agent.query('Average G3?')
+        self.assertEqual(agent.df['sex'].dtype, 'string[pyarrow]')
+        self.assertEqual(agent.df['G3'].dtype, 'int64')
+        self.assertAlmostEqual(response['intermediate_steps'][0][1], (12 * 30 + 20) / 31)
+
+
+class TestRefresh(unittest.TestCase):
+    """Test replacing an agent's data"""
+
+    def test_refresh_rebinds_repl(self):
+        """Test that a refreshed frame is what generated code sees"""
+        agent, _ = make_agent(pd.DataFrame({'G3': [1, 2]}), code="len(df)")
+        llm_before = agent.llm
+        agent.refresh(pd.DataFrame({'G3': [1, 2, 3, 4]}))
+        response = agent.query('How many rows?')
+        self.assertEqual(response['intermediate_steps'][0][1], 4)
+        self.assertIs(agent.llm, llm_before)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+Tests for the batch chart tool
+"""
+import os
+import unittest
+
+import pandas as pd
+
+from src.batch_charts import (
+    _render_spec,
+    compute_aggregates,
+    create_charts_from_frame,
+    format_manifest,
+    make_chart_batch_tools,
+    normalize_spec,
+)
+from src.streaming import chart_paths_from_output
+
+
+class TestBatchCharts(unittest.TestCase):
+    """Test grouped aggregation and batch rendering"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.df = pd.DataFrame({
+            'sex': ['F', 'M', 'F', 'M', 'F'],
+            'school': ['GP', 'GP', 'MS', 'MS', 'GP'],
+            'G3': [10, 12, 14, 8, 16],
+            'age': [15, 16, 17, 18, 15],
+        })
+
+    def test_normalize_spec_defaults(self):
+        """Test that missing aggregation and labels are filled in"""
+        spec = normalize_spec({'kind': 'bar', 'x': 'sex'}, list(self.df.columns))
+        self.assertEqual(spec['agg'], 'count')
+        self.assertEqual(spec['title'], 'count by sex')
+        with self.assertRaises(ValueError):
+            normalize_spec({'kind': 'bar', 'x': 'missing'}, list(self.df.columns))
+        with self.assertRaises(ValueError):
+            normalize_spec({'kind': 'heatmap', 'x': 'sex', 'y': 'G3'}, list(self.df.columns))
+
+    def test_specs_sharing_a_grouping_share_one_groupby(self):
+        """Test that all measures for the same grouping come from one frame"""
+        columns = list(self.df.columns)
+        specs = [
+            normalize_spec({'kind': 'bar', 'x': 'sex'}, columns),
+            normalize_spec({'kind': 'bar', 'x': 'sex', 'y': 'G3', 'agg': 'mean'}, columns),
+            normalize_spec({'kind': 'heatmap', 'x': 'sex', 'y': 'G3', 'group_by': 'school'}, columns),
+        ]
+        aggregates = compute_aggregates(self.df, specs)
+        self.assertEqual(set(aggregates), {('sex',), ('sex', 'school')})
+        by_sex = aggregates[('sex',)]
+        self.assertEqual(by_sex.loc['F', '__rows__'], 3)
+        self.assertAlmostEqual(by_sex.loc['F', 'G3__mean'], 40 / 3)
+
+    def test_grouped_lines_keep_x_positions(self):
+        """Test that groups with different x values stay aligned on the shared x axis"""
+        df = pd.DataFrame({'x': [1, 2, 3, 2, 3], 'g': ['a', 'a', 'a', 'b', 'b'], 'y': [1, 2, 3, 4, 5]})
+        spec = normalize_spec({'kind': 'line', 'x': 'x', 'y': 'y', 'agg': 'sum', 'group_by': 'g'}, list(df.columns))
+        kind, arguments = _render_spec(df, spec, compute_aggregates(df, [spec]))
+        self.assertEqual(kind, 'line')
+        self.assertEqual(arguments['data']['a'], [1.0, 2.0, 3.0])
+        self.assertTrue(pd.isna(arguments['data']['b'][0]))
+        self.assertEqual(arguments['data']['b'][1:], [4.0, 5.0])
+
+    def test_manifest_lists_every_chart(self):
+        """Test that charts render in parallel and failures are reported per chart"""
+        manifest = create_charts_from_frame(self.df, [
+            {'kind': 'bar', 'x': 'sex', 'y': 'G3'},
+            {'kind': 'line', 'x': 'age', 'y': 'G3', 'group_by': 'sex'},
+            {'kind': 'scatter', 'x': 'age', 'y': 'G3'},
+            {'kind': 'heatmap', 'x': 'sex', 'y': 'G3', 'group_by': 'school'},
+        ])
+        self.assertEqual([entry['kind'] for entry in manifest], ['bar', 'line', 'scatter', 'heatmap'])
+        for entry in manifest:
+            self.assertTrue(os.path.getsize(entry['path']) > 0)
+            os.remove(entry['path'])
+        self.assertEqual(
+            chart_paths_from_output(format_manifest(manifest)), [entry['path'] for entry in manifest]
+        )
+
+    def test_tool_reads_current_frame(self):
+        """Test that the tool charts whatever frame the agent holds and reports bad specs"""
+        frames = [self.df]
+        create_charts = make_chart_batch_tools(lambda: frames[0])[0]
+        frames[0] = self.df.drop(columns=['G3'])
+        output = create_charts.run({'charts': [{'kind': 'bar', 'x': 'sex', 'y': 'G3'}]})
+        self.assertTrue(output.startswith('Error creating charts: Unknown column: G3'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+"""
+Unit tests for the response cache
+"""
+import os
+import tempfile
+import unittest
+import pandas as pd
+from src.cache import (
+    MemoryCache,
+    SQLiteCache,
+    column_dependencies,
+    dataframe_fingerprint,
+    make_cache_key,
+    mutates_frame,
+    normalize_question,
+)
+
+
+class TestCacheKeys(unittest.TestCase):
+    """Test cache key construction"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.df = pd.DataFrame({'G3': [10, 12, 14], 'sex': ['F', 'M', 'F']})
+
+    def test_normalize_question(self):
+        """Test that case, whitespace and trailing punctuation are ignored"""
+        self.assertEqual(
+            normalize_question("  What is the  average G3? "),
+            normalize_question("what is the average g3"),
+        )
+
+    def test_fingerprint_changes_with_data(self):
+        """Test that a changed dataframe produces a new fingerprint"""
+        before = dataframe_fingerprint(self.df)
+        self.assertEqual(before, dataframe_fingerprint(self.df.copy()))
+        changed = self.df.copy()
+        changed.loc[0, 'G3'] = 11
+        self.assertNotEqual(before, dataframe_fingerprint(changed))
+
+    def test_key_depends_on_model(self):
+        """Test that model settings are part of the key"""
+        fingerprint = dataframe_fingerprint(self.df)
+        self.assertNotEqual(
+            make_cache_key("average G3", "model-a", 0.0, fingerprint),
+            make_cache_key("average G3", "model-b", 0.0, fingerprint),
+        )
+
+
+class TestCodeAnalysis(unittest.TestCase):
+    """Test the snippet analysis that decides which cache entries stay valid"""
+
+    def test_column_dependencies(self):
+        """Test that only explicit selections narrow a snippet's dependencies"""
+        columns = ['sex', 'G3', 'age']
+        self.assertEqual(column_dependencies("df[df['age'] > 15]['G3'].mean()", 'df', columns), {'age', 'G3'})
+        self.assertEqual(column_dependencies("df.groupby('sex')['G3'].mean()", 'df', columns), {'sex', 'G3'})
+        self.assertIsNone(column_dependencies("df.groupby('sex').mean()", 'df', columns))
+        self.assertIsNone(column_dependencies("len(df[df['age'] > 15])", 'df', columns))
+
+    def test_mutates_frame(self):
+        """Test that in-place edits are told apart from reads and rebinding"""
+        for code in ("df['sex'] = 'F'", "df.loc[df['age'] > 15, 'G3'] = 0", "df['G3'] += 1",
+                     "del df['age']", "df['G3'].fillna(0, inplace=True)", "df.insert(0, 'x', 1)"):
+            self.assertTrue(mutates_frame(code, 'df'), code)
+        for code in ("df['G3'].mean()", "df = df.dropna()", "other['x'] = 1",
+                     "df.drop(columns=['age'], inplace=False)"):
+            self.assertFalse(mutates_frame(code, 'df'), code)
+
+
+class TestMemoryCache(unittest.TestCase):
+    """Test the in-memory LRU cache"""
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted"""
+        cache = MemoryCache(max_entries=2, ttl=0)
+        cache.set('a', {'response': 1})
+        cache.set('b', {'response': 2})
+        cache.get('a')
+        cache.set('c', {'response': 3})
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), {'response': 1})
+
+    def test_ttl_expiry(self):
+        """Test that expired entries are not returned"""
+        cache = MemoryCache(max_entries=2, ttl=1e-9)
+        cache.set('a', {'response': 1})
+        self.assertIsNone(cache.get('a'))
+
+    def test_dependencies_are_not_entries(self):
+        """Test that recorded column dependencies neither count as nor evict responses"""
+        cache = MemoryCache(max_entries=1, ttl=0)
+        cache.set('a', {'response': 1})
+        cache.set_dependencies('a', ['G3'])
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.get('a'), {'response': 1})
+        self.assertEqual(cache.get_dependencies('a'), ['G3'])
+
+
+class TestSQLiteCache(unittest.TestCase):
+    """Test the SQLite cache backend"""
+
+    def test_roundtrip_and_eviction(self):
+        """Test that entries persist and the cache stays bounded"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'cache.sqlite')
+            cache = SQLiteCache(path, max_entries=2, ttl=0)
+            for key in ('a', 'b', 'c'):
+                cache.set(key, {'response': {'output': key}, 'elapsed': 1.0})
+            self.assertEqual(len(cache), 2)
+            cache.set_dependencies('c', ['G3'])
+            self.assertEqual(len(cache), 2)
+            reopened = SQLiteCache(path, max_entries=2, ttl=0)
+            self.assertEqual(reopened.get('c')['response'], {'output': 'c'})
+            self.assertEqual(reopened.get_dependencies('c'), ['G3'])
+
+
+class TestAgentCache(unittest.TestCase):
+    """Test cache integration on the agent"""
+
+    def test_repeated_query_hits_cache(self):
+        """Test that a repeated question skips the agent"""
+        from src.agent import DataVisualizationAgent
+
+        class StubExecutor:
+            calls = 0
+
+            def invoke(self, inputs, config=None):
+                StubExecutor.calls += 1
+                return {'input': inputs['input'], 'output': '12.0'}
+
+        agent = DataVisualizationAgent(
+            pd.DataFrame({'G3': [10, 12, 14]}), api_key='test-key', cache=MemoryCache()
+        )
+        agent.agent = StubExecutor()
+        agent.query("What is the average G3?")
+        response = agent.query("what is the average G3")
+        self.assertEqual(StubExecutor.calls, 1)
+        self.assertTrue(response['cached'])
+        self.assertEqual(agent.get_cache_stats()['hits'], 1)
+        self.assertEqual(agent.get_cache_stats()['misses'], 1)
+        # The recorded column dependencies are not response entries
+        self.assertEqual(agent.get_cache_stats()['entries'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Tests for the multi-table catalog
+"""
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from src.catalog import DataCatalog
+
+
+class TestDataCatalog(unittest.TestCase):
+    """Test lazy loading, column projection and schema context"""
+
+    def setUp(self):
+        """Write an orders table to Parquet next to an in-memory customers frame"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.orders_path = os.path.join(self.tmp.name, 'orders.parquet')
+        pd.DataFrame({
+            'order_id': [1, 2, 3, 4],
+            'customer_id': [10, 10, 20, 30],
+            'amount': [5.0, 7.5, 3.0, 9.0],
+            'note': ['a', 'b', 'c', 'd'],
+        }).to_parquet(self.orders_path)
+        self.customers = pd.DataFrame({'customer_id': [10, 20, 30], 'region': ['N', 'S', 'N']})
+        self.catalog = DataCatalog(
+            {'orders': self.orders_path, 'customers': self.customers}, cache_dir=self.tmp.name
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_schema_without_loading(self):
+        """Test that the schema summary covers every table and loads nothing"""
+        context = self.catalog.schema_context('total amount by region')
+        self.assertIn('orders (4 rows): order_id (int64), customer_id (int64), amount (float64)', context)
+        self.assertIn('customers (3 rows)', context)
+        self.assertEqual(self.catalog.memory_bytes(), 0)
+
+    def test_referenced_columns(self):
+        """Test column detection from subscripts, attributes and whole-table use"""
+        code = "m = pd.merge(orders[['customer_id', 'amount']], customers, on='customer_id')\nm.amount.sum()"
+        self.assertEqual(
+            self.catalog.referenced_columns(code),
+            {'orders': {'customer_id', 'amount'}, 'customers': {'customer_id'}},
+        )
+        self.assertEqual(self.catalog.referenced_columns("orders.describe()"), {'orders': None})
+
+    def test_bind_loads_only_referenced_columns(self):
+        """Test that binding materializes named columns and adds more on later use"""
+        namespace = {}
+        self.catalog.bind("orders['amount'].sum()", namespace)
+        self.assertEqual(list(namespace['orders'].columns), ['amount'])
+        self.catalog.bind("orders.groupby('customer_id')['amount'].sum()", namespace)
+        self.assertEqual(list(namespace['orders'].columns), ['customer_id', 'amount'])
+        self.assertNotIn('customers', namespace)
+
+
+class TestCatalogAgent(unittest.TestCase):
+    """Test the agent over a catalog with the scripted LLM"""
+
+    def test_join_across_tables(self):
+        """Test that generated code can join two lazily loaded tables"""
+        from benchmarks.fake_llm import ScriptedChatModel
+        from src.agent import create_agent
+
+        code = (
+            "m = pd.merge(orders, customers, on='customer_id')\n"
+            "m.groupby('region')['amount'].sum().to_dict()"
+        )
+        llm = ScriptedChatModel(script=[
+            {'tool': 'python_repl_ast', 'tool_input': {'query': code}},
+            {'output': 'N: 21.5, S: 3.0'},
+        ])
+        orders = pd.DataFrame({
+            'customer_id': [10, 10, 20, 30], 'amount': [5.0, 7.5, 3.0, 9.0], 'note': list('abcd')
+        })
+        customers = pd.DataFrame({'customer_id': [10, 20, 30], 'region': ['N', 'S', 'N']})
+        agent = create_agent({'orders': orders, 'customers': customers}, llm=llm, cache=None)
+        agent.agent.verbose = False
+        response = agent.query('Total amount by region?')
+        self.assertEqual(response['intermediate_steps'][0][1], {'N': 21.5, 'S': 3.0})
+        loaded = agent.get_data_summary()['tables']['orders']['loaded_columns']
+        self.assertEqual(loaded, ['customer_id', 'amount'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+Tests for the content-addressed chart store
+"""
+import os
+import tempfile
+import time
+import unittest
+
+from src import chart_store
+from src.chart_store import ChartStore, chart_key
+
+
+class TestChartStore(unittest.TestCase):
+    """Test chart reuse, metadata round trips and eviction"""
+
+    def setUp(self):
+        """Set up a store in a temporary directory"""
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = ChartStore(self.directory.name, max_mb=64, max_age=0, memory_mb=8)
+        self.spec = {"data": {"a": 1, "b": 2}, "title": "T", "xlabel": "x", "ylabel": "y"}
+
+    def tearDown(self):
+        """Remove stored charts"""
+        self.directory.cleanup()
+
+    def test_key_ignores_argument_order(self):
+        """Test that the key depends on the arguments, not their order"""
+        reordered = dict(reversed(list(self.spec.items())))
+        self.assertEqual(chart_key("bar", self.spec), chart_key("bar", reordered))
+        self.assertNotEqual(chart_key("bar", self.spec), chart_key("line", self.spec))
+
+    def test_key_covers_downsampling_settings(self):
+        """Test that changing a downsampling limit does not serve charts drawn under the old one"""
+        before = chart_key("line", self.spec)
+        for name, value in (("LINE_MAX_POINTS", 10), ("SCATTER_MAX_POINTS", 10),
+                            ("SCATTER_DENSITY_MODE", "none"), ("SCATTER_BINS", 7)):
+            original = getattr(chart_store, name)
+            setattr(chart_store, name, value)
+            try:
+                self.assertNotEqual(chart_key("line", self.spec), before, name)
+            finally:
+                setattr(chart_store, name, original)
+
+    def test_identical_chart_is_rendered_once(self):
+        """Test that the second request returns the stored file at the same path"""
+        first = self.store.render("bar", self.spec)
+        modified = os.path.getmtime(first.path)
+        second = self.store.render("bar", self.spec)
+        self.assertEqual(first.path, second.path)
+        self.assertEqual((self.store.hits, self.store.misses), (1, 1))
+        self.assertGreaterEqual(os.path.getmtime(second.path), modified)
+        self.assertEqual(os.listdir(self.directory.name), [os.path.basename(first.path)])
+
+    def test_note_survives_a_stored_hit(self):
+        """Test that the downsampling note is read back from the PNG"""
+        spec = {"data": {"s": list(range(5000))}, "title": "T", "xlabel": "x", "ylabel": "y"}
+        first = self.store.render("line", spec)
+        self.assertIn("downsampled", first.note)
+        self.assertEqual(self.store.render("line", spec).note, first.note)
+
+    def test_in_memory_bytes_are_cached(self):
+        """Test that in-memory renders reuse the same bytes without touching disk"""
+        first = self.store.render("bar", self.spec, in_memory=True)
+        second = self.store.render("bar", self.spec, in_memory=True)
+        self.assertIs(first, second)
+        self.assertEqual(os.listdir(self.directory.name), [])
+
+    def test_evict_by_age_and_size(self):
+        """Test that old charts go first and only stored charts are removed"""
+        old = self.store.render("bar", self.spec).path
+        new = self.store.render("bar", dict(self.spec, title="U")).path
+        os.utime(old, (time.time() - 3600, time.time() - 3600))
+        other = os.path.join(self.directory.name, "notes.txt")
+        with open(other, "w") as f:
+            f.write("keep")
+
+        self.store.max_age = 60
+        self.assertEqual(self.store.evict(), 1)
+        self.assertFalse(os.path.exists(old))
+        self.store.max_age = 0
+        self.store.max_bytes = 0
+        self.assertEqual(self.store.evict(), 1)
+        self.assertFalse(os.path.exists(new))
+        self.assertTrue(os.path.exists(other))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+"""
+Unit tests for the prompt context builder
+"""
+import unittest
+import numpy as np
+import pandas as pd
+from src.context import build_schema_context, estimate_tokens, head_prompt_tokens, rank_columns
+from src.profiling import DataFrameProfile
+
+
+class TestSchemaContext(unittest.TestCase):
+    """Test compact schema summaries"""
+
+    def setUp(self):
+        """Set up a wide test frame"""
+        rng = np.random.default_rng(0)
+        columns = {f'feature_{i}': rng.normal(size=50) for i in range(40)}
+        columns['G3'] = rng.integers(0, 20, size=50)
+        columns['sex'] = rng.choice(['F', 'M'], size=50)
+        self.df = pd.DataFrame(columns)
+        self.profile = DataFrameProfile.from_dataframe(self.df)
+
+    def test_named_columns_ranked_first(self):
+        """Test that columns mentioned in the question are ranked first"""
+        ranked = rank_columns(self.profile, "average G3 by sex")
+        self.assertEqual(set(ranked[:2]), {'G3', 'sex'})
+
+    def test_respects_token_budget(self):
+        """Test that the summary stays within its budget"""
+        context = build_schema_context(self.profile, "average G3 by sex", token_budget=120)
+        self.assertLessEqual(estimate_tokens(context), 120)
+        self.assertIn('G3', context)
+        self.assertIn('values', context)
+
+    def test_smaller_than_head(self):
+        """Test that the schema summary is cheaper than df.head() for wide frames"""
+        context = build_schema_context(self.profile, "average G3")
+        self.assertLess(estimate_tokens(context), head_prompt_tokens(self.df))
+
+
+if __name__ == '__main__':
+    unittest.main()
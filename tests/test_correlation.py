@@ -0,0 +1,88 @@
+"""
+Tests for the cached correlation matrix and tool
+"""
+import os
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.correlation import CorrelationCache, correlation_matrix, make_correlation_tools
+from src.streaming import chart_paths_from_output
+
+
+class TestCorrelationMatrix(unittest.TestCase):
+    """Test the vectorized pairwise-complete correlation"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        rng = np.random.default_rng(0)
+        self.df = pd.DataFrame({
+            'studytime': rng.integers(1, 5, 200).astype(float),
+            'G3': rng.normal(10, 3, 200),
+            'absences': rng.poisson(4, 200).astype(float),
+            'school': ['GP', 'MS'] * 100,
+        })
+        self.df.loc[::7, 'G3'] = np.nan
+        self.df.loc[::11, 'absences'] = np.nan
+
+    def test_matches_pandas(self):
+        """Test Pearson and Spearman against DataFrame.corr with missing values"""
+        numeric = self.df.drop(columns=['school'])
+        for method in ('pearson', 'spearman'):
+            expected = numeric.corr(method=method)
+            actual = correlation_matrix(self.df, method)
+            # Spearman ranks whole columns rather than each pair's complete rows
+            tolerance = 1e-10 if method == 'pearson' else 0.02
+            np.testing.assert_allclose(actual.values, expected.values, atol=tolerance)
+
+    def test_cache_recomputes_on_new_version(self):
+        """Test that a matrix is computed once per data version"""
+        cache = CorrelationCache()
+        cache.get(self.df, version=1)
+        cache.get(self.df, version=1)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        cache.get(self.df, version=2)
+        self.assertEqual(cache.misses, 2)
+
+    def test_cache_recomputes_after_in_place_edit(self):
+        """Test that editing a column in place invalidates the cached matrix"""
+        cache = CorrelationCache()
+        df = self.df.copy()
+        before = cache.get(df, version=1)[0].loc['studytime', 'G3']
+        df['G3'] = df['G3'] * -1
+        after = cache.get(df, version=1)[0].loc['studytime', 'G3']
+        self.assertEqual(cache.misses, 2)
+        self.assertAlmostEqual(after, -before)
+
+    def test_sampling(self):
+        """Test that large frames are correlated on a sample"""
+        cache = CorrelationCache(sample_rows=50)
+        matrix, sampled = cache.get(self.df)
+        self.assertTrue(sampled)
+        self.assertEqual(list(matrix.columns), ['studytime', 'G3', 'absences'])
+
+
+class TestCorrelationTool(unittest.TestCase):
+    """Test the agent tool"""
+
+    def test_target_and_heatmap(self):
+        """Test ranking against a target and rendering a heatmap from the cache"""
+        df = pd.DataFrame({'x': [1.0, 2, 3, 4], 'y': [2.0, 4, 6, 9], 'z': [4.0, 1, 3, 2]})
+        cache = CorrelationCache()
+        tool = make_correlation_tools(lambda: df, cache)[0]
+        output = tool.run({'target': 'x'})
+        self.assertTrue(output.startswith('Pearson correlation with x:'))
+        self.assertLess(output.index('y'), output.index('z'))
+
+        output = tool.run({'heatmap': True})
+        [path] = chart_paths_from_output(output)
+        self.assertTrue(os.path.exists(path))
+        os.remove(path)
+        self.assertEqual(cache.misses, 1)
+
+        self.assertTrue(tool.run({'columns': ['missing']}).startswith('Error computing correlations'))
+
+
+if __name__ == '__main__':
+    unittest.main()
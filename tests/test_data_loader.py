@@ -0,0 +1,174 @@
+"""
+Unit tests for the data loader
+"""
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from src.data_loader import detect_format, load_dataset, optimize_dtypes, optimize_memory
+
+
+class TestLoadDataset(unittest.TestCase):
+    """Test CSV conversion, caching and projection"""
+
+    def setUp(self):
+        """Write a sample CSV"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmp.name, 'students.csv')
+        self.cache_dir = os.path.join(self.tmp.name, 'cache')
+        self.df = pd.DataFrame({
+            'sex': ['F', 'M'] * 50,
+            'G3': np.arange(100) % 20,
+            'absences': np.linspace(0, 10, 100),
+        })
+        self.df.to_csv(self.csv_path, index=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_csv_roundtrip_through_cache(self):
+        """Test that CSVs are cached as Arrow and reload with equal values"""
+        first = load_dataset(self.csv_path, cache_dir=self.cache_dir, optimize=True)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+        second = load_dataset(self.csv_path, cache_dir=self.cache_dir, optimize=True)
+        pd.testing.assert_frame_equal(first, second)
+        pd.testing.assert_frame_equal(
+            second.astype({'sex': object, 'G3': 'int64'}), self.df, check_dtype=False
+        )
+        self.assertEqual(second['sex'].dtype, 'string[pyarrow]')
+        # Numeric widths are kept so generated arithmetic cannot overflow
+        self.assertEqual(second['G3'].dtype, np.int64)
+        self.assertEqual((second['G3'] * second['G3']).max(), 19 * 19)
+
+    def test_optimize_flag_is_part_of_cache_key(self):
+        """Test that an unoptimized load does not reuse the optimized cache"""
+        load_dataset(self.csv_path, cache_dir=self.cache_dir, optimize=True)
+        plain = load_dataset(self.csv_path, cache_dir=self.cache_dir)
+        # Optimization is opt-in (MEMORY_OPTIMIZE), so plain loads keep object strings
+        self.assertEqual(plain['sex'].dtype, object)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+
+    def test_csv_parsed_like_pandas(self):
+        """Test that the pyarrow CSV reader types columns the way pd.read_csv does"""
+        path = os.path.join(self.tmp.name, 'mixed.csv.gz')
+        pd.DataFrame({
+            'date': ['2020-01-01', '2020-01-02', '2020-01-03'],
+            'name': ['a', None, 'c'],
+            'count': [1, None, 3],
+            'score': [0.5, 1.5, 2.5],
+        }).to_csv(path, index=False)
+        pd.testing.assert_frame_equal(load_dataset(path, cache_dir=self.cache_dir), pd.read_csv(path))
+
+    def test_column_projection(self):
+        """Test that only requested columns are loaded"""
+        df = load_dataset(self.csv_path, columns=['G3'], cache_dir=self.cache_dir)
+        self.assertEqual(list(df.columns), ['G3'])
+
+    def test_parquet_source(self):
+        """Test that Parquet files load directly"""
+        path = os.path.join(self.tmp.name, 'students.parquet')
+        self.df.to_parquet(path)
+        df = load_dataset(path, columns=['sex', 'G3'])
+        self.assertEqual(df.shape, (100, 2))
+
+
+class TestOptimizeDtypes(unittest.TestCase):
+    """Test lossless dtype shrinking"""
+
+    def test_numeric_widths_kept(self):
+        """Test that numbers keep their precision and only strings are compacted"""
+        df = optimize_dtypes(pd.DataFrame({'exact': [0.5, 1.25] * 50, 'age': [15, 16] * 50, 'sex': ['F', 'M'] * 50}))
+        self.assertEqual(df['exact'].dtype, np.float64)
+        self.assertEqual(df['age'].dtype, np.int64)
+        self.assertEqual(df['sex'].dtype, 'string[pyarrow]')
+
+    def test_detect_format(self):
+        """Test format detection from extensions"""
+        self.assertEqual(detect_format('data/x.parquet'), 'parquet')
+        self.assertEqual(detect_format('https://host/x.csv?dl=1'), 'csv')
+        with self.assertRaises(ValueError):
+            detect_format('x.xlsx')
+
+
+class TestOptimizeMemory(unittest.TestCase):
+    """Test the agent-side memory optimizer"""
+
+    def setUp(self):
+        """Build a frame shaped like a parsed CSV"""
+        rng = np.random.default_rng(0)
+        rows = 2000
+        self.df = pd.DataFrame({
+            'sex': rng.choice(['F', 'M'], rows),
+            'name': [f'student{i}' for i in range(rows)],
+            'reason': rng.choice(['home', 'course', None], rows),
+            'G3': rng.integers(0, 20, rows),
+            'id': rng.integers(0, 2 ** 40, rows),
+            'absences': rng.random(rows),
+        })
+
+    def test_conversions_and_report(self):
+        """Test which columns shrink and that savings are reported per column"""
+        optimized, report = optimize_memory(self.df)
+        dtypes = {entry['column']: entry['to'] for entry in report}
+        # 'reason' has missing values, which Arrow strings would turn from None into <NA>
+        self.assertEqual(dtypes, {'sex': 'string[pyarrow]', 'name': 'string[pyarrow]'})
+        self.assertEqual(optimized['G3'].dtype, np.int64)
+        self.assertEqual(optimized['id'].dtype, np.int64)
+        self.assertEqual(optimized['absences'].dtype, np.float64)
+        for entry in report:
+            self.assertEqual(entry['bytes_saved'], entry['bytes_before'] - entry['bytes_after'])
+            self.assertGreater(entry['bytes_saved'], 0)
+
+    def test_loader_shares_the_policy(self):
+        """Test that optimize_dtypes applies the same conversions"""
+        optimized = optimize_dtypes(self.df)
+        self.assertEqual(optimized['sex'].dtype, 'string[pyarrow]')
+        self.assertEqual(optimized['name'].dtype, 'string[pyarrow]')
+        self.assertEqual(optimized['G3'].dtype, np.int64)
+
+    def test_query_results_unchanged(self):
+        """Test that typical generated snippets give the same answers on the optimized frame"""
+        optimized, _ = optimize_memory(self.df)
+        snippets = [
+            "df['G3'].mean()",
+            "df['G3'].sum()",
+            "(df['G3'] * 100000 * df['G3']).max()",
+            "(df['id'] * df['G3']).cumsum().iloc[-1]",
+            "df[df['sex'] == 'F']['G3'].describe()",
+            "df.groupby('sex')['G3'].mean()",
+            "df.groupby('reason')['absences'].sum()",
+            "df['reason'].value_counts()",
+            "df['sex'].value_counts()",
+            "df[df['sex'] == 'F'].groupby('sex')['G3'].count()",
+            "df.groupby(['sex', 'reason'])['G3'].size()",
+            "df[df['name'].str.endswith('7')]['G3'].count()",
+            "(df['name'] + '_x').str.len().sum()",
+            "df.sort_values(['sex', 'name'])['G3'].head(20).tolist()",
+            "df['G3'].diff().abs().sum()",
+        ]
+        for code in snippets:
+            with self.subTest(code=code):
+                expected = eval(code, {'df': self.df})
+                actual = eval(code, {'df': optimized})
+                if isinstance(expected, pd.Series):
+                    # Same labels and values; Arrow strings only change the index and count dtypes
+                    self.assertEqual(list(actual.index), list(expected.index))
+                    pd.testing.assert_series_equal(
+                        actual.reset_index(drop=True), expected.reset_index(drop=True), check_dtype=False
+                    )
+                else:
+                    self.assertEqual(actual, expected)
+
+    def test_documented_differences(self):
+        """Test the opt-in categorical behaviors optimize_memory warns about, so they stay documented"""
+        optimized, _ = optimize_memory(self.df, categoricals=True)
+        self.assertEqual(optimized['sex'].dtype, 'category')
+        filtered = optimized[optimized['sex'] == 'F'].groupby('sex', observed=False)['G3'].count()
+        self.assertEqual(filtered['M'], 0)
+        with self.assertRaises(TypeError):
+            optimized['sex'] + '_x'
+        self.assertNotIn('sex', optimized.select_dtypes('object').columns)
+
+if __name__ == '__main__':
+    unittest.main()
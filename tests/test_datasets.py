@@ -0,0 +1,75 @@
+"""
+Unit tests for out-of-core chunked datasets
+"""
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from src.datasets import ChunkedDataset
+
+
+class TestChunkedDataset(unittest.TestCase):
+    """Test streaming aggregation over Parquet"""
+
+    def setUp(self):
+        """Write a multi-row-group Parquet file"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'students.parquet')
+        rng = np.random.default_rng(0)
+        self.df = pd.DataFrame({
+            'sex': rng.choice(['F', 'M'], size=1000),
+            'Dalc': rng.integers(1, 6, size=1000),
+            'G3': rng.integers(0, 21, size=1000).astype(float),
+        })
+        self.df.to_parquet(self.path, row_group_size=128)
+        self.dataset = ChunkedDataset(self.path, chunk_rows=100)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_grouped_aggregate_matches_pandas(self):
+        """Test that streamed partial aggregates match an in-memory groupby"""
+        result = self.dataset.aggregate({'G3': 'mean', 'Dalc': 'max'}, group_by=['sex'])
+        expected = self.df.groupby('sex').agg(G3_mean=('G3', 'mean'), Dalc_max=('Dalc', 'max'))
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+    def test_filtered_std(self):
+        """Test that where-filters and std are applied in the stream"""
+        result = self.dataset.aggregate({'G3': 'std'}, where='Dalc > 2')
+        expected = self.df[self.df['Dalc'] > 2]['G3'].std()
+        self.assertAlmostEqual(result['G3_std'].iloc[0], expected, places=9)
+
+    def test_std_with_large_offset(self):
+        """Test that merged std does not cancel catastrophically when values share a large offset"""
+        path = os.path.join(self.tmp.name, 'offset.parquet')
+        df = self.df.assign(G3=self.df['G3'] + 1e9)
+        df.to_parquet(path, row_group_size=128)
+        result = ChunkedDataset(path, chunk_rows=100).aggregate({'G3': 'std'}, group_by=['sex'])
+        expected = df.groupby('sex')['G3'].std()
+        np.testing.assert_allclose(result['G3_std'], expected, rtol=1e-7)
+
+    def test_profile_and_value_counts(self):
+        """Test that streaming profile and value counts agree with pandas"""
+        profile = self.dataset.profile()
+        self.assertEqual(profile.shape, self.df.shape)
+        self.assertAlmostEqual(profile.columns['G3'].mean, self.df['G3'].mean(), places=9)
+        counts = self.dataset.value_counts('sex')
+        self.assertEqual(counts.to_dict(), self.df['sex'].value_counts().to_dict())
+
+    def test_unknown_column(self):
+        """Test that unknown columns are rejected before scanning"""
+        with self.assertRaises(ValueError):
+            self.dataset.aggregate({'missing': 'sum'})
+
+    def test_agent_uses_dataset_tools(self):
+        """Test that an agent built on a dataset gets streaming tools"""
+        from src.agent import create_agent
+        agent = create_agent(self.dataset, api_key='test-key', cache=None)
+        tool_names = {tool.name for tool in agent.agent.tools}
+        self.assertIn('dataset_aggregate', tool_names)
+        self.assertEqual(agent.get_data_summary()['shape'], self.df.shape)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+Unit tests for chart downsampling
+"""
+import unittest
+import numpy as np
+from src.downsample import bin_points, downsample_series, lttb_indices
+from src.rendering import render_chart
+
+
+class TestLTTB(unittest.TestCase):
+    """Test largest-triangle-three-buckets selection"""
+
+    def test_keeps_endpoints_and_spikes(self):
+        """Test that endpoints and a lone spike survive downsampling"""
+        y = np.zeros(10_000)
+        y[4321] = 100.0
+        keep = lttb_indices(np.arange(len(y), dtype=float), y, 100)
+        self.assertEqual(len(keep), 100)
+        self.assertEqual(keep[0], 0)
+        self.assertEqual(keep[-1], len(y) - 1)
+        self.assertIn(4321, keep)
+        self.assertTrue(np.all(np.diff(keep) > 0))
+
+    def test_short_series_untouched(self):
+        """Test that series under the limit are returned as-is"""
+        x, y, ratio = downsample_series([1, 2, 3], 10)
+        self.assertEqual(ratio, 1.0)
+        self.assertEqual(list(y), [1, 2, 3])
+
+
+class TestDensityRendering(unittest.TestCase):
+    """Test that large charts report downsampling"""
+
+    def test_line_chart_note(self):
+        """Test that a long line series is downsampled and noted"""
+        values = np.sin(np.linspace(0, 50, 200_000)).tolist()
+        result = render_chart(
+            'line', {'data': {'signal': values}, 'title': 't', 'xlabel': 'x', 'ylabel': 'y'},
+            in_memory=True,
+        )
+        self.assertIn('LTTB', result.note)
+
+    def test_line_chart_keeps_non_numeric_series(self):
+        """Test that series that are not numbers are plotted as given, short or long"""
+        for count in (5, 5000):
+            with self.subTest(count=count):
+                result = render_chart(
+                    'line',
+                    {'data': {'grade': ['low', 'mid', 'high', 'mid', 'low'] * (count // 5)},
+                     'title': 'Grades', 'xlabel': 'i', 'ylabel': 'grade'},
+                    in_memory=True,
+                )
+                self.assertTrue(result.data.startswith(b'\x89PNG'))
+                self.assertEqual(result.note, "")
+
+    def test_scatter_binning(self):
+        """Test that a large scatter is binned and noted"""
+        rng = np.random.default_rng(0)
+        x, y = rng.normal(size=100_000), rng.normal(size=100_000)
+        counts, _, _ = bin_points(x, y, 10)
+        self.assertEqual(counts.sum(), 100_000)
+        result = render_chart(
+            'scatter', {'x_data': x, 'y_data': y, 'title': 't', 'xlabel': 'x', 'ylabel': 'y'},
+            in_memory=True,
+        )
+        self.assertIn('binned', result.note)
+
+
+if __name__ == '__main__':
+    unittest.main()
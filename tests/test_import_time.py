@@ -0,0 +1,69 @@
+"""
+Tests for import-time cost of the package
+"""
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Generous default so slow CI machines pass; a cold import was ~1s when this was written
+IMPORT_BUDGET_SECONDS = float(os.getenv("IMPORT_BUDGET_SECONDS", "3.0"))
+DEFERRED_MODULES = [
+    "matplotlib",
+    "seaborn",
+    "langchain.agents",
+    "langchain_experimental.agents",
+    "langchain_community.chat_models",
+    "langchain_experimental.tools",
+    "src.sandbox",
+    "src.catalog",
+]
+
+_PROBE = """
+import json, logging, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "seconds": elapsed,
+    "loaded": [m for m in {deferred!r} if m in sys.modules],
+    "root_handlers": len(logging.getLogger().handlers),
+}}))
+"""
+
+
+def probe_import(module):
+    """Import a module in a fresh interpreter and report its cost"""
+    code = _PROBE.format(module=module, deferred=DEFERRED_MODULES)
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestImportTime(unittest.TestCase):
+    """Guard against heavy imports creeping back into module load"""
+
+    def test_agent_import_defers_heavy_modules(self):
+        """Test that importing the agent module leaves chart and agent toolkits unloaded"""
+        report = probe_import("src.agent")
+        self.assertEqual(report["loaded"], [])
+        self.assertLess(report["seconds"], IMPORT_BUDGET_SECONDS)
+
+    def test_render_service_leaves_matplotlib_to_workers(self):
+        """Test that the render service's parent process does not import matplotlib"""
+        report = probe_import("src.render_service")
+        self.assertNotIn("matplotlib", report["loaded"])
+
+    def test_config_import_does_not_configure_logging(self):
+        """Test that importing the package installs no log handlers"""
+        report = probe_import("src")
+        self.assertEqual(report["root_handlers"], 0)
+        self.assertEqual(report["loaded"], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+"""
+Tests for per-query instrumentation and the metrics registry
+"""
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from src.instrumentation import MetricsRegistry
+
+
+class TestAgentInstrumentation(unittest.TestCase):
+    """Test spans recorded during a scripted agent query"""
+
+    def setUp(self):
+        """Run one query through the scripted LLM"""
+        from benchmarks.fake_llm import ScriptedChatModel
+        from src.agent import create_agent
+
+        llm = ScriptedChatModel(script=[
+            {'tool': 'python_repl_ast', 'tool_input': {'query': "df['x'].sum()"}},
+            {'output': 'The sum is 6.'},
+        ])
+        self.registry = MetricsRegistry()
+        self.agent = create_agent(
+            pd.DataFrame({'x': [1, 2, 3]}), llm=llm, cache=None, metrics=self.registry
+        )
+        self.agent.agent.verbose = False
+        self.response = self.agent.query('What is the sum of x?')
+
+    def test_response_metrics(self):
+        """Test that LLM and tool spans are reported on the response"""
+        metrics = self.response['metrics']
+        self.assertEqual(metrics['llm_calls'], 2)
+        self.assertEqual(metrics['tool_calls'], 1)
+        self.assertEqual(metrics['iterations'], 1)
+        self.assertGreater(metrics['prompt_tokens'], 0)
+        self.assertGreater(metrics['completion_tokens'], 0)
+        tool_span = [s for s in metrics['spans'] if s['type'] == 'tool'][0]
+        self.assertEqual(tool_span['name'], 'python_repl_ast')
+        self.assertEqual(tool_span['output_chars'], 1)
+        self.assertLessEqual(metrics['llm_s'] + metrics['tool_s'], metrics['total_s'])
+
+    def test_registry_aggregates_queries(self):
+        """Test that the registry counts queries and exports Prometheus text"""
+        self.agent.query('What is the sum of x again?')
+        self.assertEqual(self.registry.counter_value('agent_queries_total', outcome='ok'), 2)
+        self.assertEqual(self.registry.counter_value('agent_tool_calls_total', tool='python_repl_ast'), 2)
+        text = self.registry.to_prometheus()
+        self.assertIn('# TYPE agent_llm_seconds histogram', text)
+        self.assertIn('agent_llm_seconds_count 4', text)
+        self.assertIn('agent_tool_seconds_bucket{tool="python_repl_ast",le="+Inf"} 2', text)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'metrics.prom')
+            self.registry.write_prometheus(path)
+            with open(path) as f:
+                self.assertEqual(f.read(), text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+"""
+Tests for the generated-code plan cache
+"""
+import unittest
+
+import pandas as pd
+
+from src.cache import MemoryCache
+from src.plan_cache import (
+    PlanCache,
+    bind_code,
+    execute_code,
+    parameterize_code,
+    plan_snippets,
+    question_template,
+)
+
+
+class TestTemplates(unittest.TestCase):
+    """Test question templates and code parameterization"""
+
+    def test_question_template(self):
+        """Test that numbers and quoted strings become parameters"""
+        template, params = question_template("Average G3 for students older than 17 in school 'GP'?")
+        self.assertEqual(template, "average g3 for students older than {} in school {}")
+        self.assertEqual(params, ['17', 'GP'])
+
+    def test_bind_new_parameters(self):
+        """Test that new literals are substituted into cached code"""
+        code = parameterize_code(["df[(df['age'] > 17) & (df['school'] == 'GP')]['G3'].mean()"], ['17', 'GP'])
+        self.assertEqual(
+            bind_code(code, ['17', 'GP'], ['18', 'MS']),
+            ["df[(df['age'] > 18) & (df['school'] == 'MS')]['G3'].mean()"],
+        )
+
+    def test_unreferenced_parameter_change_misses(self):
+        """Test that a changed parameter the code ignores is not served"""
+        code = parameterize_code(["df['G3'].mean()"], ['17'])
+        self.assertEqual(bind_code(code, ['17'], ['17']), ["df['G3'].mean()"])
+        self.assertIsNone(bind_code(code, ['17'], ['18']))
+
+    def test_code_constants_not_rebound(self):
+        """Test that only the literal that came from the question is rebound"""
+        code = parameterize_code(["df.nlargest(1, 'G3').drop(['G1'], axis=1)"], ['1'])
+        self.assertEqual(bind_code(code, ['1'], ['3']), ["df.nlargest(3, 'G3').drop(['G1'], axis=1)"])
+
+        # Two candidate constants: neither is rebound, so the plan only serves the original value
+        snippets = ["df[df['failures'] == 1].head(1)"]
+        code = parameterize_code(snippets, ['1'])
+        self.assertEqual(bind_code(code, ['1'], ['1']), snippets)
+        self.assertIsNone(bind_code(code, ['1'], ['2']))
+
+    def test_plan_snippets(self):
+        """Test that every successful python step is kept, in order"""
+        from langchain.schema import AgentAction
+
+        def step(query, observation):
+            return AgentAction('python_repl_ast', {'query': query}, ''), observation
+
+        steps = [
+            step("df['G3'].mean()", 11.9),
+            step("df['missing']", "KeyError: 'missing'"),
+            (AgentAction('dataset_info', {}, ''), 'rows'),
+            step("```python\ndf.groupby('sex')['G3'].mean()\n```", 'F 11.7'),
+        ]
+        self.assertEqual(plan_snippets(steps), ["df['G3'].mean()", "df.groupby('sex')['G3'].mean()"])
+
+    def test_execute_code(self):
+        """Test REPL-style execution returning the last expression"""
+        df = pd.DataFrame({'x': [1, 2, 3]})
+        self.assertEqual(execute_code("total = df['x'].sum()\ntotal * 2", df), 12)
+        with self.assertRaises(KeyError):
+            execute_code("df['missing'].sum()", df)
+        namespace = {}
+        execute_code("total = df['x'].sum()", df, namespace)
+        self.assertEqual(execute_code("total + 1", df, namespace), 7)
+
+
+class TestAgentPlanCache(unittest.TestCase):
+    """Test that the agent reuses generated code"""
+
+    def test_reuses_code_without_llm(self):
+        """Test that a structurally identical question skips the LLM"""
+        from benchmarks.fake_llm import ScriptedChatModel
+        from src.agent import create_agent
+
+        llm = ScriptedChatModel(script=[
+            {'tool': 'python_repl_ast', 'tool_input': {'query': "df[df['age'] > 16]['G3'].mean()"}},
+            {'output': 'The average is 13.'},
+        ])
+        df = pd.DataFrame({'age': [15, 17, 18], 'G3': [10, 12, 14]})
+        agent = create_agent(df, llm=llm, cache=None, plan_cache=PlanCache(MemoryCache(ttl=0)))
+        agent.agent.verbose = False
+
+        agent.query('Average G3 for students older than 16?')
+        self.assertEqual(llm.calls, 2)
+
+        response = agent.query('Average G3 for students older than 17?')
+        self.assertEqual(llm.calls, 2)
+        self.assertTrue(response['plan_cached'])
+        self.assertEqual(response['output'], '14.0')
+        self.assertEqual(response['metrics']['llm_calls'], 0)
+        self.assertEqual(response['metrics']['tool_calls'], 1)
+        self.assertEqual(
+            agent.get_agent_code(response), {'query': "df[df['age'] > 17]['G3'].mean()"}
+        )
+
+        agent.df.drop(columns=['G3'], inplace=True)
+        agent.df['G3'] = ['a', 'b', 'c']
+        agent.query('Average G3 for students older than 17?')
+        self.assertEqual(llm.calls, 4)
+
+    def test_replays_every_snippet(self):
+        """Test that a multi-step plan replays all of its successful snippets"""
+        import json
+        from benchmarks.fake_llm import ScriptedChatModel
+        from src.agent import create_agent
+
+        with open('benchmarks/scripts/average_grade.json') as f:
+            llm = ScriptedChatModel(script=json.load(f))
+        df = pd.DataFrame({'sex': ['F', 'M', 'F'], 'G3': [10, 12, 14]})
+        agent = create_agent(df, llm=llm, cache=None, plan_cache=PlanCache(MemoryCache(ttl=0)))
+        agent.agent.verbose = False
+
+        first = agent.query('What is the average final grade?')
+        response = agent.query('What is the average final grade?')
+        self.assertTrue(response['plan_cached'])
+        self.assertEqual(llm.calls, len(llm.script))
+        self.assertEqual(
+            [action.tool_input for action, _ in response['intermediate_steps']],
+            [action.tool_input for action, _ in first['intermediate_steps']],
+        )
+        self.assertEqual(response['output'].splitlines()[0], '12.0')
+        self.assertIn('F', response['output'])
+        self.assertEqual(response['metrics']['tool_calls'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+"""
+Tests for the agent pool and shared LLM clients
+"""
+import asyncio
+import threading
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.pool import AgentPool, agent_memory_bytes
+
+
+class FakeAgent:
+    """Minimal agent holding a dataframe"""
+
+    def __init__(self, df, **kwargs):
+        self.df = df
+        self.kwargs = kwargs
+
+
+class TestAgentPool(unittest.TestCase):
+    """Test agent reuse and eviction"""
+
+    def test_reuses_agent_for_dataset_id(self):
+        """Test that a hot dataset builds its agent once"""
+        loads = []
+        pool = AgentPool(max_agents=2, factory=FakeAgent, llm='shared')
+
+        def loader():
+            loads.append(1)
+            return pd.DataFrame({'x': [1, 2, 3]})
+
+        first = pool.get('tenant-a', loader)
+        second = pool.get('tenant-a', loader)
+        self.assertIs(first, second)
+        self.assertEqual(len(loads), 1)
+        self.assertEqual(first.kwargs, {'llm': 'shared'})
+        self.assertEqual(pool.stats()['hits'], 1)
+
+    def test_lru_eviction_by_count(self):
+        """Test that the least recently used agent is evicted first"""
+        pool = AgentPool(max_agents=2, factory=FakeAgent)
+        frame = lambda: pd.DataFrame({'x': [1]})
+        pool.get('a', frame)
+        pool.get('b', frame)
+        pool.get('a', frame)
+        pool.get('c', frame)
+        self.assertIn('a', pool)
+        self.assertNotIn('b', pool)
+        self.assertEqual(pool.stats()['evictions'], 1)
+
+    def test_memory_limit(self):
+        """Test that agents are evicted when their dataframes exceed the memory budget"""
+        big = pd.DataFrame({'x': np.zeros(100_000)})
+        size_mb = agent_memory_bytes(FakeAgent(big)) / (1024 * 1024)
+        pool = AgentPool(max_agents=10, max_mb=size_mb * 1.5, factory=FakeAgent)
+        pool.get('a', lambda: big)
+        pool.get('b', lambda: big.copy())
+        self.assertEqual(len(pool), 1)
+        self.assertIn('b', pool)
+
+    def test_concurrent_misses_build_once(self):
+        """Test that simultaneous requests for a cold dataset share one build"""
+        builds = []
+        barrier = threading.Barrier(4)
+
+        def factory(df, **kwargs):
+            builds.append(1)
+            return FakeAgent(df)
+
+        pool = AgentPool(factory=factory)
+        results = []
+
+        def request():
+            barrier.wait()
+            results.append(pool.get('a', lambda: pd.DataFrame({'x': [1]})))
+
+        threads = [threading.Thread(target=request) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(builds), 1)
+        self.assertTrue(all(r is results[0] for r in results))
+
+
+class TestSharedLLM(unittest.TestCase):
+    """Test the shared LLM client registry"""
+
+    def test_agents_share_llm(self):
+        """Test that agents with the same settings reuse one chat model"""
+        from src.agent import create_agent
+
+        first = create_agent(pd.DataFrame({'x': [1]}), api_key='test-key', cache=None)
+        second = create_agent(pd.DataFrame({'y': [2]}), api_key='test-key', cache=None)
+        self.assertIs(first.llm, second.llm)
+
+    def test_async_client_per_event_loop(self):
+        """Test that each event loop gets its own async client (query_many runs a new loop per batch)"""
+        from src.llm import _LoopCompletions
+
+        completions = _LoopCompletions('test-key', 'http://localhost')
+
+        async def current():
+            return completions._completions()
+
+        async def same_loop_twice():
+            return completions._completions() is completions._completions()
+
+        self.assertIsNot(asyncio.run(current()), asyncio.run(current()))
+        self.assertTrue(asyncio.run(same_loop_twice()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+Unit tests for dataframe profiling
+"""
+import unittest
+import numpy as np
+import pandas as pd
+from src.profiling import DataFrameProfile, HyperLogLog
+
+
+class TestDataFrameProfile(unittest.TestCase):
+    """Test the cached dataframe profile"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.df = pd.DataFrame({
+            'age': [15, 16, 17, 18, 16, 15],
+            'G3': [10.0, 12.5, np.nan, 14.0, 9.0, 11.0],
+            'sex': ['F', 'M', 'F', None, 'F', 'M'],
+        })
+
+    def test_matches_pandas_describe(self):
+        """Test that summary statistics agree with DataFrame.describe"""
+        summary = DataFrameProfile.from_dataframe(self.df, chunk_rows=4).summary()
+        expected = self.df.describe().to_dict()
+        for column, stats in expected.items():
+            for stat, value in stats.items():
+                self.assertAlmostEqual(summary['describe'][column][stat], value, places=9)
+        self.assertEqual(summary['missing_values'], self.df.isnull().sum().to_dict())
+        self.assertEqual(summary['shape'], self.df.shape)
+
+    def test_incremental_update(self):
+        """Test that appending rows matches profiling the combined frame"""
+        profile = DataFrameProfile.from_dataframe(self.df.iloc[:3])
+        profile.update(self.df.iloc[3:])
+        full = DataFrameProfile.from_dataframe(self.df)
+        for column, stats in full.summary()['describe'].items():
+            for stat, value in stats.items():
+                self.assertAlmostEqual(profile.summary()['describe'][column][stat], value, places=9)
+        self.assertEqual(profile.shape, self.df.shape)
+        self.assertEqual(profile.columns['sex'].top_values()[0], ('F', 3))
+
+    def test_matches_checks_content(self):
+        """Test that an in-place edit keeping the shape no longer matches"""
+        df = self.df.copy()
+        profile = DataFrameProfile.from_dataframe(df)
+        self.assertTrue(profile.matches(df))
+        df.loc[0, 'age'] = 40
+        self.assertFalse(profile.matches(df))
+
+    def test_update_rejects_new_columns(self):
+        """Test that appended rows must share the profiled schema"""
+        profile = DataFrameProfile.from_dataframe(self.df)
+        with self.assertRaises(ValueError):
+            profile.update(pd.DataFrame({'other': [1]}))
+
+
+class TestHyperLogLog(unittest.TestCase):
+    """Test approximate distinct counting"""
+
+    def test_estimate_within_tolerance(self):
+        """Test that the estimate is close to the true distinct count"""
+        counter = HyperLogLog()
+        values = pd.Series(np.arange(50_000) % 20_000)
+        counter.add_hashes(pd.util.hash_pandas_object(values, index=False).to_numpy())
+        self.assertAlmostEqual(counter.count() / 20_000, 1.0, delta=0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
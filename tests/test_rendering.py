@@ -0,0 +1,76 @@
+"""
+Unit tests for the chart rendering engine
+"""
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from src.render_service import RenderQueueFull, RenderService
+from src.rendering import new_chart_path, render_chart
+
+
+class TestRenderChart(unittest.TestCase):
+    """Test figure-object based rendering"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.spec = {'data': {'F': 208, 'M': 187}, 'title': 'Gender', 'xlabel': 'sex', 'ylabel': 'count'}
+
+    def test_in_memory_png(self):
+        """Test that charts can be rendered to bytes without touching disk"""
+        result = render_chart('bar', self.spec, in_memory=True)
+        self.assertIsNone(result.path)
+        self.assertTrue(result.data.startswith(b'\x89PNG'))
+
+    def test_concurrent_renders_use_unique_paths(self):
+        """Test that renders from a thread pool do not clobber each other"""
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = [new_chart_path('bar', tmp) for _ in range(8)]
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                results = list(pool.map(lambda path: render_chart('bar', self.spec, path), paths))
+            self.assertEqual(len({r.path for r in results}), 8)
+            for result in results:
+                self.assertGreater(os.path.getsize(result.path), 0)
+
+    def test_style_is_scoped_to_the_figure(self):
+        """Test that PLOT_STYLE reaches the chart without changing global rcParams"""
+        import io
+        import matplotlib
+        import matplotlib.image
+        import numpy as np
+        from src.config import PLOT_STYLE
+
+        before = dict(matplotlib.rcParams)
+        result = render_chart('bar', self.spec, in_memory=True)
+        self.assertEqual(dict(matplotlib.rcParams), before)
+
+        facecolor = matplotlib.colors.to_rgb(matplotlib.style.library[PLOT_STYLE]['axes.facecolor'])
+        pixels = matplotlib.image.imread(io.BytesIO(result.data))[..., :3]
+        self.assertGreater(np.isclose(pixels, facecolor, atol=1 / 255).all(axis=-1).mean(), 0.1)
+
+    def test_unknown_kind(self):
+        """Test that unknown chart kinds are rejected"""
+        with self.assertRaises(ValueError):
+            render_chart('pie', self.spec)
+
+
+class TestRenderService(unittest.TestCase):
+    """Test the process-pool rendering service"""
+
+    def test_render_and_back_pressure(self):
+        """Test that workers render charts and a full queue rejects non-blocking jobs"""
+        spec = {'data': {'F': 208, 'M': 187}, 'title': 'Gender', 'xlabel': 'sex', 'ylabel': 'count'}
+        service = RenderService(workers=1, max_queue=1)
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                job = service.submit('bar', spec, os.path.join(tmp, 'a.png'))
+                self.assertEqual(job.path, os.path.join(tmp, 'a.png'))
+                with self.assertRaises(RenderQueueFull):
+                    service.submit('bar', spec, os.path.join(tmp, 'b.png'), block=False)
+                self.assertTrue(os.path.exists(job.result().path))
+        finally:
+            service.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
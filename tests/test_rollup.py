@@ -0,0 +1,113 @@
+"""
+Tests for the rollup cube
+"""
+import unittest
+
+import pandas as pd
+
+from src.profiling import DataFrameProfile
+from src.rollup import RollupCube, detect_dimensions, make_rollup_tools
+
+
+class TestRollupCube(unittest.TestCase):
+    """Test cube lookups against pandas groupby"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.df = pd.DataFrame({
+            'sex': ['F', 'M', 'F', 'M', 'F', 'M'],
+            'Walc': [1, 2, 1, 3, 2, 2],
+            'G3': [10.0, 12.0, 14.0, 8.0, 16.0, 11.0],
+            'absences': [0.5, 1.5, 2.5, 3.5, 4.5, 5.5],
+        })
+        self.cube = RollupCube(DataFrameProfile.from_dataframe(self.df))
+
+    def test_detects_low_cardinality_columns(self):
+        """Test that categorical and small-integer columns become dimensions"""
+        self.assertEqual(detect_dimensions(DataFrameProfile.from_dataframe(self.df)), ['sex', 'Walc'])
+
+    def test_lookup_matches_groupby(self):
+        """Test grouped, filtered and total aggregates"""
+        result = self.cube.lookup(self.df, {'G3': 'mean', '*': 'count'}, ['Walc'])
+        expected = self.df.groupby('Walc')['G3'].mean()
+        pd.testing.assert_series_equal(result['G3_mean'], expected, check_names=False)
+        self.assertEqual(result['count'].tolist(), [2, 3, 1])
+
+        filtered = self.cube.lookup(self.df, {'G3': 'max'}, ['Walc'], {'sex': 'M'})
+        self.assertEqual(filtered['G3_max'].tolist(), [12.0, 8.0])
+
+        total = self.cube.lookup(self.df, {'G3': 'std'})
+        self.assertAlmostEqual(total['G3_std'][0], self.df['G3'].std())
+
+    def test_lookup_does_not_rescan_rows(self):
+        """Test that a built cube answers from its partials"""
+        self.cube.lookup(self.df, {'G3': 'sum'}, ['sex'], version=1)
+        self.assertEqual(self.cube.builds, 1)
+        self.cube.lookup(self.df, {'G3': 'min'}, ['Walc'], version=1)
+        self.assertEqual((self.cube.builds, self.cube.hits), (1, 2))
+
+    def test_extend_matches_rebuild(self):
+        """Test that merging appended rows gives the same answer as rebuilding"""
+        self.cube.build(self.df, version=1)
+        rows = pd.DataFrame({'sex': ['F'], 'Walc': [4], 'G3': [20.0], 'absences': [1.0]})
+        combined = pd.concat([self.df, rows], ignore_index=True)
+        self.cube.extend(rows, combined, version=2)
+        self.assertTrue(self.cube.is_current(combined, 2))
+        result = self.cube.lookup(combined, {'G3': 'mean'}, ['Walc'], version=2)
+        self.assertEqual(self.cube.builds, 1)
+        expected = combined.groupby('Walc')['G3'].mean()
+        pd.testing.assert_series_equal(result['G3_mean'], expected, check_names=False)
+
+    def test_tool_reports_bad_requests(self):
+        """Test that non-dimension groupings are refused with a message"""
+        tool = make_rollup_tools(lambda: self.df, self.cube)[0]
+        self.assertIn('sex, Walc', tool.description)
+        output = tool.run({'metrics': {'G3': 'mean'}, 'group_by': ['absences']})
+        self.assertTrue(output.startswith('Error aggregating rollup'))
+
+
+class TestAgentRollup(unittest.TestCase):
+    """Test that the agent keeps its cube consistent"""
+
+    def test_append_extends_cube(self):
+        """Test that appended rows are merged into a built cube"""
+        from benchmarks.fake_llm import ScriptedChatModel
+        from src.agent import create_agent
+
+        df = pd.DataFrame({'sex': ['F', 'M', 'F'], 'G3': [10.0, 12.0, 14.0]})
+        llm = ScriptedChatModel(script=[
+            {'tool': 'rollup_aggregate', 'tool_input': {'metrics': {'G3': 'mean'}, 'group_by': ['sex']}},
+            {'output': 'Done.'},
+        ])
+        agent = create_agent(df, llm=llm, cache=None, plan_cache=None)
+        agent.agent.verbose = False
+        agent.query('Average G3 by sex?')
+        agent.append({'sex': ['M'], 'G3': [20.0]})
+        response = agent.query('Average G3 by sex?')
+        self.assertIn('16.0', response['intermediate_steps'][0][1])
+        self.assertEqual(agent.rollup.builds, 1)
+
+    def test_in_place_edit_rebuilds_cube(self):
+        """Test that generated code editing a dimension in place invalidates the cube"""
+        from benchmarks.fake_llm import ScriptedChatModel
+        from src.agent import create_agent
+
+        df = pd.DataFrame({'sex': ['F', 'F', 'M', 'M'], 'G3': [10.0, 10.0, 12.0, 12.0]})
+        rollup = {'tool': 'rollup_aggregate', 'tool_input': {'metrics': {'G3': 'mean'}, 'group_by': ['sex']}}
+        llm = ScriptedChatModel(script=[
+            rollup,
+            {'tool': 'python_repl_ast', 'tool_input': {'query': "df['sex'] = ['M', 'F', 'M', 'F']"}},
+            rollup,
+            {'output': 'Done.'},
+        ])
+        agent = create_agent(df, llm=llm, cache=None, plan_cache=None)
+        agent.agent.verbose = False
+        response = agent.query('Average G3 by sex?')
+        before, after = response['intermediate_steps'][0][1], response['intermediate_steps'][2][1]
+        self.assertEqual(before.split()[-4:], ['F', '10.0', 'M', '12.0'])
+        self.assertEqual(after.split()[-4:], ['F', '11.0', 'M', '11.0'])
+        self.assertEqual(agent.rollup.builds, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
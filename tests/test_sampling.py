@@ -0,0 +1,106 @@
+"""
+Tests for stratified sampling and approximate mode
+"""
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.fake_llm import ScriptedChatModel
+from src.agent import create_agent
+from src.cache import MemoryCache
+from src.profiling import DataFrameProfile
+from src.sampling import StratifiedSample, choose_strata
+
+
+def make_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    school = rng.choice(['GP', 'MS', 'XX'], size=rows, p=[0.7, 0.29, 0.01])
+    return pd.DataFrame({
+        'school': school,
+        'G3': rng.normal(10, 3, rows) + (school == 'MS') * 4,
+        'age': rng.integers(15, 22, rows),
+    })
+
+
+class TestStratifiedSample(unittest.TestCase):
+    """Test the reservoir and its estimates"""
+
+    def setUp(self):
+        self.df = make_frame(50_000)
+        self.sample = StratifiedSample(self.df, ['school'], size=2_000, min_rows=50)
+
+    def test_strata_come_from_the_profile(self):
+        """Test that low-cardinality columns are chosen for stratification"""
+        self.assertEqual(choose_strata(DataFrameProfile.from_dataframe(self.df))[0], 'school')
+
+    def test_small_strata_are_represented(self):
+        """Test proportional allocation with a floor per stratum"""
+        counts = self.sample.frame['school'].value_counts()
+        self.assertGreaterEqual(counts['XX'], 50)
+        self.assertAlmostEqual(len(self.sample), 2_000, delta=60)
+
+    def test_intervals_cover_the_exact_answer(self):
+        """Test that estimates land within their intervals of the full-frame values"""
+        result = self.sample.estimate({'G3': 'mean', '*': 'count'}, group_by=['school'])
+        exact = self.df.groupby('school')['G3'].agg(['mean', 'size'])
+        for school in exact.index:
+            row = result.loc[school]
+            self.assertLessEqual(row['G3_mean_low'], exact.loc[school, 'mean'])
+            self.assertGreaterEqual(row['G3_mean_high'], exact.loc[school, 'mean'])
+            # Stratum sizes are known, so per-stratum counts are exact
+            self.assertAlmostEqual(row['count'], exact.loc[school, 'size'])
+
+        total = self.sample.estimate({'G3': 'sum'}, filters={'age': 18}).iloc[0]
+        exact_total = self.df.loc[self.df['age'] == 18, 'G3'].sum()
+        self.assertLessEqual(total['G3_sum_low'], exact_total)
+        self.assertGreaterEqual(total['G3_sum_high'], exact_total)
+
+    def test_full_sample_is_exact(self):
+        """Test that a sample holding every row gives zero-width intervals"""
+        small = self.df.head(500)
+        result = StratifiedSample(small, ['school'], size=1_000).estimate({'G3': 'mean'}).iloc[0]
+        self.assertAlmostEqual(result['G3_mean'], small['G3'].mean())
+        self.assertAlmostEqual(result['G3_mean_low'], result['G3_mean_high'])
+
+    def test_extend_keeps_reservoirs_bounded(self):
+        """Test that appended rows are sampled into fixed-size reservoirs"""
+        more = make_frame(50_000, seed=1)
+        full = pd.concat([self.df, more], ignore_index=True)
+        self.sample.extend(full, len(self.df))
+        self.assertAlmostEqual(len(self.sample), 2_000, delta=60)
+        self.assertEqual(self.sample.total_rows, 100_000)
+        appended = (self.sample.frame.index >= len(self.df)).mean()
+        self.assertAlmostEqual(appended, 0.5, delta=0.1)
+
+
+class TestApproximateMode(unittest.TestCase):
+    """Test sampled answers and escalation on the agent"""
+
+    def test_escalate_to_full_frame(self):
+        """Test that the REPL sees the sample until approximate mode is switched off"""
+        df = make_frame(5_000)
+        llm = ScriptedChatModel(script=[
+            {'tool': 'python_repl_ast', 'tool_input': {'query': 'len(df)'}},
+            {'output': 'Done.'},
+        ] * 2)
+        agent = create_agent(df, llm=llm, cache=MemoryCache(ttl=0), plan_cache=None)
+        agent.sample = StratifiedSample.from_profile(df, agent.profile, size=500)
+        agent.set_approximate(True)
+        agent.agent.verbose = False
+        self.assertIn('estimate_aggregate', [tool.name for tool in agent.agent.tools])
+
+        response = agent.query('How many rows?')
+        sampled = response['intermediate_steps'][0][1]
+        self.assertLess(sampled, len(df))
+        self.assertEqual(response['approximate']['total_rows'], len(df))
+
+        agent.set_approximate(False)
+        response = agent.query('How many rows?')
+        self.assertFalse(response.get('cached'))
+        self.assertEqual(response['intermediate_steps'][0][1], len(df))
+        self.assertNotIn('approximate', response)
+
+
+if __name__ == '__main__':
+    unittest.main()
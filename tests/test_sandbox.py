@@ -0,0 +1,86 @@
+"""
+Tests for the sandboxed subprocess REPL backend
+"""
+import os
+import unittest
+
+import pandas as pd
+
+from src.sandbox import SandboxExecutor
+
+
+class TestSandboxExecutor(unittest.TestCase):
+    """Test execution, limits and recycling in the worker process"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Start one worker for the class; startup dominates the runtime"""
+        cls.executor = SandboxExecutor(
+            pd.DataFrame({'x': [1, 2, 3]}), memory_mb=1024, cpu_seconds=30, timeout=10, max_tasks=50
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.close()
+
+    def test_persistent_namespace_and_stats(self):
+        """Test that variables persist between snippets and stats are recorded"""
+        self.assertEqual(self.executor.run("total = df['x'].sum()\ntotal", key='step-1'), 6)
+        self.assertEqual(self.executor.run("total * 2"), 12)
+        stats = self.executor.pop_stats('step-1')
+        self.assertGreater(stats['peak_rss_mb'], 0)
+        self.assertGreaterEqual(stats['exec_s'], 0)
+
+    @unittest.skipUnless(os.path.exists('/proc/self/clear_refs'), 'per-step peak RSS needs Linux')
+    def test_peak_rss_is_per_step(self):
+        """Test that a large earlier step does not inflate a later step's peak RSS"""
+        self.executor.run("import numpy as np\nint(np.ones(50_000_000).sum())", key='big')
+        self.executor.run("int(df['x'].sum())", key='small')
+        big, small = self.executor.pop_stats('big'), self.executor.pop_stats('small')
+        self.assertGreater(big['peak_rss_mb'] - small['peak_rss_mb'], 200)
+
+    def test_errors_and_memory_limit(self):
+        """Test that errors and failed allocations come back as REPL error strings"""
+        self.assertTrue(self.executor.run("df['missing']").startswith('KeyError'))
+        result = self.executor.run("import numpy as np\nnp.ones(10**10).sum()")
+        self.assertTrue(result.startswith('MemoryError'))
+
+    def test_timeout_recycles_worker(self):
+        """Test that a runaway snippet is killed and a fresh worker serves the next one"""
+        self.executor.timeout = 0.5
+        try:
+            result = self.executor.run("while True:\n    pass")
+        finally:
+            self.executor.timeout = 10
+        self.assertTrue(result.startswith('TimeoutError'))
+        self.assertEqual(self.executor.run("int(df['x'].max())"), 3)
+
+
+class TestSandboxAgent(unittest.TestCase):
+    """Test the agent with the subprocess REPL backend"""
+
+    def test_tool_spans_include_sandbox_stats(self):
+        """Test that REPL steps run in the sandbox and report exec time and peak RSS"""
+        from benchmarks.fake_llm import ScriptedChatModel
+        from src.agent import create_agent
+
+        llm = ScriptedChatModel(script=[
+            {'tool': 'python_repl_ast', 'tool_input': {'query': "import os\nos.getpid()"}},
+            {'output': 'done'},
+        ])
+        agent = create_agent(
+            pd.DataFrame({'x': [1]}), llm=llm, cache=None, plan_cache=None, repl_backend='subprocess'
+        )
+        agent.agent.verbose = False
+        try:
+            response = agent.query('Which process runs the code?')
+        finally:
+            agent.sandbox.close()
+        self.assertNotEqual(response['intermediate_steps'][0][1], os.getpid())
+        span = [s for s in response['metrics']['spans'] if s['type'] == 'tool'][0]
+        self.assertIn('peak_rss_mb', span)
+        self.assertIn('exec_s', span)
+
+
+if __name__ == '__main__':
+    unittest.main()
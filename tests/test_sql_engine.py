@@ -0,0 +1,54 @@
+"""
+Unit tests for the DuckDB SQL engine
+"""
+import unittest
+import pandas as pd
+from src.sql_engine import SQLEngine, make_sql_tools
+
+
+class TestSQLEngine(unittest.TestCase):
+    """Test SQL push-down over the agent's dataframe"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.df = pd.DataFrame({
+            'sex': ['F', 'M', 'F', 'M'],
+            'G3': [10, 12, 14, 16],
+        })
+        self.engine = SQLEngine(self.df)
+
+    def test_grouped_query(self):
+        """Test that SQL aggregates match pandas"""
+        result = self.engine.execute('SELECT sex, AVG(G3) AS g3 FROM df GROUP BY sex ORDER BY sex')
+        expected = self.df.groupby('sex')['G3'].mean()
+        self.assertEqual(result.set_index('sex')['g3'].to_dict(), expected.to_dict())
+
+    def test_rejects_writes(self):
+        """Test that only read-only statements are accepted"""
+        with self.assertRaises(ValueError):
+            self.engine.execute('DROP VIEW df')
+        output = make_sql_tools(self.engine)[0].run({'query': 'DELETE FROM df'})
+        self.assertTrue(output.startswith('Error running SQL'))
+
+    def test_no_stacked_statements_or_file_access(self):
+        """Test that a read-only prefix cannot smuggle in writes or host file reads"""
+        with self.assertRaises(ValueError):
+            self.engine.execute("SELECT 1; COPY (SELECT * FROM df) TO '/tmp/df.csv'")
+        import duckdb
+        with self.assertRaises(duckdb.PermissionException):
+            self.engine.execute("SELECT * FROM read_csv_auto('/etc/passwd')")
+        with self.assertRaises(ValueError):
+            self.engine.execute("SET enable_external_access = true")
+        self.assertEqual(len(self.engine.execute('DESCRIBE df')), 2)
+
+    def test_agent_sql_mode(self):
+        """Test that the agent can be built in SQL execution mode"""
+        from src.agent import create_agent
+        agent = create_agent(self.df, api_key='test-key', cache=None, execution_mode='sql')
+        self.assertIn('run_sql', {tool.name for tool in agent.agent.tools})
+        with self.assertRaises(ValueError):
+            create_agent(self.df, api_key='test-key', execution_mode='rust')
+
+
+if __name__ == '__main__':
+    unittest.main()
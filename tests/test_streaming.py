@@ -0,0 +1,56 @@
+"""
+Tests for streaming query events
+"""
+import asyncio
+import unittest
+
+import pandas as pd
+
+from src.streaming import chart_paths_from_output
+
+
+class TestAstreamQuery(unittest.TestCase):
+    """Test the async event stream of a scripted agent query"""
+
+    def setUp(self):
+        """Build an agent over the scripted LLM"""
+        from benchmarks.fake_llm import ScriptedChatModel
+        from src.agent import create_agent
+
+        llm = ScriptedChatModel(script=[
+            {'tool': 'python_repl_ast', 'tool_input': {'query': "df['x'].max()"}},
+            {'output': 'The maximum is 3.'},
+        ])
+        self.agent = create_agent(pd.DataFrame({'x': [1, 2, 3]}), llm=llm, cache=None)
+        self.agent.agent.verbose = False
+
+    def collect(self, question):
+        async def run():
+            return [event async for event in self.agent.astream_query(question)]
+        return asyncio.run(run())
+
+    def test_event_order(self):
+        """Test that tool events precede answer tokens and the final response"""
+        events = self.collect('What is the largest x?')
+        types = [e['type'] for e in events]
+        self.assertEqual(types[:2], ['tool_start', 'tool_end'])
+        self.assertEqual(events[0]['code'], "df['x'].max()")
+        self.assertEqual(events[1]['output'], '3')
+        self.assertIn('token', types)
+        self.assertEqual(types[-1], 'final')
+        tokens = ''.join(e['text'] for e in events if e['type'] == 'token')
+        self.assertEqual(tokens.strip(), 'The maximum is 3.')
+        self.assertEqual(events[-1]['response']['output'], 'The maximum is 3.')
+        self.assertEqual(events[-1]['response']['metrics']['tool_calls'], 1)
+
+    def test_chart_paths_from_output(self):
+        """Test chart-ready detection in tool output"""
+        self.assertEqual(
+            chart_paths_from_output("Bar chart created successfully and saved as 'charts/bar.png'"),
+            ['charts/bar.png'],
+        )
+        self.assertEqual(chart_paths_from_output('Error creating bar chart: boom'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()